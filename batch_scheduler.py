@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Batch Scheduler for PyTZ Buddy
+Meeting suggestions and business-hours overlap for many teams at once.
+Every distinct location in the file is resolved once, up front, through
+the normal cache and geocoder; the teams are then scheduled across a
+process pool and each result is written as one JSON line as it completes.
+
+Team file: a JSON list, or JSON Lines, of objects like
+    {"name": "platform", "locations": ["nyc", "London, UK", "tokyo"],
+     "business_hours": {"start": 9, "end": 17}, "duration_hours": 1}
+(business_hours and duration_hours are optional). A team that is invalid
+or fails to schedule gets an {"team": ..., "error": ...} line instead.
+
+Usage:
+    python batch_scheduler.py teams.json --output results.jsonl --workers 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from geopy.extra.rate_limiter import RateLimiter
+
+from cache_manager import _valid_business_hours
+
+# Per-worker converter, created by _init_worker
+_WORKER_CONVERTER = None
+
+
+def load_teams(path):
+    """Load team definitions from a JSON list or a JSON Lines file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def validate_team(team):
+    """Describe what is wrong with a team definition, or None if it can be scheduled"""
+    if not isinstance(team, dict):
+        return "Team must be a JSON object"
+    locations = team.get('locations')
+    if not isinstance(locations, list) or not all(isinstance(location, str) for location in locations):
+        return "'locations' must be a list of location names"
+    if team.get('business_hours') and not _valid_business_hours(team['business_hours']):
+        return "'business_hours' must be {\"start\": int, \"end\": int} with 0 <= start < end <= 24"
+    duration_hours = team.get('duration_hours', 1)
+    if (not isinstance(duration_hours, (int, float)) or isinstance(duration_hours, bool)
+            or not 0 < duration_hours <= 24):
+        return "'duration_hours' must be a number of hours between 0 and 24"
+    return None
+
+
+def _team_name(team):
+    return team.get('name') if isinstance(team, dict) else None
+
+
+class _RateLimitedGeocoder:
+    """Geocoder wrapper spacing geocode calls min_delay_seconds apart"""
+
+    def __init__(self, geolocator, min_delay_seconds):
+        self.geocode = RateLimiter(
+            geolocator.geocode, min_delay_seconds=min_delay_seconds,
+            max_retries=0, swallow_exceptions=False
+        )
+
+
+def resolve_team_locations(converter, teams, min_delay_seconds=1.0):
+    """Resolve every distinct location once: {location: location data or None}
+
+    Cached locations cost nothing; the rest are geocoded at most one per
+    min_delay_seconds, per Nominatim's usage policy (0 for a local stub).
+    Teams that fail validate_team are skipped.
+    """
+    locations = list(dict.fromkeys(
+        location for team in teams if validate_team(team) is None for location in team['locations']
+    ))
+    resolved = {location: None for location in locations}
+    geolocator = converter.geolocator
+    converter.geolocator = _RateLimitedGeocoder(geolocator, min_delay_seconds)
+    try:
+        for location_data in converter.resolve_location_timezones(locations):
+            resolved[location_data['input']] = location_data
+    finally:
+        converter.geolocator = geolocator
+    return resolved
+
+
+def _init_worker(cache_dir):
+    global _WORKER_CONVERTER
+    from cache_manager import CacheManager
+    from timezone_converter import TimezoneConverter
+
+    _WORKER_CONVERTER = TimezoneConverter(CacheManager(cache_dir=cache_dir))
+
+
+def schedule_team(task):
+    """Compute one team's result dict (runs in a pool worker)
+
+    Invalid teams and any exception while scheduling one become
+    {'team': ..., 'error': ...} results, so one bad team never stops a batch.
+    """
+    team, location_timezones, unresolved, error = task
+    if error is not None:
+        return {'team': _team_name(team), 'error': error}
+    try:
+        return _schedule_valid_team(team, location_timezones, unresolved)
+    except Exception as e:
+        return {'team': _team_name(team), 'error': f"{type(e).__name__}: {e}"}
+
+
+def _schedule_valid_team(team, location_timezones, unresolved):
+    converter = _WORKER_CONVERTER
+    business_hours = team.get('business_hours') or converter.user_config['business_hours']
+    start_hour, end_hour = business_hours['start'], business_hours['end']
+    result = {
+        'team': team.get('name'),
+        'locations': [location_data['input'] for location_data in location_timezones],
+        'unresolved': unresolved,
+        'business_hours': f"{start_hour}:00-{end_hour}:00"
+    }
+    if len(location_timezones) < 2:
+        result['error'] = "Need at least 2 resolvable locations"
+        return result
+
+    locations = result['locations']
+    # Locations arrive resolved; the per-team schedule cache would only add lock contention
+    suggestions = converter.find_meeting_times(
+        locations, start_hour, end_hour, team.get('duration_hours', 1),
+        location_timezones=location_timezones, use_cache=False
+    )
+    overlap = converter.calculate_business_hours_overlap(
+        locations, start_hour, end_hour, location_timezones=location_timezones, use_cache=False
+    )
+    result['meeting_times'] = [{
+        'utc_time': suggestion['utc_time'].isoformat(),
+        'local_times': {
+            detail['location']: detail['local_time'].strftime('%Y-%m-%d %H:%M %Z')
+            for detail in suggestion['locations']
+        }
+    } for suggestion in suggestions]
+    result['overlap'] = {
+        'total_overlap': overlap['total_overlap'],
+        'utc_hours': [hour['utc_hour'] for hour in overlap['overlap_hours']],
+        'zone_classes': overlap['zone_classes']
+    }
+    return result
+
+
+def run_batch(teams, output, converter=None, workers=None, chunksize=8, min_delay_seconds=1.0):
+    """Schedule every team and write one JSON line per team to output
+
+    output is a writable text file; lines are written in team order as
+    results arrive. converter resolves the locations (default: a new
+    TimezoneConverter); min_delay_seconds spaces its geocoder requests.
+    Returns a summary dict.
+    """
+    if converter is None:
+        from timezone_converter import TimezoneConverter
+        converter = TimezoneConverter()
+
+    start = time.perf_counter()
+    resolved = resolve_team_locations(converter, teams, min_delay_seconds)
+    resolve_seconds = time.perf_counter() - start
+
+    tasks = []
+    for team in teams:
+        error = validate_team(team)
+        location_timezones = []
+        unresolved = []
+        for location in (team['locations'] if error is None else []):
+            location_data = resolved.get(location)
+            if location_data is None:
+                unresolved.append(location)
+            else:
+                location_timezones.append(dict(location_data, input=location))
+        tasks.append((team, location_timezones, unresolved, error))
+
+    summary = {'teams': len(teams), 'locations': len(resolved),
+               'unresolved_locations': sum(1 for data in resolved.values() if data is None),
+               'errors': 0, 'resolve_seconds': round(resolve_seconds, 3)}
+    workers = workers or os.cpu_count() or 1
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(converter.cache_manager.cache_dir,)) as pool:
+        for result in pool.imap(schedule_team, tasks, chunksize=chunksize):
+            summary['errors'] += 'error' in result
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch meeting and overlap scheduling for PyTZ Buddy")
+    parser.add_argument('teams', help="JSON or JSON Lines file of team definitions")
+    parser.add_argument('--output', '-o', default=None, help="JSONL output file (default: stdout)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chunksize', type=int, default=8)
+    parser.add_argument('--min-delay', type=float, default=1.0,
+                        help="Seconds between geocoder requests (0 for a local Nominatim stub)")
+    args = parser.parse_args()
+
+    teams = load_teams(args.teams)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        summary = run_batch(teams, output, workers=args.workers, chunksize=args.chunksize,
+                            min_delay_seconds=args.min_delay)
+    finally:
+        if args.output:
+            output.close()
+    print(f"📦 Scheduled {summary['teams']} teams ({summary['locations']} distinct locations, "
+          f"{summary['unresolved_locations']} unresolved) in {summary['seconds']}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
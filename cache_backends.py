@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Cache Backends for PyTZ Buddy
+Storage for location cache entries behind one small interface:
+get, put, delete, scan and stats. Entries are the dicts CacheManager
+stores ({'data': ..., 'cached_at': ...}), keyed by normalized location.
+
+Backends:
+    json           location_cache.json in the cache directory (default)
+    memory         a dict private to this process
+    shared_memory  a multiprocessing.shared_memory segment shared by every
+                   worker process on the host, with no file I/O per lookup
+"""
+
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: pass a multiprocessing.Lock instead
+    fcntl = None
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+
+class CacheBackend:
+    """Base class for location cache storage"""
+
+    name = None
+
+    def __init__(self, max_entries=100):
+        self.max_entries = max_entries
+
+    def get(self, key):
+        """Return the entry stored under key, or None"""
+        raise NotImplementedError
+
+    def put(self, key, entry):
+        """Store an entry, evicting the oldest entries beyond max_entries"""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove one entry; returns True if it existed"""
+        return self.delete_many([key]) > 0
+
+    def delete_many(self, keys):
+        """Remove several entries; returns how many existed"""
+        raise NotImplementedError
+
+    def scan(self):
+        """Return a list of (key, entry) pairs for every stored entry"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every entry"""
+        self.delete_many([key for key, _ in self.scan()])
+
+    def stats(self):
+        """Return a dict with at least 'backend' and 'entries'"""
+        return {'backend': self.name, 'entries': len(self.scan())}
+
+    def _trim(self, cache):
+        """Keep only the max_entries most recently cached entries"""
+        if len(cache) <= self.max_entries:
+            return cache
+        sorted_items = sorted(cache.items(), key=lambda x: x[1]['cached_at'], reverse=True)
+        return dict(sorted_items[:self.max_entries])
+
+
+class JsonFileBackend(CacheBackend):
+    """location_cache.json in the CacheManager's directory, shared through the file"""
+
+    name = 'json'
+
+    def __init__(self, cache_manager, max_entries=100):
+        super().__init__(max_entries)
+        self.cache_manager = cache_manager
+
+    def get(self, key):
+        return self.cache_manager._load_location_cache().get(key)
+
+    def put(self, key, entry):
+        def update(cache):
+            # Merge into the latest on-disk cache so other workers' entries survive
+            cache[key] = entry
+            return self._trim(cache)
+
+        self.cache_manager._update_json(self.cache_manager.location_cache_file, update)
+
+    def delete_many(self, keys):
+        removed = []
+
+        def update(cache):
+            for key in keys:
+                if key in cache:
+                    del cache[key]
+                    removed.append(key)
+            return cache if removed else None
+
+        self.cache_manager._update_json(self.cache_manager.location_cache_file, update)
+        return len(removed)
+
+    def scan(self):
+        return list(self.cache_manager._load_location_cache().items())
+
+    def clear(self):
+        cache_file = self.cache_manager.location_cache_file
+        with self.cache_manager._file_lock(cache_file):
+            self.cache_manager._write_json(cache_file, {})
+
+    def stats(self):
+        return {
+            'backend': self.name,
+            'entries': len(self.cache_manager._load_location_cache()),
+            'path': self.cache_manager.location_cache_file
+        }
+
+
+class DictBackend(CacheBackend):
+    """In-process dict; fastest, but private to one process and lost on exit"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=100):
+        super().__init__(max_entries)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries = self._trim(self._entries)
+
+    def delete_many(self, keys):
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    removed += 1
+            return removed
+
+    def scan(self):
+        return list(self._entries.items())
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+
+class SharedMemoryBackend(CacheBackend):
+    """Cache held in a named shared memory segment for all processes on a host
+
+    Segment layout: a header (sequence number, payload length) followed by
+    the entries as compact JSON. Writers serialize on a lock and make the
+    sequence odd while writing; readers copy the payload without locking and
+    retry if the sequence moved. Each process keeps the last decoded dict,
+    so a lookup with no intervening write is a header read plus a dict get.
+
+    The process that creates the segment is its owner (owner is True), but
+    the segment is not tied to any process's lifetime: it stays until
+    close(unlink=True) or unlink_segment() removes it.
+    """
+
+    name = 'shared_memory'
+    HEADER = struct.Struct('<QI')
+
+    def __init__(self, segment_name="pytz_buddy_cache", size=4 * 1024 * 1024,
+                 lock=None, max_entries=100):
+        """Attach to segment_name, creating it with size bytes if it doesn't exist
+
+        lock may be a multiprocessing.Lock shared by forked workers; by
+        default writers serialize on an fcntl lock file in the temp dir.
+        """
+        if shared_memory is None:
+            raise RuntimeError("multiprocessing.shared_memory requires Python 3.8+")
+        super().__init__(max_entries)
+        self.segment_name = segment_name
+        self._lock = lock
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{segment_name}.lock")
+        self._seen_sequence = None
+        self._entries = {}
+
+        try:
+            self._segment = self._open(segment_name, create=True, size=size)
+            self.owner = True
+            self.HEADER.pack_into(self._segment.buf, 0, 0, 2)
+            self._segment.buf[self.HEADER.size:self.HEADER.size + 2] = b'{}'
+        except FileExistsError:
+            self._segment = self._open(segment_name)
+            self.owner = False
+
+    @staticmethod
+    def _open(segment_name, create=False, size=0):
+        """Create or attach to the segment without this process's resource tracker owning it"""
+        try:
+            return shared_memory.SharedMemory(name=segment_name, create=create, size=size, track=False)
+        except TypeError:  # Python < 3.13 has no track argument
+            segment = shared_memory.SharedMemory(name=segment_name, create=create, size=size)
+            try:
+                resource_tracker.unregister(segment._name, 'shared_memory')
+            except Exception:
+                pass
+            return segment
+
+    @staticmethod
+    def _unlink(segment):
+        """Unlink an untracked segment; returns False if it was already gone"""
+        if not hasattr(segment, '_track'):
+            # Python < 3.13 unlink() always unregisters; register first to balance it
+            resource_tracker.register(segment._name, 'shared_memory')
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            if not hasattr(segment, '_track'):
+                resource_tracker.unregister(segment._name, 'shared_memory')
+            return False
+        return True
+
+    @classmethod
+    def unlink_segment(cls, segment_name="pytz_buddy_cache"):
+        """Remove a segment by name; returns False if it did not exist"""
+        if shared_memory is None:
+            return False
+        try:
+            segment = cls._open(segment_name)
+        except FileNotFoundError:
+            return False
+        segment.close()
+        return cls._unlink(segment)
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialize writers across processes"""
+        if self._lock is not None:
+            with self._lock:
+                yield
+            return
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryBackend needs a lock argument on this platform")
+        with open(self._lock_path, 'a') as lock_handle:
+            fcntl.flock(lock_handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_handle.fileno(), fcntl.LOCK_UN)
+
+    def _read(self):
+        """Get the current entries, decoding the payload only if it changed"""
+        buf = self._segment.buf
+        for attempt in range(100):
+            sequence, length = self.HEADER.unpack_from(buf, 0)
+            if sequence == self._seen_sequence:
+                return self._entries
+            if sequence % 2:
+                # A writer is mid-update; let it finish
+                time.sleep(0 if attempt < 10 else 0.001)
+                continue
+            payload = bytes(buf[self.HEADER.size:self.HEADER.size + length])
+            if self.HEADER.unpack_from(buf, 0)[0] != sequence:
+                continue
+            self._entries = json.loads(payload.decode('utf-8'))
+            self._seen_sequence = sequence
+            return self._entries
+
+        # Heavy write contention: read under the writers' lock instead
+        with self._write_lock():
+            sequence, length = self.HEADER.unpack_from(buf, 0)
+            payload = bytes(buf[self.HEADER.size:self.HEADER.size + length])
+            self._entries = json.loads(payload.decode('utf-8'))
+            self._seen_sequence = sequence
+            return self._entries
+
+    def _update(self, update):
+        """Apply update(entries) -> entries under the write lock"""
+        buf = self._segment.buf
+        with self._write_lock():
+            entries = dict(self._read())
+            result = update(entries)
+            if result is None:
+                return
+            entries = self._trim(result)
+
+            capacity = self._segment.size - self.HEADER.size
+            payload = json.dumps(entries, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            while len(payload) > capacity and entries:
+                # Segment full: drop the oldest entries until the rest fit
+                oldest = min(entries, key=lambda key: entries[key]['cached_at'])
+                del entries[oldest]
+                payload = json.dumps(entries, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+            sequence = self.HEADER.unpack_from(buf, 0)[0]
+            self.HEADER.pack_into(buf, 0, sequence + 1, 0)
+            buf[self.HEADER.size:self.HEADER.size + len(payload)] = payload
+            self.HEADER.pack_into(buf, 0, sequence + 2, len(payload))
+            self._entries = entries
+            self._seen_sequence = sequence + 2
+
+    def get(self, key):
+        return self._read().get(key)
+
+    def put(self, key, entry):
+        def update(entries):
+            entries[key] = entry
+            return entries
+
+        self._update(update)
+
+    def delete_many(self, keys):
+        removed = []
+
+        def update(entries):
+            for key in keys:
+                if entries.pop(key, None) is not None:
+                    removed.append(key)
+            return entries if removed else None
+
+        self._update(update)
+        return len(removed)
+
+    def scan(self):
+        return list(self._read().items())
+
+    def clear(self):
+        self._update(lambda entries: {})
+
+    def stats(self):
+        length = self.HEADER.unpack_from(self._segment.buf, 0)[1]
+        return {
+            'backend': self.name,
+            'entries': len(self._read()),
+            'segment': self.segment_name,
+            'bytes_used': length,
+            'capacity_bytes': self._segment.size - self.HEADER.size
+        }
+
+    def close(self, unlink=False):
+        """Detach from the segment; unlink=True also removes it for every process"""
+        self._entries = {}
+        self._seen_sequence = None
+        self._segment.close()
+        if unlink:
+            self._unlink(self._segment)
+
+
+CACHE_BACKENDS = {
+    JsonFileBackend.name: JsonFileBackend,
+    DictBackend.name: DictBackend,
+    SharedMemoryBackend.name: SharedMemoryBackend,
+}
+
+DEFAULT_CACHE_BACKEND = JsonFileBackend.name
+
+
+def get_cache_backend(name, cache_manager, **options):
+    """Create a location cache backend by name for a CacheManager"""
+    name = name or DEFAULT_CACHE_BACKEND
+    if name == JsonFileBackend.name:
+        return JsonFileBackend(cache_manager, **options)
+    backend_class = CACHE_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(
+            f"Unknown cache backend '{name}'. Choose from: {', '.join(CACHE_BACKENDS)}"
+        )
+    return backend_class(**options)
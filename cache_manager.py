@@ -5,30 +5,219 @@ Handles persistent storage of search history and location geocoding results
 """
 
 import json
+import logging
 import os
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
+import pytz
+
+from cache_backends import CACHE_BACKENDS, DEFAULT_CACHE_BACKEND, get_cache_backend
+from location_keys import key_hit_rates, legacy_location_key, normalize_location_key
+from zone_backends import available_backends
+
+try:
+    import fcntl
+except ImportError:  # Windows: atomic renames only, no advisory locking
+    fcntl = None
+
+logger = logging.getLogger("pytz_buddy")
+
+
+def _process_umask():
+    """Read the umask (os.umask can only read it by setting it)"""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Read once at import, before any threads could create files meanwhile
+_UMASK = _process_umask()
+
+
+def _match_file_mode(temp_path, filepath):
+    """Give a mkstemp file (always 0600) the mode filepath has, or a new file would get"""
+    try:
+        mode = stat.S_IMODE(os.stat(filepath).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(temp_path, mode)
+
+DEFAULT_USER_CONFIG = {
+    "business_hours": {
+        "start": 9,
+        "end": 17
+    },
+    "preferred_timezones": [
+        "US/Eastern", "US/Central", "US/Mountain", "US/Pacific",
+        "Europe/London", "Europe/Paris", "Asia/Tokyo", "UTC"
+    ],
+    "date_format": "%Y-%m-%d",
+    "time_format": "24h",  # "24h" or "12h"
+    "export_format": "txt",
+    "zone_backend": "pytz",  # "pytz", "zoneinfo" or "precomputed"
+    "cache_backend": DEFAULT_CACHE_BACKEND,  # "json", "memory" or "shared_memory"
+    "geocoder_endpoint": "",  # empty for public Nominatim, or e.g. "http://127.0.0.1:8088"
+    "timezone_finder_mode": "file",  # "file", "mmap" or "memory"
+    "timezone_aliases": {},  # lowercase alias -> IANA zone, checked before shortcuts
+    "log_level": "WARNING",  # level of the "pytz_buddy" logger: DEBUG, INFO, WARNING or ERROR
+    "history_limit": 20
+}
+
+
+def _valid_business_hours(value):
+    """Business hours are {'start': int, 'end': int} with 0 <= start < end <= 24"""
+    return (isinstance(value, dict)
+            and isinstance(value.get('start'), int) and isinstance(value.get('end'), int)
+            and 0 <= value['start'] < value['end'] <= 24)
+
+
+# Checks applied when config is loaded or updated; failing values fall back to defaults
+CONFIG_VALIDATORS = {
+    "business_hours": _valid_business_hours,
+    "preferred_timezones": lambda value: isinstance(value, list) and all(isinstance(z, str) for z in value),
+    "date_format": lambda value: isinstance(value, str),
+    "time_format": lambda value: value in ("24h", "12h"),
+    "export_format": lambda value: value in ("txt", "json"),
+    "zone_backend": lambda value: value in available_backends(),
+    "cache_backend": lambda value: value in CACHE_BACKENDS,
+    "geocoder_endpoint": lambda value: isinstance(value, str),
+    "timezone_finder_mode": lambda value: value in ("file", "mmap", "memory"),
+    "timezone_aliases": lambda value: isinstance(value, dict) and all(
+        isinstance(alias, str) and alias == alias.lower() and zone in pytz.all_timezones_set
+        for alias, zone in value.items()
+    ),
+    "log_level": lambda value: value in ("DEBUG", "INFO", "WARNING", "ERROR"),
+    "history_limit": lambda value: isinstance(value, int) and not isinstance(value, bool) and value > 0,
+}
+
+
 class CacheManager:
-    def __init__(self, cache_dir=".pytz_cache"):
-        """Initialize cache manager with specified cache directory"""
+    def __init__(self, cache_dir=".pytz_cache", history_limit=None, location_backend=None):
+        """Initialize cache manager with specified cache directory
+        
+        location_backend is a CacheBackend instance or name ('json',
+        'memory', 'shared_memory'); by default the cache_backend setting
+        from user config is used.
+        """
         self.cache_dir = cache_dir
-        self.history_file = os.path.join(cache_dir, "search_history.json")
+        # Append-only log: one JSON-encoded search per line, oldest first
+        self.history_file = os.path.join(cache_dir, "search_history.log")
+        self.legacy_history_file = os.path.join(cache_dir, "search_history.json")
         self.location_cache_file = os.path.join(cache_dir, "location_cache.json")
         self.cache_duration_days = 30  # Cache geocoding results for 30 days
+        self.refresh_ahead_days = 3  # Refresh popular entries this close to expiry
+        self.stale_grace_days = 7  # Serve expired entries this long while refreshing
+        self.history_limit = history_limit or 20  # Unique searches kept in history
+        # Compact the log once this many appends accumulate beyond the limit
+        self.history_compaction_slack = 100
+        self._history_appends = 0
+        
+        # Results of background/explicit sweeps, reported by get_cache_stats
+        self._last_sweep = None
+        self._total_reclaimed_bytes = 0
+        
+        # In-memory copy of location_cache.json, valid while the file stamp matches
+        self._location_index = None
+        self._location_index_stamp = None
+        self._location_index_loader = None
+        
+        # Learned aliases: normalized key -> key of the entry at the same coordinates
+        self.location_aliases_file = os.path.join(cache_dir, "location_aliases.json")
+        self._location_aliases = None
+        self._location_aliases_stamp = None
+        # Location lookups this session; normalized_hits would have missed on raw keys
+        self.location_lookup_stats = {'lookups': 0, 'hits': 0, 'normalized_hits': 0}
+        
+        # Meeting/overlap results keyed by their inputs; see schedule_cache_key()
+        self.schedule_cache_file = os.path.join(cache_dir, "schedule_cache.json")
+        self.schedule_cache_limit = 500  # Most recently computed results kept
+        self._schedule_results = None
+        self._schedule_results_stamp = None
+        self.schedule_lookup_stats = {'lookups': 0, 'hits': 0}
+        
+        # Validated snapshot of user_config.json, reloaded when its stamp changes
+        self.config_file = os.path.join(cache_dir, "user_config.json")
+        self.config_check_interval = 1.0
+        self._config = None
+        self._config_stamp = None
+        self._config_checked_at = 0.0
+        self._config_listeners = []
+        self._config_lock = threading.RLock()
         
         # Create cache directory if it doesn't exist
         os.makedirs(cache_dir, exist_ok=True)
         
         # Initialize cache files if they don't exist
         self._init_cache_files()
+        
+        if history_limit is None:
+            self.history_limit = self.get_user_config()['history_limit']
+            self.add_config_listener(self._apply_history_limit)
+        
+        if location_backend is None or isinstance(location_backend, str):
+            backend_name = location_backend or self.get_user_config().get('cache_backend')
+            try:
+                location_backend = get_cache_backend(backend_name, self)
+            except (ValueError, RuntimeError, OSError) as e:
+                logger.warning("Cache backend %r unavailable (%s); using %s", backend_name, e, DEFAULT_CACHE_BACKEND)
+                location_backend = get_cache_backend(DEFAULT_CACHE_BACKEND, self)
+        self.location_backend = location_backend
+    
+    def _apply_history_limit(self, config, previous):
+        """Config listener keeping history_limit in step with user config"""
+        self.history_limit = config['history_limit']
     
     def _init_cache_files(self):
         """Initialize cache files with empty structures if they don't exist"""
+        if not os.path.exists(self.location_cache_file):
+            # Another worker may create the file first; never clobber it
+            self._update_json(self.location_cache_file, lambda data: None if data else {})
+        
         if not os.path.exists(self.history_file):
-            self._write_json(self.history_file, [])
+            self._migrate_legacy_history()
+    
+    def _migrate_legacy_history(self):
+        """Convert an old search_history.json list into the append-only log"""
+        with self._file_lock(self.history_file):
+            if os.path.exists(self.history_file):
+                return
+            legacy = []
+            if os.path.exists(self.legacy_history_file):
+                legacy = self._read_json(self.legacy_history_file)
+                if not isinstance(legacy, list):
+                    legacy = []
+            # The JSON list was most-recent-first; the log is oldest-first
+            if self._write_history_log(list(reversed(legacy))) and legacy:
+                try:
+                    os.remove(self.legacy_history_file)
+                except OSError:
+                    pass
+    
+    @contextmanager
+    def _file_lock(self, filepath):
+        """Hold an exclusive advisory lock for read-modify-write of filepath"""
+        if fcntl is None:
+            yield
+            return
         
-        if not os.path.exists(self.location_cache_file):
-            self._write_json(self.location_cache_file, {})
+        try:
+            lock_handle = open(filepath + ".lock", 'a')
+        except OSError:
+            # Can't create lock files (e.g., read-only filesystem)
+            yield
+            return
+        
+        try:
+            fcntl.flock(lock_handle.fileno(), fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(lock_handle.fileno(), fcntl.LOCK_UN)
+            lock_handle.close()
     
     def _read_json(self, filepath):
         """Safely read JSON file"""
@@ -39,142 +228,558 @@ class CacheManager:
             return {} if filepath == self.location_cache_file else []
     
     def _write_json(self, filepath, data):
-        """Safely write JSON file"""
+        """Safely write JSON file via a temp file and atomic rename"""
+        temp_path = None
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
+            fd, temp_path = tempfile.mkstemp(
+                prefix=os.path.basename(filepath) + ".",
+                suffix=".tmp",
+                dir=os.path.dirname(filepath) or "."
+            )
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
-            return True
+            # Readers never see a partial file: they get the old or the new one
+            _match_file_mode(temp_path, filepath)
+            stamp = self._file_stamp(temp_path)
+            os.replace(temp_path, filepath)
         except (PermissionError, OSError):
             # Silently fail if we can't write (e.g., read-only filesystem)
+            if temp_path and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            if filepath == self.location_cache_file:
+                self._location_index = None
+                self._location_index_loader = None
+            return False
+        
+        if filepath == self.location_cache_file:
+            self._location_index = data
+            self._location_index_stamp = stamp
+            self._location_index_loader = None
+        return True
+    
+    def _update_json(self, filepath, update):
+        """Read-modify-write a JSON file under lock, merging with other workers
+        
+        update receives the latest on-disk data and returns the data to write,
+        or None to leave the file untouched.
+        """
+        with self._file_lock(filepath):
+            if filepath == self.location_cache_file:
+                data = self._load_location_cache()
+            else:
+                data = self._read_json(filepath)
+            new_data = update(data)
+            if new_data is None:
+                return data
+            self._write_json(filepath, new_data)
+            return new_data
+    
+    def _file_stamp(self, filepath):
+        """Get (mtime_ns, size, inode) of a file, or None if missing"""
+        try:
+            file_stat = os.stat(filepath)
+            return (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+        except OSError:
+            return None
+    
+    def location_cache_stamp(self):
+        """Get the stamp of the location cache file, or None if missing"""
+        return self._file_stamp(self.location_cache_file)
+    
+    def _load_location_cache(self):
+        """Get the location cache, re-reading the file only when it changed"""
+        stamp = self.location_cache_stamp()
+        loader, self._location_index_loader = self._location_index_loader, None
+        if loader is not None and self._location_index is None and stamp == self._location_index_stamp:
+            try:
+                self._location_index = loader()
+            except ValueError:
+                self._location_index = None
+        if self._location_index is None or stamp != self._location_index_stamp:
+            self._location_index = self._read_json(self.location_cache_file)
+            self._location_index_stamp = stamp
+        return self._location_index
+    
+    def seed_location_index(self, entries, stamp):
+        """Install a pre-built location index if it matches the file on disk
+        
+        entries may be a callable returning the index, called on first use.
+        """
+        if stamp is None or tuple(stamp) != self.location_cache_stamp():
             return False
+        if callable(entries):
+            self._location_index, self._location_index_loader = None, entries
+        else:
+            self._location_index, self._location_index_loader = entries, None
+        self._location_index_stamp = tuple(stamp)
+        return True
+    
+    def _read_history_log(self):
+        """Read every search in the history log, oldest first"""
+        entries = []
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Skip a torn final line left by an interrupted write
+                        continue
+        except (FileNotFoundError, PermissionError):
+            pass
+        return entries
+    
+    def _write_history_log(self, entries):
+        """Atomically replace the history log with the given entries, oldest first"""
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(
+                prefix=os.path.basename(self.history_file) + ".",
+                suffix=".tmp",
+                dir=self.cache_dir
+            )
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            _match_file_mode(temp_path, self.history_file)
+            os.replace(temp_path, self.history_file)
+            return True
+        except OSError:
+            if temp_path and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return False
+    
+    def _unique_recent(self, entries, limit):
+        """Most-recent-first unique view of an oldest-first entry list"""
+        history = []
+        seen = set()
+        for entry in reversed(entries):
+            if entry not in seen:
+                seen.add(entry)
+                history.append(entry)
+                if len(history) >= limit:
+                    break
+        return history
     
     def get_search_history(self):
-        """Get persistent search history"""
-        return self._read_json(self.history_file)
+        """Get persistent search history, most recent first"""
+        return self._unique_recent(self._read_history_log(), self.history_limit)
     
     def add_to_history(self, location):
         """Add location to persistent search history"""
-        history = self.get_search_history()
+        line = json.dumps(location, ensure_ascii=False) + "\n"
+        with self._file_lock(self.history_file):
+            try:
+                with open(self.history_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except OSError:
+                # Silently fail if we can't write (e.g., read-only filesystem)
+                return False
         
-        # Remove if already exists to avoid duplicates
-        if location in history:
-            history.remove(location)
+        self._history_appends += 1
+        if self._history_appends >= self.history_compaction_slack:
+            self.compact_history()
+        return True
+    
+    def compact_history(self):
+        """Rewrite the history log down to its most-recent-unique entries"""
+        with self._file_lock(self.history_file):
+            entries = self._read_history_log()
+            self._history_appends = 0
+            history = self._unique_recent(entries, self.history_limit)
+            if len(history) == len(entries):
+                return False
+            return self._write_history_log(list(reversed(history)))
+    
+    def location_freshness(self, cached_item):
+        """Classify a location cache entry by age
+        
+        Returns 'fresh', 'refresh' (inside the refresh-ahead window before
+        expiry), 'stale' (expired but still servable while a refresh runs)
+        or 'expired'.
+        """
+        age = datetime.now() - datetime.fromisoformat(cached_item['cached_at'])
+        expiry = timedelta(days=self.cache_duration_days)
+        if age >= expiry + timedelta(days=self.stale_grace_days):
+            return 'expired'
+        if age >= expiry:
+            return 'stale'
+        if age >= expiry - timedelta(days=self.refresh_ahead_days):
+            return 'refresh'
+        return 'fresh'
+    
+    def _load_location_aliases(self):
+        """Get the learned alias table, re-reading it only when the file changes"""
+        stamp = self._file_stamp(self.location_aliases_file)
+        if stamp is None:
+            return {}
+        if self._location_aliases is None or stamp != self._location_aliases_stamp:
+            aliases = self._read_json(self.location_aliases_file)
+            self._location_aliases = aliases if isinstance(aliases, dict) else {}
+            self._location_aliases_stamp = stamp
+        return self._location_aliases
+    
+    def _update_location_aliases(self, update):
+        """Read-modify-write the alias table; update returns the new table or None"""
+        def update_table(aliases):
+            return update(aliases if isinstance(aliases, dict) else {})
+        self._update_json(self.location_aliases_file, update_table)
+    
+    def _find_location_entry(self, location_name):
+        """Find (key, cached item) for a location name, or (key, None)
         
-        # Add to beginning of list
-        history.insert(0, location)
+        Tries the normalized key, then a learned alias, then the legacy
+        lowercase key that entries cached before normalization still use.
+        """
+        location_key = normalize_location_key(location_name)
+        cached_item = self.location_backend.get(location_key)
+        if cached_item is not None:
+            return location_key, cached_item
         
-        # Keep only last 20 searches (increased from 10 for persistence)
-        if len(history) > 20:
-            history = history[:20]
+        alias_target = self._load_location_aliases().get(location_key)
+        if alias_target is not None:
+            cached_item = self.location_backend.get(alias_target)
+            if cached_item is not None:
+                return alias_target, cached_item
         
-        self._write_json(self.history_file, history)
-        return history
+        legacy_key = legacy_location_key(location_name)
+        if legacy_key != location_key:
+            cached_item = self.location_backend.get(legacy_key)
+            if cached_item is not None:
+                return legacy_key, cached_item
+        return location_key, None
+    
+    def lookup_location(self, location_name, allow_stale=False):
+        """Get (cached data, freshness) for a location, or (None, None)
+        
+        With allow_stale, expired entries inside the grace window are still
+        returned so a background refresher can replace them off the request path.
+        """
+        self.location_lookup_stats['lookups'] += 1
+        location_key, cached_item = self._find_location_entry(location_name)
+        
+        if cached_item is not None:
+            freshness = self.location_freshness(cached_item)
+            # Check if cache entry is still valid; expired entries are a plain
+            # miss and are removed later by sweep(), never on the request path
+            if freshness in ('fresh', 'refresh') or (allow_stale and freshness == 'stale'):
+                self.location_lookup_stats['hits'] += 1
+                if location_key != legacy_location_key(location_name):
+                    self.location_lookup_stats['normalized_hits'] += 1
+                return cached_item['data'], freshness
+        
+        return None, None
+    
+    def peek_location(self, location_name):
+        """Get (cached data, freshness) at any age without counting a lookup, or (None, None)"""
+        cached_item = self._find_location_entry(location_name)[1]
+        if cached_item is None:
+            return None, None
+        return cached_item['data'], self.location_freshness(cached_item)
     
     def get_cached_location(self, location_name):
         """Get cached geocoding result for a location"""
-        cache = self._read_json(self.location_cache_file)
-        location_key = location_name.lower().strip()
-        
-        if location_key in cache:
-            cached_item = cache[location_key]
-            # Check if cache entry is still valid
-            cache_date = datetime.fromisoformat(cached_item['cached_at'])
-            if datetime.now() - cache_date < timedelta(days=self.cache_duration_days):
-                return cached_item['data']
-            else:
-                # Remove expired cache entry
-                del cache[location_key]
-                self._write_json(self.location_cache_file, cache)
-        
+        return self.lookup_location(location_name)[0]
+    
+    def _key_for_same_place(self, location_data, exclude_key):
+        """Key of another cached entry for the same geocoded place, or None"""
+        def place(data):
+            return (data.get('address'), round(data['latitude'], 5), round(data['longitude'], 5))
+        target = place(location_data)
+        for location_key, cached_item in self.location_backend.scan():
+            if location_key != exclude_key and place(cached_item['data']) == target:
+                return location_key
         return None
     
     def cache_location(self, location_name, location_data):
         """Cache geocoding result for a location"""
-        cache = self._read_json(self.location_cache_file)
-        location_key = location_name.lower().strip()
+        location_key = normalize_location_key(location_name)
+        
+        # A differently written name the geocoder resolved to an already cached
+        # place (same address and point) becomes an alias instead of a copy
+        canonical_key = self._key_for_same_place(location_data, location_key)
+        if canonical_key is not None:
+            self._update_location_aliases(
+                lambda aliases: None if aliases.get(location_key) == canonical_key
+                else dict(aliases, **{location_key: canonical_key})
+            )
+            location_key = canonical_key
         
-        cache[location_key] = {
+        # Backends keep the 100 most recently cached entries
+        self.location_backend.put(location_key, {
             'data': location_data,
             'cached_at': datetime.now().isoformat()
-        }
+        })
+    
+    def annotate_location(self, location_name, fields):
+        """Add fields to a cached location's data without renewing its cache date"""
+        location_key, cached_item = self._find_location_entry(location_name)
+        if cached_item is None:
+            return False
+        self.location_backend.put(location_key, {
+            'data': dict(cached_item['data'], **fields),
+            'cached_at': cached_item['cached_at']
+        })
+        return True
+    
+    def schedule_cache_key(self, kind, zones, start_hour, end_hour, duration_hours,
+                           window_start, window_days, zone_backend=None):
+        """Build the key of a meeting/overlap result from every input it depends on
         
-        # Clean up old cache entries (keep max 100 entries)
-        if len(cache) > 100:
-            # Sort by cache date and keep only the 100 most recent
-            sorted_items = sorted(
-                cache.items(), 
-                key=lambda x: x[1]['cached_at'], 
-                reverse=True
-            )
-            cache = dict(sorted_items[:100])
+        Zones are deduplicated and sorted, so the same team in any order (or
+        with two members in one zone) shares an entry. The tzdata version and
+        zone backend are part of the key, so a tzdata upgrade misses naturally.
+        """
+        return "|".join([
+            kind,
+            ",".join(sorted(set(zones))),
+            f"{start_hour}-{end_hour}",
+            f"{duration_hours}h",
+            f"{window_start.isoformat()}+{window_days}d",
+            f"tzdata {pytz.OLSON_VERSION}",
+            zone_backend or "pytz"
+        ])
+    
+    def _load_schedule_results(self):
+        """Get the schedule result cache, re-reading it only when the file changes"""
+        stamp = self._file_stamp(self.schedule_cache_file)
+        if stamp is None:
+            return {}
+        if self._schedule_results is None or stamp != self._schedule_results_stamp:
+            results = self._read_json(self.schedule_cache_file)
+            self._schedule_results = results if isinstance(results, dict) else {}
+            self._schedule_results_stamp = stamp
+        return self._schedule_results
+    
+    def get_schedule_result(self, key):
+        """Get a cached meeting/overlap result, or None"""
+        self.schedule_lookup_stats['lookups'] += 1
+        entry = self._load_schedule_results().get(key)
+        if entry is None:
+            return None
+        self.schedule_lookup_stats['hits'] += 1
+        return entry['result']
+    
+    def cache_schedule_result(self, key, result, window_end):
+        """Store a meeting/overlap result until its date window ends"""
+        entry = {
+            'result': result,
+            'window_end': window_end.isoformat(),
+            'tzdata': pytz.OLSON_VERSION,
+            'cached_at': datetime.now().isoformat()
+        }
         
-        self._write_json(self.location_cache_file, cache)
+        def add_entry(results):
+            results = dict(results) if isinstance(results, dict) else {}
+            results[key] = entry
+            if len(results) > self.schedule_cache_limit:
+                newest = sorted(results.items(), key=lambda item: item[1]['cached_at'])
+                results = dict(newest[-self.schedule_cache_limit:])
+            return results
+        self._update_json(self.schedule_cache_file, add_entry)
     
     def clear_cache(self):
         """Clear all cached data"""
-        self._write_json(self.history_file, [])
-        self._write_json(self.location_cache_file, {})
+        with self._file_lock(self.history_file):
+            self._write_history_log([])
+        self.location_backend.clear()
+        for filepath in (self.location_aliases_file, self.schedule_cache_file):
+            with self._file_lock(filepath):
+                self._write_json(filepath, {})
         return True
     
+    def sweep(self, temp_file_age_seconds=3600):
+        """Remove expired entries in bulk and compact cache storage
+        
+        Drops location entries past their stale grace window, compacts the
+        history log and deletes temp files left behind by crashed writers.
+        Returns a report that is also kept for get_cache_stats.
+        """
+        size_before = self._get_cache_size_bytes()
+        
+        expired = [
+            location_key for location_key, cached_item in self.location_backend.scan()
+            if self.location_freshness(cached_item) == 'expired'
+        ]
+        # One bulk delete rather than a rewrite per expired entry
+        removed = self.location_backend.delete_many(expired) if expired else 0
+        
+        # Drop learned aliases whose entry is gone
+        live_keys = {location_key for location_key, _ in self.location_backend.scan()}
+        self._update_location_aliases(lambda aliases: {
+            alias: target for alias, target in aliases.items() if target in live_keys
+        } if any(target not in live_keys for target in aliases.values()) else None)
+        
+        # Schedule results whose date window is over or whose tzdata is outdated
+        today = datetime.now().date().isoformat()
+        def drop_outdated(results):
+            if not isinstance(results, dict):
+                return {}
+            kept = {
+                key: entry for key, entry in results.items()
+                if entry.get('window_end', '') >= today and entry.get('tzdata') == pytz.OLSON_VERSION
+            }
+            return kept if len(kept) != len(results) else None
+        schedule_before = len(self._load_schedule_results())
+        schedule_removed = schedule_before - len(self._update_json(self.schedule_cache_file, drop_outdated))
+        
+        history_lines = len(self._read_history_log())
+        self.compact_history()
+        history_removed = history_lines - len(self._read_history_log())
+        
+        temp_files_removed = 0
+        now = time.time()
+        try:
+            for filename in os.listdir(self.cache_dir):
+                if not (filename.endswith(".tmp") or ".tmp." in filename):
+                    continue
+                filepath = os.path.join(self.cache_dir, filename)
+                try:
+                    if now - os.path.getmtime(filepath) >= temp_file_age_seconds:
+                        os.remove(filepath)
+                        temp_files_removed += 1
+                except OSError:
+                    continue
+        except OSError:
+            pass
+        
+        report = {
+            'swept_at': datetime.now().isoformat(),
+            'expired_locations_removed': removed,
+            'schedule_results_removed': max(0, schedule_removed),
+            'history_entries_removed': max(0, history_removed),
+            'temp_files_removed': temp_files_removed,
+            'reclaimed_bytes': max(0, size_before - self._get_cache_size_bytes())
+        }
+        self._last_sweep = report
+        self._total_reclaimed_bytes += report['reclaimed_bytes']
+        return report
+    
     def get_cache_stats(self):
         """Get cache statistics for debugging"""
         history = self.get_search_history()
-        cache = self._read_json(self.location_cache_file)
+        backend_stats = self.location_backend.stats()
         
         return {
             'history_count': len(history),
-            'cached_locations': len(cache),
+            'cached_locations': backend_stats['entries'],
+            'cache_backend': backend_stats,
             'cache_dir': self.cache_dir,
-            'cache_size_mb': self._get_cache_size_mb()
+            'cache_size_mb': self._get_cache_size_mb(),
+            'last_sweep': self._last_sweep,
+            'reclaimed_bytes': self._total_reclaimed_bytes,
+            'location_lookups': dict(self.location_lookup_stats),
+            'learned_aliases': len(self._load_location_aliases()),
+            'schedule_results': len(self._load_schedule_results()),
+            'schedule_lookups': dict(self.schedule_lookup_stats),
+            # What normalized keys would have saved over raw keys on the search log
+            'key_normalization': key_hit_rates(self._read_history_log())
         }
     
-    def _get_cache_size_mb(self):
-        """Calculate total cache size in MB"""
+    def _get_cache_size_bytes(self):
+        """Calculate total size of all files in the cache directory"""
         total_size = 0
         try:
-            for filename in [self.history_file, self.location_cache_file]:
-                if os.path.exists(filename):
-                    total_size += os.path.getsize(filename)
-            return round(total_size / (1024 * 1024), 2)
+            for filename in os.listdir(self.cache_dir):
+                filepath = os.path.join(self.cache_dir, filename)
+                if os.path.isfile(filepath):
+                    total_size += os.path.getsize(filepath)
         except OSError:
-            return 0
+            pass
+        return total_size
+    
+    def _get_cache_size_mb(self):
+        """Calculate total cache size in MB"""
+        return round(self._get_cache_size_bytes() / (1024 * 1024), 2)
     
     def get_user_config(self):
-            """Get user configuration settings"""
-            config_file = os.path.join(self.cache_dir, "user_config.json")
-            default_config = {
-                "business_hours": {
-                    "start": 9,
-                    "end": 17
-                },
-                "preferred_timezones": [
-                    "US/Eastern", "US/Central", "US/Mountain", "US/Pacific",
-                    "Europe/London", "Europe/Paris", "Asia/Tokyo", "UTC"
-                ],
-                "date_format": "%Y-%m-%d",
-                "time_format": "24h",  # "24h" or "12h"
-                "export_format": "txt"
-            }
-            
-            if not os.path.exists(config_file):
-                self._write_json(config_file, default_config)
-                return default_config
-            
-            config = self._read_json(config_file)
-            # Merge with defaults for any missing keys
-            for key, value in default_config.items():
-                if key not in config:
-                    config[key] = value
-            
-            return config
+        """Get user configuration settings
+        
+        Returns the validated in-memory snapshot; the file is re-read only when
+        its stamp changes, checked at most every config_check_interval seconds.
+        Treat the returned dict as read-only and change it via update_user_config.
+        """
+        now = time.monotonic()
+        if self._config is None or now - self._config_checked_at >= self.config_check_interval:
+            self._config_checked_at = now
+            if self._config is None or self._file_stamp(self.config_file) != self._config_stamp:
+                self.reload_user_config()
+        return self._config
+    
+    def reload_user_config(self):
+        """Re-read user_config.json now if it changed, writing defaults if it is missing"""
+        with self._config_lock:
+            self._config_checked_at = time.monotonic()
+            self._reload_user_config()
+        return self._config
+    
+    def _reload_user_config(self):
+        """Load user_config.json into the snapshot (caller holds _config_lock)"""
+        stamp = self._file_stamp(self.config_file)
+        if stamp is None:
+            with self._file_lock(self.config_file):
+                if not os.path.exists(self.config_file):
+                    self._write_json(self.config_file, DEFAULT_USER_CONFIG)
+            stamp = self._file_stamp(self.config_file)
         
+        if self._config is not None and stamp == self._config_stamp:
+            return
+        self._set_config(self._validate_config(self._read_json(self.config_file)), stamp)
+    
+    def _validate_config(self, config):
+        """Merge config with defaults, replacing missing or invalid values"""
+        if not isinstance(config, dict):
+            config = {}
+        validated = dict(config)
+        for key, default in DEFAULT_USER_CONFIG.items():
+            value = config.get(key, default)
+            if key in CONFIG_VALIDATORS and not CONFIG_VALIDATORS[key](value):
+                logger.warning("Invalid %r in user_config.json; using default %r", key, default)
+                value = default
+            elif key == 'preferred_timezones':
+                value = [zone for zone in value if zone in pytz.all_timezones_set] or default
+            validated[key] = value
+        return validated
+    
+    def _set_config(self, config, stamp):
+        """Install a new config snapshot and notify listeners if it changed"""
+        previous = self._config
+        self._config = config
+        self._config_stamp = stamp
+        if previous is not None and previous != config:
+            for listener in list(self._config_listeners):
+                listener(config, previous)
+    
+    def add_config_listener(self, listener):
+        """Call listener(config, previous) whenever the config snapshot changes"""
+        self._config_listeners.append(listener)
+    
+    def remove_config_listener(self, listener):
+        """Stop notifying a listener added with add_config_listener"""
+        if listener in self._config_listeners:
+            self._config_listeners.remove(listener)
+    
     def update_user_config(self, key, value):
-            """Update a specific configuration setting"""
-            config_file = os.path.join(self.cache_dir, "user_config.json")
-            config = self.get_user_config()
-            
-            if key in config:
-                config[key] = value
-                return self._write_json(config_file, config)
+        """Update a specific configuration setting"""
+        if key not in DEFAULT_USER_CONFIG:
+            return False
+        if key in CONFIG_VALIDATORS and not CONFIG_VALIDATORS[key](value):
             return False
-    
\ No newline at end of file
+        
+        with self._config_lock:
+            # Re-read under lock so concurrent edits to other keys survive
+            with self._file_lock(self.config_file):
+                config = self._validate_config(self._read_json(self.config_file))
+                config[key] = value
+                if not self._write_json(self.config_file, config):
+                    return False
+                stamp = self._file_stamp(self.config_file)
+            self._set_config(config, stamp)
+            self._config_checked_at = time.monotonic()
+        return True
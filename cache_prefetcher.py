@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Cache Prefetcher for PyTZ Buddy
+Speculative warm-up after startup: while the prompt waits for the first
+query, a daemon thread loads what that query is likely to need (the
+TimezoneFinder data, recent searches, preferred zones), so a repeat of a
+history item does not pay cold-start costs.
+"""
+
+import threading
+from datetime import datetime, timezone
+
+from location_keys import normalize_location_key
+
+
+class CachePrefetcher:
+    def __init__(self, converter, refresher=None, history_limit=None):
+        """Initialize prefetcher for a converter's cache, finder and zones
+
+        Locations that need the geocoder (missing from the cache, stale or
+        expired) are queued on the refresher, which owns the geocoder rate
+        limit; without one they are left for the first real lookup.
+        """
+        self.converter = converter
+        self.cache_manager = converter.cache_manager
+        self.refresher = refresher
+        self.history_limit = history_limit
+        self.stats = {'zones_warmed': 0, 'locations_warmed': 0, 'timezones_resolved': 0,
+                      'geocodes_scheduled': 0}
+        self.finished = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start prefetching in a daemon thread; returns at once"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self.finished.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="pytz-buddy-cache-prefetcher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Cancel prefetching; the task in progress finishes first"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def plan(self):
+        """List (kind, name) warm-up tasks, most likely to be needed first"""
+        history = self.cache_manager.get_search_history()
+        if self.history_limit is not None:
+            history = history[:self.history_limit]
+        tasks = [('finder', None)]
+        tasks += [('location', location) for location in history]
+        tasks += [('zone', zone_name) for zone_name in self.converter.major_timezones]
+
+        # Cached entries that the next lookup of them would have to fix up
+        planned = {normalize_location_key(location) for location in history}
+        for location_key, cached_item in self.cache_manager.location_backend.scan():
+            if location_key in planned:
+                continue
+            data = cached_item['data']
+            freshness = self.cache_manager.location_freshness(cached_item)
+            if freshness in ('stale', 'expired') or not self._has_current_timezone(data):
+                tasks.append(('location', location_key))
+        return tasks
+
+    def prefetch_zone(self, zone_name):
+        """Load a zone's offset data into the zone backend"""
+        self.converter.zone_backend.from_utc(datetime.now(timezone.utc).replace(tzinfo=None), zone_name)
+        self.stats['zones_warmed'] += 1
+
+    def prefetch_location(self, location_name):
+        """Warm one location: its alias or cache entry, its timezone and zone data"""
+        zone_name = self.converter.resolve_alias(location_name)[0]
+        if zone_name:
+            self.prefetch_zone(zone_name)
+            return
+
+        # peek_location leaves the session's hit statistics alone
+        location_data, freshness = self.cache_manager.peek_location(location_name)
+        if location_data is None or freshness in ('stale', 'expired'):
+            if self.refresher is not None and self.refresher.schedule(location_name):
+                self.stats['geocodes_scheduled'] += 1
+            if location_data is None:
+                return
+
+        if not self._has_current_timezone(location_data):
+            zone_name = self.converter.resolve_timezone(location_name, location_data)
+            self.stats['timezones_resolved'] += 1
+        else:
+            zone_name = location_data['timezone']
+        self.prefetch_zone(zone_name)
+        self.stats['locations_warmed'] += 1
+
+    def _has_current_timezone(self, location_data):
+        return (location_data.get('timezone')
+                and location_data.get('timezonefinder_version') == self.converter.timezonefinder_version)
+
+    def _run(self):
+        """Worker loop: run the plan until it is done or prefetching is cancelled"""
+        try:
+            for kind, name in self.plan():
+                if self._stop_event.is_set():
+                    break
+                try:
+                    if kind == 'finder':
+                        self.converter.warm_timezone_finder()
+                    elif kind == 'zone':
+                        self.prefetch_zone(name)
+                    else:
+                        self.prefetch_location(name)
+                except Exception:
+                    # Prefetching is best effort; the real lookup will retry
+                    continue
+        finally:
+            self.finished.set()
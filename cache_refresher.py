@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Cache Refresher for PyTZ Buddy
+Background refresh-ahead for popular location cache entries, so that a
+frequently used location is re-geocoded before it expires instead of
+inside a user-facing request.
+"""
+
+import queue
+import threading
+import time
+
+from geopy.extra.rate_limiter import RateLimiter
+
+from location_keys import normalize_location_key
+
+
+class CacheRefresher:
+    def __init__(self, converter, min_hits=2, min_delay_seconds=1.0, scan_interval=300):
+        """Initialize refresher for a converter's geocoder and cache
+
+        min_delay_seconds keeps refresh traffic within Nominatim's usage
+        policy of one request per second.
+        """
+        self.converter = converter
+        self.cache_manager = converter.cache_manager
+        self.min_hits = min_hits
+        self.scan_interval = scan_interval
+        # Looked up per call so a changed geocoder endpoint is used at once
+        self.geocode = RateLimiter(
+            lambda query: converter.geolocator.geocode(query),
+            min_delay_seconds=min_delay_seconds,
+            max_retries=0
+        )
+
+        self.hits = {}
+        self.refreshed_count = 0
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the refresher daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="pytz-buddy-cache-refresher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Stop the refresher; pending refreshes are dropped"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def record_hit(self, location_name, freshness):
+        """Count a cache hit and schedule a refresh if the entry is due"""
+        location_key = normalize_location_key(location_name)
+        with self._lock:
+            self.hits[location_key] = self.hits.get(location_key, 0) + 1
+            hits = self.hits[location_key]
+
+        # Stale entries are always refreshed; near-expiry ones only if popular
+        if freshness == 'stale' or (freshness == 'refresh' and hits >= self.min_hits):
+            self.schedule(location_name)
+
+    def schedule(self, location_name):
+        """Queue a location for re-geocoding unless it is already queued"""
+        location_key = normalize_location_key(location_name)
+        with self._lock:
+            if location_key in self._pending:
+                return False
+            self._pending.add(location_key)
+        self._queue.put(location_name)
+        return True
+
+    def scan(self):
+        """Queue every popular entry that has entered its refresh window"""
+        scheduled = 0
+        for location_key, cached_item in self.cache_manager.location_backend.scan():
+            if self.hits.get(location_key, 0) < self.min_hits:
+                continue
+            if self.cache_manager.location_freshness(cached_item) in ('refresh', 'stale'):
+                scheduled += self.schedule(location_key)
+        return scheduled
+
+    def refresh(self, location_name):
+        """Re-geocode one location and replace its cache entry"""
+        location = self.geocode(location_name)
+        if not location:
+            return False
+        self.cache_manager.cache_location(location_name, self.converter.build_location_data(location))
+        self.refreshed_count += 1
+        return True
+
+    def _run(self):
+        """Worker loop: drain the refresh queue and rescan periodically"""
+        next_scan = time.monotonic() + self.scan_interval
+        while not self._stop_event.is_set():
+            timeout = max(0.0, next_scan - time.monotonic())
+            try:
+                location_name = self._queue.get(timeout=min(timeout, 1.0))
+            except queue.Empty:
+                if time.monotonic() >= next_scan:
+                    self.scan()
+                    next_scan = time.monotonic() + self.scan_interval
+                continue
+
+            try:
+                self.refresh(location_name)
+            except Exception:
+                # A failed refresh leaves the old entry to be served or retried
+                pass
+            finally:
+                with self._lock:
+                    self._pending.discard(normalize_location_key(location_name))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Cache Sweeper for PyTZ Buddy
+Runs CacheManager.sweep() on a schedule in a daemon thread, so expired
+entries are removed and storage compacted without any request paying
+for the cleanup.
+"""
+
+import threading
+
+
+class CacheSweeper:
+    def __init__(self, cache_manager, interval_seconds=3600, initial_delay_seconds=60):
+        """Initialize sweeper for a cache manager"""
+        self.cache_manager = cache_manager
+        self.interval_seconds = interval_seconds
+        self.initial_delay_seconds = initial_delay_seconds
+        self.sweep_count = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the sweeper daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="pytz-buddy-cache-sweeper", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Stop the sweeper thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        """Worker loop: wait, sweep, repeat until stopped"""
+        delay = self.initial_delay_seconds
+        while not self._stop_event.wait(delay):
+            try:
+                self.cache_manager.sweep()
+                self.sweep_count += 1
+            except Exception:
+                # A failed sweep just leaves the work for the next one
+                pass
+            delay = self.interval_seconds
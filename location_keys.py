@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Location Keys for PyTZ Buddy
+Canonical cache keys for typed location names, so near-duplicates such as
+"Paris, France", "paris,france", "Paris  France" and "Paris, FR" share
+one location cache entry instead of each costing a geocoder round trip.
+"""
+
+import re
+import unicodedata
+
+# ISO country codes and common short forms, expanded after the first word
+COUNTRY_ABBREVIATIONS = {
+    'us': 'united states', 'usa': 'united states', 'uk': 'united kingdom', 'gb': 'united kingdom',
+    'fr': 'france', 'de': 'germany', 'es': 'spain', 'it': 'italy', 'nl': 'netherlands',
+    'be': 'belgium', 'ch': 'switzerland', 'at': 'austria', 'se': 'sweden', 'no': 'norway',
+    'dk': 'denmark', 'fi': 'finland', 'ie': 'ireland', 'pt': 'portugal', 'pl': 'poland',
+    'cz': 'czechia', 'gr': 'greece', 'tr': 'turkey', 'ru': 'russia', 'ua': 'ukraine',
+    'in': 'india', 'cn': 'china', 'jp': 'japan', 'kr': 'south korea', 'sg': 'singapore',
+    'hk': 'hong kong', 'tw': 'taiwan', 'th': 'thailand', 'vn': 'vietnam', 'id': 'indonesia',
+    'my': 'malaysia', 'ph': 'philippines', 'au': 'australia', 'nz': 'new zealand',
+    'ca': 'canada', 'mx': 'mexico', 'br': 'brazil', 'ar': 'argentina', 'cl': 'chile',
+    'co': 'colombia', 'pe': 'peru', 'za': 'south africa', 'eg': 'egypt', 'ng': 'nigeria',
+    'ke': 'kenya', 'ae': 'united arab emirates', 'uae': 'united arab emirates',
+    'sa': 'saudi arabia', 'il': 'israel',
+}
+
+US_STATE_ABBREVIATIONS = {
+    'al': 'alabama', 'ak': 'alaska', 'az': 'arizona', 'ar': 'arkansas', 'ca': 'california',
+    'co': 'colorado', 'ct': 'connecticut', 'de': 'delaware', 'dc': 'district of columbia',
+    'fl': 'florida', 'ga': 'georgia', 'hi': 'hawaii', 'id': 'idaho', 'il': 'illinois',
+    'in': 'indiana', 'ia': 'iowa', 'ks': 'kansas', 'ky': 'kentucky', 'la': 'louisiana',
+    'me': 'maine', 'md': 'maryland', 'ma': 'massachusetts', 'mi': 'michigan', 'mn': 'minnesota',
+    'ms': 'mississippi', 'mo': 'missouri', 'mt': 'montana', 'ne': 'nebraska', 'nv': 'nevada',
+    'nh': 'new hampshire', 'nj': 'new jersey', 'nm': 'new mexico', 'ny': 'new york',
+    'nc': 'north carolina', 'nd': 'north dakota', 'oh': 'ohio', 'ok': 'oklahoma', 'or': 'oregon',
+    'pa': 'pennsylvania', 'ri': 'rhode island', 'sc': 'south carolina', 'sd': 'south dakota',
+    'tn': 'tennessee', 'tx': 'texas', 'ut': 'utah', 'vt': 'vermont', 'va': 'virginia',
+    'wa': 'washington', 'wv': 'west virginia', 'wi': 'wisconsin', 'wy': 'wyoming',
+}
+
+# Codes that are both a state and a country (CA, DE, IN, ...) are left as typed
+QUALIFIER_EXPANSIONS = {
+    code: name
+    for table in (COUNTRY_ABBREVIATIONS, US_STATE_ABBREVIATIONS)
+    for code, name in table.items()
+    if not (code in COUNTRY_ABBREVIATIONS and code in US_STATE_ABBREVIATIONS)
+}
+
+_SEPARATORS = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def fold_text(text):
+    """Casefold and strip accents: "São Paulo" -> "sao paulo\""""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize_location_key(location_name):
+    """Canonical cache key for a typed location name
+
+    Casefolds, folds accents, turns punctuation into spaces, collapses
+    whitespace and expands country/state abbreviations after the first
+    word ("Paris, FR" -> "paris france"; a leading "LA" stays a city).
+    """
+    words = _SEPARATORS.sub(' ', fold_text(location_name)).split()
+    expanded = words[:1]
+    for word in words[1:]:
+        expanded.append(QUALIFIER_EXPANSIONS.get(word, word))
+    return ' '.join(expanded)
+
+
+def legacy_location_key(location_name):
+    """The key used before normalization: lowercase and trimmed"""
+    return location_name.lower().strip()
+
+
+def key_hit_rates(queries):
+    """Hit rates a query log would get with legacy keys vs normalized keys
+
+    Replays the queries against an initially empty cache, counting a hit
+    whenever an earlier query produced the same key. Returns a dict with
+    'queries', 'legacy_hit_rate' and 'normalized_hit_rate' (0.0-1.0).
+    """
+    seen_legacy, seen_normalized = set(), set()
+    legacy_hits = normalized_hits = 0
+    for query in queries:
+        legacy, normalized = legacy_location_key(query), normalize_location_key(query)
+        legacy_hits += legacy in seen_legacy
+        normalized_hits += normalized in seen_normalized
+        seen_legacy.add(legacy)
+        seen_normalized.add(normalized)
+    total = len(queries)
+    return {
+        'queries': total,
+        'legacy_hit_rate': legacy_hits / total if total else 0.0,
+        'normalized_hit_rate': normalized_hits / total if total else 0.0
+    }
@@ -9,7 +9,19 @@ Usage:
 Then enter a location when prompted (e.g., "Duncan, Oklahoma")
 """
 
+import json
+import logging
+from datetime import datetime
+
 from timezone_converter import TimezoneConverter
+from cache_backends import CACHE_BACKENDS, get_cache_backend
+from timezone_finders import TIMEZONE_FINDER_MODES
+from zone_backends import available_backends
+from warm_snapshot import default_snapshot_path, save_snapshot
+from cache_refresher import CacheRefresher
+from cache_prefetcher import CachePrefetcher
+from cache_sweeper import CacheSweeper
+from batch_scheduler import load_teams, run_batch
 
 def main():
     print("\n")
@@ -24,8 +36,12 @@ def main():
     print("  • 'convert [time] [timezone]' - Convert specific time (e.g., 'convert 14:30 EST')")
     print("  • 'meeting [location1] [location2] ...' - Find meeting times")
     print("  • 'overlap [location1] [location2] ...' - Business hours overlap")
+    print("  • 'recurring [day] [time] [organizer] [location1] ...' - DST drift of a weekly meeting")
+    print("  • 'oncall [team@hours ...] [from] [to]' - Follow-the-sun on-call coverage")
+    print("  • 'batch [teams file] [output.jsonl]' - Meetings and overlap for many teams")
     print("  • 'config [setting] [value]' - Configure preferences")
     print("  • 'history' - View your recent searches")
+    print("  • 'cache [stats/compact]' - Show cache statistics or clean up now")
     print("  • 'export [format]' - Export last result (txt/json)")
     print("  • 'help' - Show detailed command help")
     print("  • '1', '2', etc. - Repeat a search from history")
@@ -33,10 +49,23 @@ def main():
     print("  • Ctrl+C - Quick exit")
     print()
     
+    # Library messages (skipped locations, ambiguous names) at the configured log_level
+    logging.basicConfig(format="%(levelname)s: %(message)s")
+    
     # Initialize converter with integrated cache manager
     from cache_manager import CacheManager
     cache_manager = CacheManager()
-    converter = TimezoneConverter(cache_manager)
+    library_logger = logging.getLogger("pytz_buddy")
+    library_logger.setLevel(cache_manager.get_user_config()['log_level'])
+    cache_manager.add_config_listener(lambda config, previous: library_logger.setLevel(config['log_level']))
+    # Zone tables and cache index come from the last session's snapshot, if still valid
+    converter = TimezoneConverter(cache_manager, snapshot_path=default_snapshot_path(cache_manager))
+    # Re-geocode popular locations before their cache entries expire
+    converter.refresher = CacheRefresher(converter).start()
+    # Remove expired entries and compact cache files in the background
+    sweeper = CacheSweeper(cache_manager).start()
+    # Warm history, preferred zones and the timezone finder while the prompt waits
+    prefetcher = CachePrefetcher(converter, refresher=converter.refresher).start()
     
     # Store last results for export functionality
     last_results = None
@@ -46,6 +75,10 @@ def main():
             location = input("Enter location (or command): ").strip()
             
             if location.lower() in ['quit', 'exit', 'q']:
+                prefetcher.stop()
+                converter.refresher.stop()
+                sweeper.stop()
+                save_snapshot(converter)
                 print("Thanks for using PyTZ Buddy! 🌍")
                 break
             
@@ -63,6 +96,7 @@ def main():
                 print("      'convert 14:30 EST' - Convert 2:30 PM EST to all timezones")
                 print("      'convert 9:00 AM PST 2025-07-04' - With specific date")
                 print("      'convert 15:45 UTC' - Convert UTC time")
+                print("      'convert all 15:45 UTC' - Convert to every timezone, grouped by offset")
                 print()
                 print("🗓️ MEETING PLANNING:")
                 print("  • meeting [location1] [location2] ... - Find optimal meeting times")
@@ -75,18 +109,47 @@ def main():
                 print("    Examples:")
                 print("      'overlap nyc london sydney' - Check overlap")
                 print("      'overlap EST PST' - US coast overlap")
+                print("      'overlap matrix nyc london tokyo sydney' - Weekly shared hours for every pair")
+                print()
+                print("🔁 RECURRING MEETINGS:")
+                print("  • recurring [day] [time] [organizer] [location1] ... - DST drift over 12 months")
+                print("    Examples:")
+                print("      'recurring tue 10:00 chicago london tokyo' - Weekly Tuesday 10:00 Chicago time")
+                print("      'recurring 15:30 london nyc' - Same weekday as today")
+                print()
+                print("🌞 ON-CALL ROTATIONS:")
+                print("  • oncall [name=location@start-end ...] [from] [to] - 24x7 coverage, gaps and double coverage")
+                print("  • oncall teams.json [from] [to] - Teams from a JSON list of")
+                print("    {\"name\", \"location\", \"start\", \"end\", \"days\"} (days: 0=Monday; default every day)")
+                print("    Examples:")
+                print("      'oncall amer=nyc@8-16 emea=london@8-16 apac=sydney@9-17' - Next 91 days")
+                print("      'oncall teams.json 2026-01-01 2026-03-31' - One quarter")
+                print()
+                print("📦 BATCH SCHEDULING:")
+                print("  • batch [teams file] [output.jsonl] - Meeting times and overlap for every team")
+                print("    Teams file: JSON list or JSON Lines of {\"name\", \"locations\", \"business_hours\"}")
+                print("    Example: 'batch teams.json results.jsonl'")
                 print()
                 print("📋 HISTORY & EXPORT:")
                 print("  • history - Show recent searches")
                 print("  • 1, 2, 3... - Repeat numbered search from history")
                 print("  • export txt - Export last result as text file")
                 print("  • export json - Export last result as JSON file")
+                print("  • cache stats - Show cache size and cleanup statistics")
+                print("  • cache compact - Remove expired entries and compact cache files now")
                 print()
                 print("⚙️ CONFIGURATION:")
                 print("  • config - Show current settings")
                 print("  • config business_hours [start] [end] - Set business hours (e.g., 'config business_hours 8 18')")
                 print("  • config time_format [12h/24h] - Set time format (e.g., 'config time_format 12h')")
                 print("  • config export_format [txt/json] - Set default export format")
+                print("  • config zone_backend [pytz/zoneinfo/precomputed] - Choose the timezone engine")
+                print("  • config cache_backend [json/memory/shared_memory] - Choose location cache storage")
+                print("  • config geocoder_endpoint [url/default] - Use another Nominatim server (e.g. nominatim_stub.py)")
+                print("  • config timezone_finder_mode [file/mmap/memory] - Trade memory for lookup speed")
+                print("  • config alias [name] [timezone/remove] - Define your own timezone alias (e.g., 'config alias hq Europe/Berlin')")
+                print("  • config log_level [debug/info/warning/error] - How much library logging to show")
+                print("  • config history_limit [count] - Number of recent searches to keep")
                 print("  • config reset - Reset all settings to defaults")
                 print()
                 print("🎯 TIMEZONE SHORTCUTS:")
@@ -115,6 +178,44 @@ def main():
                 print("Or enter a new location to search.\n")
                 continue
             
+            # Handle cache maintenance command
+            if location.lower().split()[:1] == ['cache']:
+                parts = location.lower().split()
+                if len(parts) == 2 and parts[1] == 'compact':
+                    report = cache_manager.sweep()
+                    print("\n🧹 Cache compacted")
+                    print(f"  • Expired locations removed: {report['expired_locations_removed']}")
+                    print(f"  • History entries removed: {report['history_entries_removed']}")
+                    print(f"  • Temp files removed: {report['temp_files_removed']}")
+                    print(f"  • Reclaimed: {report['reclaimed_bytes']} bytes")
+                elif len(parts) == 1 or (len(parts) == 2 and parts[1] == 'stats'):
+                    stats = cache_manager.get_cache_stats()
+                    print("\n💾 CACHE STATISTICS")
+                    print("="*50)
+                    print(f"📁 Directory: {stats['cache_dir']} ({stats['cache_size_mb']} MB)")
+                    print(f"📍 Cached locations: {stats['cached_locations']} ({stats['cache_backend']['backend']} backend)")
+                    print(f"📝 History entries: {stats['history_count']}")
+                    lookups = stats['location_lookups']
+                    if lookups['lookups']:
+                        print(f"🎯 Location cache hits: {lookups['hits']}/{lookups['lookups']} "
+                              f"({lookups['normalized_hits']} via normalized keys, "
+                              f"{stats['learned_aliases']} learned aliases)")
+                    replay = stats['key_normalization']
+                    if replay['queries']:
+                        print(f"🔑 History replay hit rate: {replay['legacy_hit_rate']:.0%} raw keys → "
+                              f"{replay['normalized_hit_rate']:.0%} normalized keys")
+                    schedule = stats['schedule_lookups']
+                    print(f"📅 Cached schedule results: {stats['schedule_results']} "
+                          f"({schedule['hits']}/{schedule['lookups']} hits this session)")
+                    last_sweep = stats['last_sweep']
+                    print(f"🧹 Last sweep: {last_sweep['swept_at'] if last_sweep else 'not yet'}")
+                    print(f"♻️ Reclaimed this session: {stats['reclaimed_bytes']} bytes")
+                    print("="*50)
+                else:
+                    print("❌ Usage: cache [stats/compact]")
+                print()
+                continue
+            
             # Handle export command
             if location.lower().startswith('export'):
                 if not last_results:
@@ -158,6 +259,12 @@ def main():
                     print(f"📅 Business Hours: {config['business_hours']['start']}:00 - {config['business_hours']['end']}:00")
                     print(f"🕐 Time Format: {config['time_format']}")
                     print(f"📄 Export Format: {config['export_format']}")
+                    print(f"⚙️ Zone Backend: {config['zone_backend']}")
+                    print(f"🗄️ Cache Backend: {config['cache_backend']}")
+                    print(f"🛰️ Geocoder: {config['geocoder_endpoint'] or 'public Nominatim'}")
+                    print(f"🧠 TimezoneFinder Mode: {config['timezone_finder_mode']}")
+                    print(f"📝 History Limit: {config['history_limit']}")
+                    print(f"🪵 Log Level: {config['log_level']}")
                     print(f"🌍 Preferred Timezones: {', '.join(config['preferred_timezones'][:5])}{'...' if len(config['preferred_timezones']) > 5 else ''}")
                     print("="*50)
                     print("💡 Use 'config [setting] [value]' to change settings")
@@ -199,13 +306,95 @@ def main():
                                 print("❌ Failed to update configuration")
                         else:
                             print("❌ Invalid export format. Use 'txt' or 'json'")
+                    elif setting == 'zone_backend' and len(parts) == 3:
+                        backend_name = parts[2].lower()
+                        if backend_name in available_backends():
+                            success = cache_manager.update_user_config('zone_backend', backend_name)
+                            if success:
+                                print(f"✅ Zone backend updated to {backend_name}")
+                            else:
+                                print("❌ Failed to update configuration")
+                        else:
+                            print(f"❌ Invalid zone backend. Use one of: {', '.join(available_backends())}")
+                    elif setting == 'cache_backend' and len(parts) == 3:
+                        backend_name = parts[2].lower()
+                        if backend_name in CACHE_BACKENDS:
+                            try:
+                                location_backend = get_cache_backend(backend_name, cache_manager)
+                            except (RuntimeError, OSError) as e:
+                                print(f"❌ Cache backend unavailable: {e}")
+                            else:
+                                if cache_manager.update_user_config('cache_backend', backend_name):
+                                    cache_manager.location_backend = location_backend
+                                    print(f"✅ Cache backend updated to {backend_name}")
+                                else:
+                                    print("❌ Failed to update configuration")
+                        else:
+                            print(f"❌ Invalid cache backend. Use one of: {', '.join(CACHE_BACKENDS)}")
+                    elif setting == 'geocoder_endpoint' and len(parts) == 3:
+                        endpoint = parts[2] if parts[2].lower() != 'default' else ""
+                        if endpoint and not endpoint.lower().startswith(('http://', 'https://')):
+                            print("❌ Invalid endpoint. Use a URL like 'http://127.0.0.1:8088' or 'default'")
+                        elif cache_manager.update_user_config('geocoder_endpoint', endpoint):
+                            print(f"✅ Geocoder endpoint updated to {endpoint or 'public Nominatim'}")
+                        else:
+                            print("❌ Failed to update configuration")
+                    elif setting == 'alias' and len(parts) == 4:
+                        alias = parts[2].lower()
+                        aliases = dict(cache_manager.get_user_config()['timezone_aliases'])
+                        if parts[3].lower() == 'remove':
+                            aliases.pop(alias, None)
+                            zone_name = None
+                        else:
+                            zone_name = converter.lookup_timezone_alias(parts[3])
+                        if parts[3].lower() != 'remove' and not zone_name:
+                            print(f"❌ Unknown timezone '{parts[3]}'. Use an IANA name like 'Europe/Berlin'")
+                        else:
+                            if zone_name:
+                                aliases[alias] = zone_name
+                            if cache_manager.update_user_config('timezone_aliases', aliases):
+                                print(f"✅ Alias '{alias}' {'→ ' + zone_name if zone_name else 'removed'}")
+                            else:
+                                print("❌ Failed to update configuration")
+                    elif setting == 'timezone_finder_mode' and len(parts) == 3:
+                        mode = parts[2].lower()
+                        if mode in TIMEZONE_FINDER_MODES:
+                            if cache_manager.update_user_config('timezone_finder_mode', mode):
+                                print(f"✅ TimezoneFinder mode updated to {mode}")
+                            else:
+                                print("❌ Failed to update configuration")
+                        else:
+                            print(f"❌ Invalid mode. Use one of: {', '.join(TIMEZONE_FINDER_MODES)}")
+                    elif setting == 'log_level' and len(parts) == 3:
+                        level = parts[2].upper()
+                        if level in ('DEBUG', 'INFO', 'WARNING', 'ERROR'):
+                            if cache_manager.update_user_config('log_level', level):
+                                print(f"✅ Log level updated to {level}")
+                            else:
+                                print("❌ Failed to update configuration")
+                        else:
+                            print("❌ Invalid log level. Use debug, info, warning or error")
+                    elif setting == 'history_limit' and len(parts) == 3:
+                        try:
+                            history_limit = int(parts[2])
+                            if history_limit > 0:
+                                success = cache_manager.update_user_config('history_limit', history_limit)
+                                if success:
+                                    print(f"✅ History limit updated to {history_limit}")
+                                else:
+                                    print("❌ Failed to update configuration")
+                            else:
+                                print("❌ History limit must be a positive number")
+                        except ValueError:
+                            print("❌ Invalid number. Use e.g. 'config history_limit 50'")
                     elif setting == 'reset':
                         # Reset configuration by deleting the config file
                         import os
-                        config_file = os.path.join(cache_manager.cache_dir, "user_config.json")
+                        config_file = cache_manager.config_file
                         try:
                             if os.path.exists(config_file):
                                 os.remove(config_file)
+                            cache_manager.reload_user_config()
                             print("✅ Configuration reset to defaults")
                         except:
                             print("❌ Failed to reset configuration")
@@ -230,6 +419,10 @@ def main():
             
             # Handle convert command
             if location.lower().startswith('convert '):
+                # 'convert all ...' shows every zone grouped by UTC offset
+                all_zones = location.lower().split()[1:2] == ['all']
+                if all_zones:
+                    location = 'convert ' + location.split(None, 2)[2] if len(location.split()) > 2 else 'convert'
                 parts = location.split(' ', 2)
                 if len(parts) >= 3:
                     time_str = parts[1]
@@ -241,16 +434,20 @@ def main():
                         date_str = parts[3]
                     
                     print(f"\n🔄 Converting {time_str} from {timezone_str}...")
-                    conversions, error = converter.convert_specific_time(time_str, timezone_str, date_str)
+                    conversions, error = converter.convert_specific_time(
+                        time_str, timezone_str, date_str, all_zones=all_zones
+                    )
                     
                     if error:
                         print(f"❌ {error}")
+                    elif conversions and all_zones:
+                        converter.display_all_zones_results(conversions)
                     elif conversions:
                         converter.display_specific_time_results(conversions, time_str, timezone_str, date_str)
                     else:
                         print("❌ Could not convert the specified time")
                 else:
-                    print("❌ Usage: convert [time] [timezone] [optional: date]")
+                    print("❌ Usage: convert [all] [time] [timezone] [optional: date]")
                     print("   Examples: 'convert 14:30 EST', 'convert 2:30 PM PST 2025-06-25'")
                 print("\n" + "-"*60)
                 print("💡 Next: Enter another command or 'quit' to exit")
@@ -275,7 +472,11 @@ def main():
             # Handle overlap command
             if location.lower().startswith('overlap '):
                 locations = location.split()[1:]  # Remove 'overlap' from the list
-                if len(locations) >= 2:
+                if locations[0].lower() == 'matrix' and len(locations) >= 3:
+                    print(f"\n🧮 Building weekly overlap matrix for {len(locations) - 1} locations...")
+                    matrix_data = converter.calculate_overlap_matrix(locations[1:])
+                    converter.display_overlap_matrix(matrix_data)
+                elif len(locations) >= 2 and locations[0].lower() != 'matrix':
                     print(f"\n🕐 Analyzing business hours overlap for: {', '.join(locations)}")
                     overlap_data = converter.calculate_business_hours_overlap(locations)
                     converter.display_business_hours_overlap(overlap_data, locations)
@@ -287,6 +488,95 @@ def main():
                 print("-"*60 + "\n")
                 continue
                 
+            # Handle recurring meeting drift command
+            if location.lower().startswith('recurring '):
+                parts = location.split()[1:]  # Remove 'recurring' from the list
+                weekdays = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+                weekday = None
+                if parts and parts[0].lower()[:3] in weekdays:
+                    weekday = weekdays.index(parts[0].lower()[:3])
+                    parts = parts[1:]
+                if len(parts) >= 3:
+                    time_str, organizer, participants = parts[0], parts[1], parts[2:]
+                    print(f"\n🔁 Analyzing weekly {time_str} {organizer} meeting for: {', '.join(participants)}")
+                    analysis, error = converter.analyze_recurring_meeting(
+                        time_str, organizer, [organizer] + participants, weekday=weekday
+                    )
+                    if error:
+                        print(f"❌ {error}")
+                    else:
+                        converter.display_recurring_meeting_drift(analysis)
+                else:
+                    print("❌ Usage: recurring [optional: day] [time] [organizer] [location1] ...")
+                    print("   Example: 'recurring tue 10:00 chicago london tokyo'")
+                print("\n" + "-"*60)
+                print("💡 Next: Enter another command or 'quit' to exit")
+                print("-"*60 + "\n")
+                continue
+            
+            # Handle batch scheduling of a team file
+            if location.lower().startswith('batch '):
+                parts = location.split()[1:]  # Remove 'batch' from the list
+                if len(parts) in (1, 2):
+                    output_file = parts[1] if len(parts) == 2 else "batch_results.jsonl"
+                    try:
+                        teams = load_teams(parts[0])
+                        print(f"\n📦 Scheduling {len(teams)} teams...")
+                        with open(output_file, 'w', encoding='utf-8') as output:
+                            summary = run_batch(teams, output, converter=converter)
+                        print(f"✅ {summary['teams']} teams ({summary['locations']} distinct locations, "
+                              f"{summary['unresolved_locations']} unresolved) in {summary['seconds']}s")
+                        print(f"📁 Results written to {output_file}")
+                    except (OSError, ValueError, KeyError, TypeError) as e:
+                        print(f"❌ Batch failed: {e}")
+                else:
+                    print("❌ Usage: batch [teams file] [output.jsonl]")
+                    print("   Example: 'batch teams.json results.jsonl'")
+                print("\n" + "-"*60)
+                print("💡 Next: Enter another command or 'quit' to exit")
+                print("-"*60 + "\n")
+                continue
+            
+            # Handle follow-the-sun on-call planning
+            if location.lower().startswith('oncall '):
+                parts = location.split()[1:]  # Remove 'oncall' from the list
+                teams = []
+                dates = []
+                for part in parts:
+                    if part.lower().endswith('.json'):
+                        try:
+                            with open(part, 'r', encoding='utf-8') as f:
+                                teams.extend(json.load(f))
+                        except (OSError, ValueError) as e:
+                            print(f"❌ Could not read teams from {part}: {e}")
+                    elif '@' in part:
+                        # [name=]location@start-end, e.g. emea=london@8-16
+                        name, _, spec = part.rpartition('=')
+                        team_location, _, hours = spec.partition('@')
+                        try:
+                            start, end = (int(hour) for hour in hours.split('-'))
+                        except ValueError:
+                            print(f"❌ Invalid team '{part}'; use location@start-end, e.g. london@8-16")
+                            continue
+                        teams.append({'name': name or team_location, 'location': team_location,
+                                      'start': start, 'end': end})
+                    else:
+                        try:
+                            dates.append(datetime.strptime(part, '%Y-%m-%d').date())
+                        except ValueError:
+                            print(f"❌ Invalid date '{part}'; use YYYY-MM-DD")
+                if teams:
+                    print(f"\n🌞 Planning on-call coverage for {len(teams)} teams...")
+                    plan = converter.plan_follow_the_sun(teams, *dates[:2])
+                    converter.display_follow_the_sun(plan)
+                else:
+                    print("❌ Usage: oncall [teams.json | name=location@start-end ...] [from] [to]")
+                    print("   Example: 'oncall amer=nyc@8-16 emea=london@8-16 apac=sydney@9-17 2026-01-01 2026-03-31'")
+                print("\n" + "-"*60)
+                print("💡 Next: Enter another command or 'quit' to exit")
+                print("-"*60 + "\n")
+                continue
+            
             if not location:
                 print("Please enter a valid location.\n")
                 continue
@@ -310,6 +600,10 @@ def main():
             print("-"*60 + "\n")
             
         except KeyboardInterrupt:
+            prefetcher.stop()
+            converter.refresher.stop()
+            sweeper.stop()
+            save_snapshot(converter)
             print("\n\nThanks for using PyTZ Buddy! 🌍")
             break
         except Exception as e:
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Memory Profile for PyTZ Buddy
+Measures the memory each stage of a PyTZ Buddy process costs, with
+tracemalloc (Python allocations) and sampled RSS
+(everything, including mapped data files), and checks the numbers against
+per-scenario budgets so a regression fails instead of going unnoticed.
+
+Each scenario runs in a fresh interpreter, so earlier scenarios and this
+module's own imports never count against it.
+
+Usage:
+    python memory_profile.py run
+    python memory_profile.py run --timestamps 20000 --budgets budgets.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+SCENARIOS = ('import', 'construct', 'cold_lookup', 'warm_lookup',
+             'batch_conversion', 'conversion_results', 'cache_load')
+
+# Ceilings per scenario: peak_mb is the tracemalloc peak and rss_mb the growth
+# of the sampled RSS peak over the scenario's starting RSS, both in MB and for
+# the default sizes below; item_bytes is retained bytes per batch item (for
+# batch_conversion, growth once the conversion memo is full: a kept result is ~4 KB)
+DEFAULT_BUDGETS = {
+    'import': {'peak_mb': 40, 'rss_mb': 100},
+    'construct': {'peak_mb': 20, 'rss_mb': 60},
+    'cold_lookup': {'peak_mb': 25, 'rss_mb': 60},
+    'warm_lookup': {'peak_mb': 1, 'rss_mb': 5},
+    'batch_conversion': {'peak_mb': 5, 'rss_mb': 20, 'item_bytes': 100},
+    'conversion_results': {'peak_mb': 40, 'rss_mb': 100, 'item_bytes': 8000},
+    'cache_load': {'peak_mb': 25, 'rss_mb': 50, 'item_bytes': 1500},
+}
+
+DEFAULT_OPTIONS = {
+    'timestamps': 5000,  # instants converted (and dropped) by batch_conversion
+    'results': 5000,  # convert_to_timezones results kept by conversion_results
+    'cache_entries': 10000,  # location cache size read by cache_load
+    'finder_mode': None,  # TimezoneFinder mode; default from user config
+}
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (None if unknown)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        try:
+            import resource
+        except ImportError:
+            return None
+        # Only the peak is available here; ru_maxrss is KiB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+class RssSampler:
+    """Background thread recording the highest RSS seen while it runs"""
+
+    def __init__(self, interval_seconds=0.005):
+        self.interval_seconds = interval_seconds
+        self.peak = rss_mb()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pytz-buddy-rss-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+        self._sample()
+        return self.peak
+
+    def _sample(self):
+        current = rss_mb()
+        if current is not None and (self.peak is None or current > self.peak):
+            self.peak = current
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            self._sample()
+
+
+@contextmanager
+def measure(row):
+    """Record traced retained/peak MB and RSS growth of the block into row"""
+    rss_before = rss_mb()
+    sampler = RssSampler().start()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield row
+    finally:
+        row['seconds'] = round(time.perf_counter() - start, 3)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_peak = sampler.stop()
+        row['retained_mb'] = round(retained / (1024 * 1024), 2)
+        row['peak_mb'] = round(peak / (1024 * 1024), 2)
+        row['rss_mb'] = (round(rss_peak - rss_before, 1)
+                         if rss_peak is not None and rss_before is not None else None)
+
+
+def _converter(cache_dir, options, stub=None):
+    from cache_manager import CacheManager
+    from timezone_converter import TimezoneConverter
+
+    return TimezoneConverter(
+        CacheManager(cache_dir=cache_dir),
+        geocoder_endpoint=stub.url if stub else None,
+        timezone_finder_mode=options['finder_mode']
+    )
+
+
+def _scenario_import(row, options, cache_dir):
+    with measure(row):
+        import timezone_converter  # noqa: F401
+
+
+def _scenario_construct(row, options, cache_dir):
+    import timezone_converter  # noqa: F401
+    with measure(row):
+        converter = _converter(cache_dir, options)
+    row['finder_mode'] = options['finder_mode'] or converter.user_config['timezone_finder_mode']
+
+
+def _scenario_lookup(row, options, cache_dir, warm):
+    from nominatim_stub import NominatimStub
+
+    # Geocoding is served locally so the numbers do not depend on the network
+    stub = NominatimStub().start()
+    try:
+        converter = _converter(cache_dir, options, stub)
+        if warm:
+            converter.lookup("Tokyo, Japan")
+        with measure(row):
+            result = converter.lookup("Tokyo, Japan")
+        row['source'] = result['source']
+    finally:
+        stub.stop()
+
+
+def _scenario_cold_lookup(row, options, cache_dir):
+    _scenario_lookup(row, options, cache_dir, warm=False)
+
+
+def _scenario_warm_lookup(row, options, cache_dir):
+    _scenario_lookup(row, options, cache_dir, warm=True)
+
+
+def _scenario_batch_conversion(row, options, cache_dir):
+    from datetime import datetime, timedelta
+
+    converter = _converter(cache_dir, options)
+    count = options['timestamps']
+    start = datetime(2026, 1, 1)
+    # Zone data is loaded by a first conversion, so only the batch is measured
+    converter.conversions('US/Eastern', start - timedelta(days=1))
+    with measure(row):
+        # Results are consumed and dropped, as a streaming batch job would. The
+        # bounded memo fills first; growth after that is the per-item cost
+        for i in range(converter.conversion_memo_size):
+            converter.conversions('US/Eastern', start - timedelta(seconds=37 * (i + 1)))
+        filled = tracemalloc.get_traced_memory()[0]
+        for i in range(count):
+            converter.conversions('US/Eastern', start + timedelta(seconds=37 * i))
+        growth = tracemalloc.get_traced_memory()[0] - filled
+    row['items'] = count
+    row['item_bytes'] = round(growth / count, 1)
+
+
+def _scenario_conversion_results(row, options, cache_dir):
+    from datetime import datetime, timedelta
+
+    converter = _converter(cache_dir, options)
+    count = options['results']
+    start = datetime(2026, 1, 1)
+    # Zone data is loaded by a first conversion, so only the results are measured
+    converter.conversions('US/Eastern', start - timedelta(days=1))
+    with measure(row):
+        # Results kept, as a batch job collecting them would
+        results = [converter.conversions('US/Eastern', start + timedelta(seconds=37 * i)) for i in range(count)]
+    row['items'] = len(results)
+    row['item_bytes'] = round(row['retained_mb'] * 1024 * 1024 / count, 1)
+
+
+def _scenario_cache_load(row, options, cache_dir):
+    from datetime import datetime
+    from cache_manager import CacheManager
+
+    cache_manager = CacheManager(cache_dir=cache_dir)
+    count = options['cache_entries']
+    cached_at = datetime.now().isoformat()
+    cache_manager._write_json(cache_manager.location_cache_file, {
+        f"place {i}": {
+            'data': {'address': f"Place {i}, Somewhere", 'latitude': i / 1000, 'longitude': -i / 1000,
+                     'timezone': 'Europe/Paris', 'timezonefinder_version': '6.0.0'},
+            'cached_at': cached_at
+        }
+        for i in range(count)
+    })
+    # A fresh manager, as in a new process: the first lookup reads the whole file
+    cache_manager = CacheManager(cache_dir=cache_dir)
+    with measure(row):
+        cache_manager.get_cached_location(f"place {count - 1}")
+    row['items'] = count
+    row['item_bytes'] = round(row['retained_mb'] * 1024 * 1024 / count, 1)
+
+
+_SCENARIO_FUNCTIONS = {
+    'import': _scenario_import,
+    'construct': _scenario_construct,
+    'cold_lookup': _scenario_cold_lookup,
+    'warm_lookup': _scenario_warm_lookup,
+    'batch_conversion': _scenario_batch_conversion,
+    'conversion_results': _scenario_conversion_results,
+    'cache_load': _scenario_cache_load,
+}
+
+
+def _run_scenario(scenario, options, results):
+    cache_dir = tempfile.mkdtemp(prefix="pytz_buddy_memory_")
+    row = {'scenario': scenario}
+    try:
+        _SCENARIO_FUNCTIONS[scenario](row, options, cache_dir)
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    results.put(row)
+
+
+def profile_scenarios(scenarios=SCENARIOS, **options):
+    """Run each scenario in a fresh interpreter and return one dict per scenario
+
+    Rows hold seconds, retained_mb and peak_mb (tracemalloc), rss_mb (growth
+    of sampled RSS), and for batch scenarios items and item_bytes. A
+    scenario that raised has an 'error' entry instead of numbers.
+    """
+    options = dict(DEFAULT_OPTIONS, **options)
+    context = multiprocessing.get_context('spawn')
+    report = []
+    for scenario in scenarios:
+        if scenario not in _SCENARIO_FUNCTIONS:
+            raise ValueError(f"Unknown scenario '{scenario}'. Choose from: {', '.join(SCENARIOS)}")
+        results = context.Queue()
+        process = context.Process(target=_run_scenario, args=(scenario, options, results))
+        process.start()
+        report.append(results.get(timeout=1800))
+        process.join()
+    return report
+
+
+def load_budgets(path=None):
+    """Get the budgets: DEFAULT_BUDGETS, overridden per scenario by a JSON file"""
+    budgets = {scenario: dict(limits) for scenario, limits in DEFAULT_BUDGETS.items()}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            for scenario, limits in json.load(f).items():
+                budgets.setdefault(scenario, {}).update(limits)
+    return budgets
+
+
+def check_budgets(report, budgets=None):
+    """List budget violations as (scenario, metric, measured, limit)
+
+    A scenario that failed to run is a violation of every budget it has.
+    """
+    budgets = DEFAULT_BUDGETS if budgets is None else budgets
+    violations = []
+    for row in report:
+        for metric, limit in budgets.get(row['scenario'], {}).items():
+            measured = row.get(metric)
+            if 'error' in row:
+                violations.append((row['scenario'], metric, row['error'], limit))
+            elif measured is not None and measured > limit:
+                violations.append((row['scenario'], metric, measured, limit))
+    return violations
+
+
+def display_memory_report(report, violations=()):
+    """Print the report as a table, then any budget violations"""
+    def show(value):
+        return "n/a" if value is None else value
+
+    print("\n🧠 PYTZ BUDDY MEMORY PROFILE")
+    print("="*78)
+    print(f"{'scenario':20} {'seconds':>8} {'peak MB':>9} {'kept MB':>9} {'RSS +MB':>9} {'bytes/item':>11}")
+    for row in report:
+        if 'error' in row:
+            print(f"{row['scenario']:20} ❌ {row['error']}")
+            continue
+        print(f"{row['scenario']:20} {row['seconds']:>8} {row['peak_mb']:>9} {row['retained_mb']:>9} "
+              f"{show(row['rss_mb']):>9} {show(row.get('item_bytes')):>11}")
+    print("="*78)
+    if violations:
+        for scenario, metric, measured, limit in violations:
+            print(f"❌ {scenario}: {metric} {measured} exceeds budget {limit}")
+    else:
+        print("✅ All scenarios within budget")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory profile and budgets for PyTZ Buddy")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help="Profile scenarios and check their budgets")
+    run_parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    run_parser.add_argument('--timestamps', type=int, default=DEFAULT_OPTIONS['timestamps'])
+    run_parser.add_argument('--results', type=int, default=DEFAULT_OPTIONS['results'])
+    run_parser.add_argument('--cache-entries', type=int, default=DEFAULT_OPTIONS['cache_entries'])
+    run_parser.add_argument('--finder-mode', choices=('file', 'mmap', 'memory'), default=None)
+    run_parser.add_argument('--budgets', default=None, help="JSON file of {scenario: {metric: MB}} overrides")
+    run_parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        report = profile_scenarios(
+            args.scenarios, timestamps=args.timestamps, results=args.results,
+            cache_entries=args.cache_entries, finder_mode=args.finder_mode
+        )
+        violations = check_budgets(report, load_budgets(args.budgets))
+        if args.json:
+            print(json.dumps({'report': report, 'violations': violations}, indent=2))
+        else:
+            display_memory_report(report, violations)
+        sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Nominatim Stub for PyTZ Buddy
+A local HTTP server answering /search the way Nominatim does, from a
+fixture file, so the geocoding path can be load- and latency-tested
+offline without touching the public service.
+
+Usage:
+    python nominatim_stub.py --port 8088 --latency-ms 150 --error-rate 0.05
+    # then: config geocoder_endpoint http://127.0.0.1:8088
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from location_keys import normalize_location_key
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nominatim_fixture.json")
+
+
+def load_fixture(path=None):
+    """Load {normalized query: [Nominatim place dicts]} from a JSON fixture file"""
+    with open(path or DEFAULT_FIXTURE, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+    return normalize_fixture(fixture)
+
+
+def normalize_fixture(fixture):
+    """Key a fixture by normalize_location_key, as queries are looked up
+
+    Queries that normalize alike keep the first answer listed.
+    """
+    normalized = {}
+    for query, places in fixture.items():
+        normalized.setdefault(normalize_location_key(query), places)
+    return normalized
+
+
+def fixture_from_location_cache(cache_manager):
+    """Build a fixture from the entries in a CacheManager's location cache"""
+    fixture = {}
+    for location_key, cached_item in cache_manager.location_backend.scan():
+        data = cached_item['data']
+        # Entries cached before key normalization still use their old keys
+        location_key = normalize_location_key(location_key)
+        if location_key in fixture:
+            continue
+        fixture[location_key] = [{
+            'place_id': len(fixture) + 1,
+            'lat': str(data['latitude']),
+            'lon': str(data['longitude']),
+            'display_name': data['address']
+        }]
+    return fixture
+
+
+class NominatimStub:
+    """Threaded stand-in for the Nominatim search API
+
+    latency_ms and jitter_ms delay every response; error_rate is the fraction
+    of requests answered with HTTP 500; rate_limit caps requests per second
+    (per client address) and answers the excess with HTTP 429, as the real
+    service does. seed makes latency and error injection reproducible.
+    """
+
+    def __init__(self, fixture=None, host="127.0.0.1", port=0, latency_ms=0.0,
+                 jitter_ms=0.0, error_rate=0.0, rate_limit=None, seed=None):
+        self.fixture = normalize_fixture(fixture) if fixture is not None else load_fixture()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._last_request = {}
+        self.stats = {'requests': 0, 'hits': 0, 'misses': 0, 'errors': 0, 'rate_limited': 0}
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL to use as the geocoder endpoint"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a daemon thread"""
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="nominatim-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down and release its port"""
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _decide(self, client):
+        """Pick (status, delay_seconds) for one request and count it"""
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            now = time.monotonic()
+            if self.rate_limit:
+                last = self._last_request.get(client)
+                if last is not None and now - last < 1.0 / self.rate_limit:
+                    self.stats['rate_limited'] += 1
+                    return 429, 0.0
+                self._last_request[client] = now
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return 500, delay
+            return 200, delay
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.rstrip('/') == '/status':
+                    with stub._lock:
+                        return self._send(200, dict(stub.stats))
+                if url.path.rstrip('/') != '/search':
+                    return self._send(404, {'error': 'Not found'})
+
+                status, delay = stub._decide(self.client_address[0])
+                if delay:
+                    time.sleep(delay)
+                if status != 200:
+                    return self._send(status, {'error': 'Injected failure' if status == 500 else 'Too many requests'})
+
+                query = normalize_location_key(parse_qs(url.query).get('q', [''])[0])
+                places = stub.fixture.get(query, [])
+                with stub._lock:
+                    stub.stats['hits' if places else 'misses'] += 1
+                limit = parse_qs(url.query).get('limit', [None])[0]
+                if limit and limit.isdigit():
+                    places = places[:int(limit)]
+                self._send(200, places)
+
+            def _send(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Keep load tests quiet
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Nominatim stand-in for PyTZ Buddy")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8088)
+    parser.add_argument('--fixture', default=None, help="JSON fixture file (default: nominatim_fixture.json)")
+    parser.add_argument('--from-cache', metavar='CACHE_DIR',
+                        help="Serve the locations cached in this cache directory instead")
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests failing with HTTP 500")
+    parser.add_argument('--rate-limit', type=float, default=None, help="Requests per second per client before HTTP 429")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.from_cache:
+        from cache_manager import CacheManager
+        fixture = fixture_from_location_cache(CacheManager(cache_dir=args.from_cache))
+    else:
+        fixture = load_fixture(args.fixture)
+
+    stub = NominatimStub(
+        fixture, host=args.host, port=args.port, latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, seed=args.seed
+    )
+    print(f"🛰️ Nominatim stub serving {len(fixture)} locations at {stub.url}")
+    print(f"   Point PyTZ Buddy at it with: config geocoder_endpoint {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
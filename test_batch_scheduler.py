@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Batch scheduling: one resolution stage, pooled workers, JSONL matching the REPL path
+"""
+
+import io
+import json
+
+from batch_scheduler import load_teams, run_batch, schedule_team
+from cache_manager import CacheManager
+from timezone_converter import TimezoneConverter
+
+
+class CountingGeocoder:
+    """Stand-in for Nominatim that knows no places and records every lookup"""
+
+    def __init__(self):
+        self.calls = []
+
+    def geocode(self, query):
+        self.calls.append(query)
+        return None
+
+
+def test_batch_matches_per_team_scheduling(tmp_path):
+    converter = TimezoneConverter(CacheManager(cache_dir=str(tmp_path)))
+    converter.geolocator = CountingGeocoder()
+    teams = [
+        {'name': f"team {i}", 'locations': locations, 'business_hours': {'start': 8, 'end': 18}}
+        for i, locations in enumerate([
+            ['nyc', 'london'], ['london', 'paris', 'tokyo'], ['la', 'nyc', 'Atlantis'], ['Atlantis', 'nyc']
+        ] * 5)
+    ]
+    teams_file = tmp_path / "teams.jsonl"
+    teams_file.write_text("\n".join(json.dumps(team) for team in teams), encoding='utf-8')
+    assert load_teams(str(teams_file)) == teams
+
+    output = io.StringIO()
+    summary = run_batch(teams, output, converter=converter, workers=2, chunksize=3, min_delay_seconds=0)
+
+    # Each distinct unknown location is geocoded once, not once per team
+    assert converter.geolocator.calls == ['Atlantis']
+    assert summary['locations'] == 6 and summary['unresolved_locations'] == 1
+    assert summary['errors'] == 5
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [result['team'] for result in results] == [team['name'] for team in teams]
+    for team, result in zip(teams, results):
+        if 'error' in result:
+            assert result['unresolved'] == ['Atlantis']
+            continue
+        locations = result['locations']
+        expected = converter.find_meeting_times(locations, 8, 18, use_cache=False)
+        assert [m['utc_time'] for m in result['meeting_times']] == [m['utc_time'].isoformat() for m in expected]
+        overlap = converter.calculate_business_hours_overlap(locations, 8, 18, use_cache=False)
+        assert result['overlap']['total_overlap'] == overlap['total_overlap']
+    assert results[2]['unresolved'] == ['Atlantis'] and results[2]['locations'] == ['la', 'nyc']
+
+
+def test_bad_teams_become_error_lines(tmp_path):
+    converter = TimezoneConverter(CacheManager(cache_dir=str(tmp_path)))
+    converter.geolocator = CountingGeocoder()
+    teams = [
+        {'name': "good", 'locations': ['nyc', 'london']},
+        {'name': "half hours", 'locations': ['nyc', 'tokyo'], 'business_hours': {'start': "9"}},
+        {'name': "no locations"},
+        "not a team",
+        {'name': "also good", 'locations': ['paris', 'tokyo'], 'duration_hours': 2},
+    ]
+
+    output = io.StringIO()
+    summary = run_batch(teams, output, converter=converter, workers=2, chunksize=1, min_delay_seconds=0)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [result['team'] for result in results] == ["good", "half hours", "no locations", None, "also good"]
+    assert [('error' in result) for result in results] == [False, True, True, True, False]
+    assert "business_hours" in results[1]['error'] and "locations" in results[2]['error']
+    assert summary['errors'] == 3 and summary['locations'] == 4
+    assert converter.geolocator.calls == []
+
+    # An exception while scheduling a valid team is reported, not raised
+    result = schedule_team(({'name': "orphan", 'locations': ['nyc', 'london']}, [], [], None))
+    assert result['team'] == "orphan" and result['error'].startswith("AttributeError")
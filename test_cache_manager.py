@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Tests for CacheManager storage: shared use by many processes, the history log,
+sweeping and the pluggable location cache backends
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import stat
+from datetime import datetime, timedelta
+
+import pytest
+
+from cache_backends import SharedMemoryBackend, shared_memory
+from cache_manager import CacheManager
+
+WORKERS = 16
+ENTRIES_PER_WORKER = 5
+
+
+def _worker(cache_dir, worker_id):
+    cache_manager = CacheManager(cache_dir=cache_dir)
+    for i in range(ENTRIES_PER_WORKER):
+        cache_manager.cache_location(f"place {worker_id}-{i}", {
+            'address': f"Place {worker_id}-{i}", 'latitude': worker_id, 'longitude': i
+        })
+        cache_manager.add_to_history(f"search {worker_id}")
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork-based worker processes")
+def test_parallel_workers_do_not_lose_updates(tmp_path):
+    cache_dir = str(tmp_path)
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=_worker, args=(cache_dir, worker_id))
+        for worker_id in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    # Every file must still be valid JSON with every worker's additions merged in
+    with open(os.path.join(cache_dir, "location_cache.json"), encoding='utf-8') as f:
+        cache = json.load(f)
+    assert len(cache) == WORKERS * ENTRIES_PER_WORKER
+
+    history = CacheManager(cache_dir=cache_dir).get_search_history()
+    assert sorted(history) == sorted(f"search {worker_id}" for worker_id in range(WORKERS))
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".tmp")]
+
+
+def test_history_log_compaction_keeps_recent_unique_view(tmp_path):
+    cache_manager = CacheManager(cache_dir=str(tmp_path), history_limit=3)
+    cache_manager.history_compaction_slack = 5
+    for location in ["nyc", "london", "nyc", "tokyo", "paris", "london"]:
+        cache_manager.add_to_history(location)
+
+    assert cache_manager.get_search_history() == ["london", "paris", "tokyo"]
+    with open(cache_manager.history_file, encoding='utf-8') as f:
+        # Compaction ran after the fifth append; the sixth was appended after it
+        assert len(f.readlines()) == 4
+
+
+def test_sweep_removes_expired_entries_off_the_request_path(tmp_path):
+    cache_manager = CacheManager(cache_dir=str(tmp_path))
+    for name in ["old town", "new town"]:
+        cache_manager.cache_location(name, {'address': name, 'latitude': 1.0, 'longitude': 2.0})
+
+    with open(cache_manager.location_cache_file, encoding='utf-8') as f:
+        cache = json.load(f)
+    days = cache_manager.cache_duration_days + cache_manager.stale_grace_days + 1
+    cache["old town"]['cached_at'] = (datetime.now() - timedelta(days=days)).isoformat()
+    cache_manager._write_json(cache_manager.location_cache_file, cache)
+
+    # A lookup of an expired entry is a miss but leaves the file alone
+    stamp = cache_manager.location_cache_stamp()
+    assert cache_manager.get_cached_location("old town") is None
+    assert cache_manager.location_cache_stamp() == stamp
+
+    report = cache_manager.sweep()
+    assert report['expired_locations_removed'] == 1
+    assert report['reclaimed_bytes'] > 0
+    assert cache_manager.get_cache_stats()['last_sweep'] == report
+    assert cache_manager.get_cached_location("new town") is not None
+
+
+@pytest.mark.parametrize("backend_name", ["json", "memory"])
+def test_location_backends_round_trip(tmp_path, backend_name):
+    cache_manager = CacheManager(cache_dir=str(tmp_path), location_backend=backend_name)
+    assert cache_manager.location_backend.name == backend_name
+    cache_manager.location_backend.max_entries = 3
+    for i in range(5):
+        cache_manager.cache_location(f"Town {i}", {'address': f"Town {i}", 'latitude': i, 'longitude': i})
+
+    assert cache_manager.get_cached_location("town 4")['address'] == "Town 4"
+    # Oldest entries are evicted beyond max_entries
+    assert cache_manager.get_cached_location("town 0") is None
+    assert cache_manager.get_cache_stats()['cached_locations'] == 3
+    assert cache_manager.location_backend.delete("town 4")
+    assert sorted(key for key, _ in cache_manager.location_backend.scan()) == ["town 2", "town 3"]
+
+
+def _shared_memory_worker(segment_name, cache_dir, worker_id):
+    backend = SharedMemoryBackend(segment_name, size=64 * 1024)
+    cache_manager = CacheManager(cache_dir=cache_dir, location_backend=backend)
+    for i in range(ENTRIES_PER_WORKER):
+        cache_manager.cache_location(f"place {worker_id}-{i}", {'address': "x", 'latitude': worker_id, 'longitude': i})
+    backend.close()
+
+
+@pytest.mark.skipif(shared_memory is None or not hasattr(os, 'fork'),
+                    reason="needs multiprocessing.shared_memory and fork")
+def test_shared_memory_backend_is_shared_across_processes(tmp_path):
+    segment_name = f"pytz_buddy_test_{os.getpid()}"
+    backend = SharedMemoryBackend(segment_name, size=64 * 1024)
+    try:
+        assert backend.owner
+        context = multiprocessing.get_context('fork')
+        # Workers get their own cache dirs; only the segment is shared
+        processes = [
+            context.Process(target=_shared_memory_worker,
+                            args=(segment_name, str(tmp_path / str(worker_id)), worker_id))
+            for worker_id in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+            assert process.exitcode == 0
+
+        assert len(backend.scan()) == 4 * ENTRIES_PER_WORKER
+        assert backend.get("place 3 4")['data']['latitude'] == 3
+        assert backend.delete_many(["place 0 0", "place 0 1", "missing"]) == 2
+
+        other = SharedMemoryBackend(segment_name)
+        assert not other.owner
+        assert other.get("place 0 0") is None
+        assert other.stats()['entries'] == 4 * ENTRIES_PER_WORKER - 2
+        other.close()
+    finally:
+        backend.close(unlink=True)
+
+
+def _shared_memory_creator(segment_name):
+    backend = SharedMemoryBackend(segment_name, size=64 * 1024)
+    assert backend.owner
+    backend.put("paris france", {'data': {'timezone': 'Europe/Paris'}, 'cached_at': "2026-01-01T00:00:00"})
+    backend.close()
+
+
+@pytest.mark.skipif(shared_memory is None, reason="needs multiprocessing.shared_memory")
+def test_shared_memory_segment_outlives_its_creator(tmp_path):
+    segment_name = f"pytz_buddy_test_creator_{os.getpid()}"
+    # A spawned creator has its own resource tracker, which would unlink a tracked segment on exit
+    process = multiprocessing.get_context('spawn').Process(target=_shared_memory_creator, args=(segment_name,))
+    process.start()
+    process.join(timeout=60)
+    assert process.exitcode == 0
+    try:
+        backend = SharedMemoryBackend(segment_name)
+        assert not backend.owner
+        assert backend.get("paris france")['data']['timezone'] == 'Europe/Paris'
+        backend.close()
+    finally:
+        assert SharedMemoryBackend.unlink_segment(segment_name)
+    assert not SharedMemoryBackend.unlink_segment(segment_name)
+
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX file modes")
+def test_atomic_writes_keep_shared_file_modes(tmp_path):
+    cache_manager = CacheManager(cache_dir=str(tmp_path))
+    umask = os.umask(0o022)
+    os.umask(umask)
+    cache_manager.cache_location("Paris, France", {'address': "Paris", 'latitude': 48.85, 'longitude': 2.35})
+    cache_manager.add_to_history("Paris, France")
+    cache_manager.compact_history()
+    for path in (cache_manager.location_cache_file, cache_manager.history_file):
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~umask
+
+    # A mode someone chose for an existing file survives the replace
+    os.chmod(cache_manager.location_cache_file, 0o640)
+    cache_manager.cache_location("Lyon", {'address': "Lyon", 'latitude': 45.76, 'longitude': 4.84})
+    assert stat.S_IMODE(os.stat(cache_manager.location_cache_file).st_mode) == 0o640
+
+
+def test_unavailable_cache_backend_falls_back_quietly(tmp_path, capsys, caplog):
+    with caplog.at_level(logging.WARNING, logger="pytz_buddy"):
+        cache_manager = CacheManager(cache_dir=str(tmp_path), location_backend='redis')
+    assert cache_manager.location_backend.name == 'json'
+    assert "redis" in caplog.text
+    assert capsys.readouterr().out == ""
+
+
+def test_user_config_snapshot_reloads_only_on_change(tmp_path, monkeypatch):
+    cache_manager = CacheManager(cache_dir=str(tmp_path))
+    cache_manager.config_check_interval = 0
+    changes = []
+    cache_manager.add_config_listener(lambda config, previous: changes.append(config))
+
+    reads = []
+    original_read_json = cache_manager._read_json
+    monkeypatch.setattr(cache_manager, '_read_json', lambda path: reads.append(path) or original_read_json(path))
+    for _ in range(10):
+        cache_manager.get_user_config()
+    assert reads == [] and changes == []
+
+    # An external edit is picked up once, validated, and sent to listeners
+    config = json.loads(open(cache_manager.config_file, encoding='utf-8').read())
+    config['business_hours'] = {'start': 18, 'end': 8}
+    config['history_limit'] = 7
+    with open(cache_manager.config_file, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    assert cache_manager.get_user_config()['business_hours'] == {'start': 9, 'end': 17}
+    cache_manager.get_user_config()
+    assert len(reads) == 1 and len(changes) == 1
+    assert cache_manager.history_limit == 7
+
+    assert not cache_manager.update_user_config('time_format', 'fortnightly')
+    assert cache_manager.update_user_config('preferred_timezones', ['Asia/Kolkata'])
+    assert changes[-1]['preferred_timezones'] == ['Asia/Kolkata']
+
+
+def test_near_duplicate_location_names_share_one_entry(tmp_path):
+    cache_manager = CacheManager(cache_dir=str(tmp_path))
+    paris = {'address': "Paris, Île-de-France, France", 'latitude': 48.8566, 'longitude': 2.3522}
+    cache_manager.cache_location("Paris, France", paris)
+
+    for name in ["paris,france", "Paris  France", "PARIS, FR", "Paris, France "]:
+        assert cache_manager.get_cached_location(name) == paris
+    assert cache_manager.location_lookup_stats['normalized_hits'] == 4
+
+    # A new spelling the geocoder resolves to the same place is learned as an alias
+    cache_manager.cache_location("Paris (capital of France)", paris)
+    assert cache_manager.get_cache_stats()['cached_locations'] == 1
+    assert cache_manager.get_cache_stats()['learned_aliases'] == 1
+    assert cache_manager.get_cached_location("paris capital of france") == paris
+
+
+def test_legacy_keys_are_still_found(tmp_path):
+    cache_manager = CacheManager(cache_dir=str(tmp_path))
+    item = {'data': {'address': "São Paulo", 'latitude': -23.55, 'longitude': -46.63},
+            'cached_at': datetime.now().isoformat()}
+    cache_manager._write_json(cache_manager.location_cache_file, {"são paulo, br": item})
+    assert cache_manager.get_cached_location("São Paulo, BR") == item['data']
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Startup prefetch test: history and cached entries are warmed in the background
+"""
+
+from cache_manager import CacheManager
+from cache_prefetcher import CachePrefetcher
+from timezone_converter import TimezoneConverter
+
+
+class RecordingRefresher:
+    """Stand-in for CacheRefresher that records scheduled geocodes"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def schedule(self, location_name):
+        self.scheduled.append(location_name)
+        return True
+
+
+def test_prefetch_warms_history_without_blocking(tmp_path):
+    cache_manager = CacheManager(cache_dir=str(tmp_path))
+    # Cached before timezones were stored in entries
+    cache_manager.cache_location("Lyon", {'address': 'Lyon, France', 'latitude': 45.76, 'longitude': 4.84})
+    for location in ["Berlin, Germany", "tokyo", "Lyon"]:
+        cache_manager.add_to_history(location)
+    converter = TimezoneConverter(cache_manager)
+
+    refresher = RecordingRefresher()
+    prefetcher = CachePrefetcher(converter, refresher=refresher).start()
+    assert prefetcher.finished.wait(30)
+
+    # Uncached history goes to the rate-limited refresher; nothing is geocoded here
+    assert refresher.scheduled == ["Berlin, Germany"]
+    assert cache_manager.peek_location("Lyon")[0]['timezone'] == 'Europe/Paris'
+    assert prefetcher.stats['timezones_resolved'] == 1
+    assert prefetcher.stats['zones_warmed'] >= len(converter.major_timezones) + 2
+    # Warming is not counted as user lookups
+    assert cache_manager.location_lookup_stats['lookups'] == 0
+
+
+def test_prefetch_can_be_cancelled(tmp_path):
+    cache_manager = CacheManager(cache_dir=str(tmp_path))
+    prefetcher = CachePrefetcher(TimezoneConverter(cache_manager))
+    prefetcher._stop_event.set()
+    prefetcher._run()
+    assert prefetcher.finished.is_set()
+    assert prefetcher.stats['zones_warmed'] == 0
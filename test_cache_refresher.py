@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Refresh-ahead test: stale entries are served and re-geocoded off the request path
+"""
+
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from cache_manager import CacheManager
+from cache_refresher import CacheRefresher
+from timezone_converter import TimezoneConverter
+
+Location = namedtuple('Location', 'address latitude longitude')
+
+
+class CountingGeocoder:
+    """Stand-in for Nominatim that records every lookup"""
+
+    def __init__(self):
+        self.calls = []
+
+    def geocode(self, query):
+        self.calls.append(query)
+        return Location(f"{query} (refreshed)", 48.8566, 2.3522)
+
+
+def _age_entry(cache_manager, location_key, days):
+    with open(cache_manager.location_cache_file, encoding='utf-8') as f:
+        cache = json.load(f)
+    cache[location_key]['cached_at'] = (datetime.now() - timedelta(days=days)).isoformat()
+    cache_manager._write_json(cache_manager.location_cache_file, cache)
+
+
+def test_stale_entry_served_while_refreshed(tmp_path):
+    cache_manager = CacheManager(cache_dir=str(tmp_path))
+    cache_manager.cache_location("Paris, France", {
+        'address': 'Paris, France', 'latitude': 48.85, 'longitude': 2.35
+    })
+    _age_entry(cache_manager, "paris france", cache_manager.cache_duration_days + 1)
+
+    converter = TimezoneConverter(cache_manager)
+    converter.geolocator = CountingGeocoder()
+    converter.refresher = CacheRefresher(converter, min_delay_seconds=0).start()
+    try:
+        # The stale entry answers immediately; the geocoder runs in the background
+        assert converter.get_location_info("Paris, France")['address'] == 'Paris, France'
+        deadline = time.monotonic() + 5
+        while converter.refresher.refreshed_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        converter.refresher.stop()
+
+    assert converter.geolocator.calls == ["Paris, France"]
+    data, freshness = cache_manager.lookup_location("Paris, France")
+    assert freshness == 'fresh'
+    assert data['address'] == 'Paris, France (refreshed)'
+
+
+def test_only_popular_entries_refreshed_ahead(tmp_path):
+    cache_manager = CacheManager(cache_dir=str(tmp_path))
+    cache_manager.cache_location("Tokyo", {'address': 'Tokyo', 'latitude': 35.7, 'longitude': 139.7})
+    _age_entry(cache_manager, "tokyo", cache_manager.cache_duration_days - 1)
+
+    converter = TimezoneConverter(cache_manager)
+    refresher = CacheRefresher(converter, min_hits=2)
+    refresher.record_hit("Tokyo", 'refresh')
+    assert refresher._queue.empty()
+    refresher.record_hit("Tokyo", 'refresh')
+    assert refresher._queue.get_nowait() == "Tokyo"
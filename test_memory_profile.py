@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Memory profile: scenarios run in fresh interpreters and stay within budget
+"""
+
+from memory_profile import DEFAULT_BUDGETS, check_budgets, profile_scenarios
+
+
+def test_small_scenarios_within_budget():
+    report = profile_scenarios(
+        ['warm_lookup', 'batch_conversion', 'cache_load'],
+        timestamps=1000, cache_entries=1000
+    )
+    assert [row['scenario'] for row in report] == ['warm_lookup', 'batch_conversion', 'cache_load']
+    assert all('error' not in row for row in report), report
+    assert report[0]['source'] == 'cache'
+    # Dropped results are freed; only the bounded memo stays, and it was full before counting
+    assert report[1]['items'] == 1000 and report[1]['item_bytes'] < 100
+    assert check_budgets(report) == []
+
+
+def test_budget_violations_reported():
+    report = [
+        {'scenario': 'warm_lookup', 'peak_mb': 3.5, 'rss_mb': 0.0, 'retained_mb': 3.0, 'seconds': 0.0},
+        {'scenario': 'construct', 'error': "ImportError: no timezonefinder"},
+    ]
+    violations = check_budgets(report)
+    assert ('warm_lookup', 'peak_mb', 3.5, DEFAULT_BUDGETS['warm_lookup']['peak_mb']) in violations
+    assert {metric for scenario, metric, _, _ in violations if scenario == 'construct'} == {'peak_mb', 'rss_mb'}
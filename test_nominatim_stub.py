@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Geocoding path against the local Nominatim stub: fixtures, caching, injected failures
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from cache_manager import CacheManager
+from nominatim_stub import NominatimStub, fixture_from_location_cache
+from timezone_converter import TimezoneConverter
+
+
+def _converter(tmp_path, stub):
+    return TimezoneConverter(CacheManager(cache_dir=str(tmp_path)), geocoder_endpoint=stub.url)
+
+
+def test_geocoding_through_stub_is_cached(tmp_path):
+    stub = NominatimStub(latency_ms=20, seed=1).start()
+    try:
+        converter = _converter(tmp_path, stub)
+        locations = ["Paris, France", "Tokyo, Japan", "Berlin", "Nowhere Special"]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(converter.get_location_info, locations))
+        assert results[0]['latitude'] == 48.8588897
+        assert results[3] is None
+
+        # Repeat lookups are answered from the cache without reaching the server
+        assert converter.get_location_info("tokyo, japan")['address'] == "Tokyo, Japan"
+        assert stub.stats['requests'] == 4 and stub.stats['hits'] == 3
+    finally:
+        stub.stop()
+
+
+def test_stub_injects_errors_and_rate_limits(tmp_path):
+    stub = NominatimStub(error_rate=1.0, seed=1).start()
+    try:
+        assert _converter(tmp_path, stub).get_location_info("Berlin") is None
+        assert stub.stats['errors'] == 1
+    finally:
+        stub.stop()
+
+    stub = NominatimStub(rate_limit=0.5).start()
+    try:
+        converter = _converter(tmp_path, stub)
+        assert converter.get_location_info("Lyon") is not None
+        assert converter.get_location_info("Mumbai") is None
+        assert stub.stats['rate_limited'] == 1
+    finally:
+        stub.stop()
+
+
+def test_fixture_built_from_cache_answers_typed_names(tmp_path):
+    source = CacheManager(cache_dir=str(tmp_path / "source"))
+    source.cache_location("Paris, France", {'address': "Paris, France", 'latitude': 48.8566, 'longitude': 2.3522})
+    source.cache_location("São Paulo", {'address': "São Paulo, Brazil", 'latitude': -23.55, 'longitude': -46.63})
+
+    stub = NominatimStub(fixture_from_location_cache(source)).start()
+    try:
+        converter = _converter(tmp_path / "fresh", stub)
+        assert converter.get_location_info("Paris, France")['latitude'] == 48.8566
+        assert converter.get_location_info("sao paulo")['address'] == "São Paulo, Brazil"
+        assert stub.stats['hits'] == 2 and stub.stats['misses'] == 0
+    finally:
+        stub.stop()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+TimezoneConverter tests: fast paths (zone-transition sweeps, memoization,
+stored location timezones) must match the slow path
+"""
+
+import json
+import logging
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytz
+
+from cache_manager import CacheManager
+from timezone_converter import (
+    ConversionError, GeocodingError, LocationNotFoundError, TimezoneConverter, TimezoneNotFoundError
+)
+from timezone_finders import get_timezone_finder
+
+
+def _converter(tmp_path):
+    return TimezoneConverter(CacheManager(cache_dir=str(tmp_path)))
+
+
+def test_recurring_meeting_drift_matches_per_occurrence_conversion(tmp_path):
+    converter = _converter(tmp_path)
+    locations = ['london', 'tokyo', 'sydney', 'la']
+    analysis, error = converter.analyze_recurring_meeting(
+        '10:00', 'chicago', locations, weekday=1, start_date=date(2026, 10, 18)
+    )
+    assert error is None
+    assert analysis['first_date'] == date(2026, 10, 20)
+
+    organizer_tz = pytz.timezone('US/Central')
+    for participant in analysis['participants']:
+        expected = []
+        for week in range(52):
+            local = organizer_tz.localize(datetime(2026, 10, 20, 10) + timedelta(weeks=week))
+            expected.append(local.astimezone(pytz.timezone(participant['timezone'])).strftime('%H:%M'))
+
+        actual = []
+        for segment in participant['segments']:
+            actual.extend([segment['local_time']] * segment['occurrences'])
+        assert actual == expected, participant['input']
+
+    london = analysis['participants'][0]
+    # Europe falls back a week before the US, so one meeting lands an hour early
+    assert [s['local_time'] for s in london['segments']][:3] == ['16:00', '15:00', '16:00']
+    assert [p['input'] for p in analysis['participants'] if p['outside_business_hours']] == ['tokyo', 'sydney', 'la']
+
+
+def test_conversion_memo_reuses_and_invalidates(tmp_path):
+    converter = _converter(tmp_path)
+    instant = datetime(2026, 3, 8, 12, 0, 0, 250000)
+    first = converter.convert_to_timezones('nyc', instant)
+    second = converter.convert_to_timezones('US/Eastern', instant.replace(microsecond=900000))
+    assert second == first
+    assert second is not first
+    assert len(converter._conversion_memo) == 1
+
+    # Editing a result (as the REPL's formatting might) does not leak into later hits
+    first['US/Eastern']['time'] = "edited"
+    second['UTC'].clear()
+    third = converter.convert_to_timezones('nyc', instant)
+    assert third == converter.conversions('US/Eastern', instant) and third['UTC']
+    assert third['US/Eastern']['time'] != "edited"
+
+    converter.major_timezones = converter.major_timezones + ['Asia/Kolkata']
+    third = converter.convert_to_timezones('nyc', instant)
+    assert 'Asia/Kolkata' in third
+    assert len(converter._conversion_memo) == 1
+
+
+def test_cached_location_reuses_stored_timezone(tmp_path):
+    converter = _converter(tmp_path)
+    # An entry from before timezones were stored gets annotated on first use
+    converter.cache_manager.cache_location("Lyon", {'address': 'Lyon', 'latitude': 45.764, 'longitude': 4.8357})
+    cached_at = converter.cache_manager.location_backend.get("lyon")['cached_at']
+    assert converter.resolve_location_timezones(["Lyon"])[0]['timezone'] == 'Europe/Paris'
+
+    entry = converter.cache_manager.location_backend.get("lyon")
+    assert entry['cached_at'] == cached_at
+    assert entry['data']['timezonefinder_version'] == converter.timezonefinder_version
+
+    def fail(lat, lng):
+        raise AssertionError("cache hit should not look up the timezone")
+    converter.timezone_at = fail
+    assert converter.resolve_location_timezones(["Lyon"])[0]['timezone'] == 'Europe/Paris'
+
+
+def test_preferred_timezone_edits_apply_live(tmp_path):
+    converter = _converter(tmp_path)
+    converter.convert_to_timezones('UTC', datetime(2026, 1, 5, 12, 0))
+    converter.cache_manager.update_user_config('preferred_timezones', ['Asia/Kolkata'])
+
+    assert converter.major_timezones == ['Asia/Kolkata']
+    conversions = converter.convert_to_timezones('UTC', datetime(2026, 1, 5, 12, 0))
+    assert sorted(conversions) == ['Asia/Kolkata', 'UTC']
+
+
+def test_unknown_backend_names_in_config_fall_back_to_defaults(tmp_path, caplog):
+    with open(tmp_path / "user_config.json", 'w', encoding='utf-8') as f:
+        json.dump({'zone_backend': 'Zoneinfo', 'cache_backend': 'redis'}, f)
+    with caplog.at_level(logging.WARNING, logger="pytz_buddy"):
+        converter = _converter(tmp_path)
+    assert converter.zone_backend.name == 'pytz'
+    assert converter.cache_manager.get_user_config()['cache_backend'] == 'json'
+    assert "zone_backend" in caplog.text and "cache_backend" in caplog.text
+
+
+def test_converter_leaves_library_logger_configuration_alone(tmp_path):
+    library_logger = logging.getLogger("pytz_buddy")
+    library_logger.setLevel(logging.DEBUG)
+    try:
+        converter = _converter(tmp_path)
+        converter.cache_manager.update_user_config('log_level', 'ERROR')
+        assert library_logger.level == logging.DEBUG
+    finally:
+        library_logger.setLevel(logging.NOTSET)
+
+
+def test_zone_backend_and_finder_mode_edits_apply_live(tmp_path):
+    converter = _converter(tmp_path)
+    converter.cache_manager.update_user_config('zone_backend', 'precomputed')
+    converter.cache_manager.update_user_config('timezone_finder_mode', 'memory')
+    assert converter.zone_backend.name == 'precomputed'
+    assert converter.tf is get_timezone_finder('memory')
+
+    # Constructor arguments win over the config file
+    pinned = TimezoneConverter(converter.cache_manager, zone_backend='pytz')
+    converter.cache_manager.update_user_config('zone_backend', 'zoneinfo')
+    assert pinned.zone_backend.name == 'pytz'
+    assert converter.zone_backend.name == 'zoneinfo'
+
+
+def test_all_zones_world_clock_matches_pytz(tmp_path):
+    converter = _converter(tmp_path)
+    world_clock = converter.convert_to_timezones('chicago', datetime(2026, 3, 8, 3, 30), all_zones=True)
+    assert world_clock['source']['utc_offset'] == '-0500'
+
+    offsets = [group['offset_seconds'] for group in world_clock['groups']]
+    assert offsets == sorted(set(offsets))
+    seen = set()
+    utc_dt = pytz.utc.localize(datetime(2026, 3, 8, 8, 30))
+    for group in world_clock['groups']:
+        for zone in group['zones']:
+            local = utc_dt.astimezone(pytz.timezone(zone['zone']))
+            assert local.utcoffset().total_seconds() == group['offset_seconds']
+            assert local.strftime('%Y-%m-%d %H:%M:%S') == group['time']
+            assert local.tzname() == zone['abbreviation']
+            seen.add(zone['zone'])
+    assert seen == set(pytz.all_timezones)
+
+
+def test_equivalent_zones_evaluated_once(tmp_path):
+    converter = _converter(tmp_path)
+    # 1,000 participants spread over a handful of distinct zones
+    shortcuts = ['nyc', 'east', 'ny', 'london', 'uk', 'paris', 'la', 'west', 'pacific']
+    locations = [shortcuts[i % len(shortcuts)] for i in range(1000)]
+
+    calls = []
+    from_utc = converter.zone_backend.from_utc
+    converter.zone_backend.from_utc = lambda dt, zone: calls.append(zone) or from_utc(dt, zone)
+    overlap = converter.calculate_business_hours_overlap(locations, 7, 19)
+
+    assert overlap['zone_classes'] == 4
+    assert len(calls) <= 24 * 4
+    for hour in overlap['overlap_hours']:
+        utc_dt = pytz.utc.localize(datetime.combine(datetime.now().date(), datetime.min.time()).replace(hour=hour['utc_hour']))
+        for detail in hour['locations']:
+            assert detail['local_time'] == utc_dt.astimezone(pytz.timezone(detail['timezone'])).strftime('%H:%M %Z')
+    assert len(overlap['overlap_hours'][0]['locations']) == 1000
+
+
+def test_overlap_matrix_matches_minute_by_minute(tmp_path):
+    converter = _converter(tmp_path)
+    zones = ['US/Eastern', 'Europe/London', 'Asia/Kolkata', 'America/St_Johns', 'Australia/Sydney']
+    converter.timezone_shortcuts.update({zone.lower(): zone for zone in zones})
+    # US clocks change on Sunday 2026-03-08, inside this week
+    data = converter.calculate_overlap_matrix([zone.lower() for zone in zones], 9, 17, week_start=date(2026, 3, 2))
+
+    week_start = datetime(2026, 3, 2)
+    minutes = {zone: set() for zone in zones}
+    for zone in zones:
+        tz = pytz.timezone(zone)
+        for m in range(7 * 24 * 60):
+            local = pytz.utc.localize(week_start + timedelta(minutes=m)).astimezone(tz)
+            if local.weekday() < 5 and 9 <= local.hour < 17:
+                minutes[zone].add(m)
+    expected = [[len(minutes[a] & minutes[b]) for b in zones] for a in zones]
+    assert data['matrix'] == expected
+
+
+def test_schedule_results_cached_on_disk(tmp_path):
+    converter = _converter(tmp_path)
+    locations = ['nyc', 'london', 'paris']
+    meetings = converter.find_meeting_times(locations, 8, 18)
+    overlap = converter.calculate_business_hours_overlap(locations, 8, 18)
+
+    # A fresh process answers the same team, in any order, from the cache alone
+    converter = _converter(tmp_path)
+    # A cache hit never evaluates zones
+    converter.zone_equivalence_classes = None
+    assert converter.calculate_business_hours_overlap(['paris', 'nyc', 'london'], 8, 18)['overlap_hours'] == [
+        dict(hour, locations=sorted(hour['locations'], key=lambda d: ['paris', 'nyc', 'london'].index(d['location'])))
+        for hour in overlap['overlap_hours']
+    ]
+    assert [m['utc_time'] for m in converter.find_meeting_times(locations, 8, 18)] == \
+        [m['utc_time'] for m in meetings]
+    assert converter.cache_manager.schedule_lookup_stats == {'lookups': 2, 'hits': 2}
+
+    # Any changed input is a different entry
+    del converter.zone_equivalence_classes
+    converter.find_meeting_times(locations, 9, 17)
+    assert converter.cache_manager.schedule_lookup_stats['hits'] == 2
+
+
+def test_follow_the_sun_matches_quarter_hour_scan(tmp_path):
+    converter = _converter(tmp_path)
+    teams = [
+        {'name': 'amer', 'location': 'nyc', 'start': 8, 'end': 16},
+        {'name': 'emea', 'location': 'london', 'start': 8, 'end': 16, 'days': [0, 1, 2, 3, 4]},
+        {'name': 'apac', 'location': 'sydney', 'start': 22, 'end': 6},
+    ]
+    # Spans the US, UK and Australian DST changes of spring 2026
+    plan = converter.plan_follow_the_sun(teams, date(2026, 3, 1), date(2026, 4, 10))
+    assert [change['zone'] for change in plan['dst_changes']] == ['US/Eastern', 'Europe/London', 'Australia/Sydney']
+    assert len(plan['periods']) == 4
+
+    zones = {team['name']: pytz.timezone(team['timezone']) for team in plan['teams']}
+    segments = iter(plan['segments'])
+    segment = next(segments)
+    dt = plan['start']
+    while dt < plan['end']:
+        while segment['end'] <= dt:
+            segment = next(segments)
+        expected = []
+        for team in teams:
+            local = pytz.utc.localize(dt).astimezone(zones[team['name']])
+            # The overnight apac shift belongs to the local day it starts on
+            shift_day = local - timedelta(days=1) if local.hour < team['end'] < team['start'] else local
+            hours = (local.hour - team['start']) % 24
+            if hours < (team['end'] - team['start']) % 24 and shift_day.weekday() in team.get('days', range(7)):
+                expected.append(team['name'])
+        assert segment['teams'] == tuple(expected), dt
+        dt += timedelta(minutes=15)
+
+    assert plan['gaps'] == [segment for segment in plan['segments'] if not segment['teams']]
+    assert all(len(segment['teams']) > 1 for segment in plan['double_coverage'])
+
+
+def test_core_api_is_quiet_and_raises_typed_errors(tmp_path, capsys):
+    converter = _converter(tmp_path)
+    converter.cache_manager.cache_location("Lyon", {'address': 'Lyon', 'latitude': 45.764, 'longitude': 4.8357})
+
+    class Geocoder:
+        def geocode(self, query):
+            if query == "offline":
+                raise ConnectionError("network down")
+            return None
+    converter.geolocator = Geocoder()
+
+    result = converter.lookup("Lyon", datetime(2026, 1, 5, 12, 0))
+    assert (result['source'], result['timezone']) == ('cache', 'Europe/Paris')
+    assert converter.lookup("cst")['alternatives']
+    with pytest.raises(LocationNotFoundError):
+        converter.lookup("Nowhere at all")
+    with pytest.raises(GeocodingError) as error:
+        converter.lookup("offline")
+    assert isinstance(error.value.__cause__, ConnectionError)
+    converter.timezone_grid = None
+    converter.tf = type("NoZones", (), {'timezone_at': lambda self, lat, lng: None})()
+    with pytest.raises(TimezoneNotFoundError):
+        converter.timezone_at(0.0, -140.0)
+    with pytest.raises(ConversionError):
+        converter.conversions("Not/AZone")
+    assert capsys.readouterr().out == ""
+
+    # The REPL wrappers keep printing and returning None
+    assert converter.convert_to_timezones("Not/AZone") is None
+    assert "Error converting timezones" in capsys.readouterr().out
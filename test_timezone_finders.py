@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+TimezoneFinder modes: identical answers, and forked workers reuse the parent's data
+"""
+
+import multiprocessing
+import os
+import random
+
+import pytest
+
+from timezone_finders import TIMEZONE_FINDER_MODES, create_timezone_finder, get_timezone_finder
+
+
+def test_modes_agree():
+    finders = {mode: create_timezone_finder(mode) for mode in TIMEZONE_FINDER_MODES}
+    generator = random.Random(11)
+    for _ in range(500):
+        lat, lng = generator.uniform(-80, 80), generator.uniform(-180, 180)
+        answers = {tf.timezone_at(lat=lat, lng=lng) for tf in finders.values()}
+        assert len(answers) == 1
+
+
+def _child(results):
+    results.put((
+        id(get_timezone_finder('mmap')),
+        get_timezone_finder('file') is not _PARENT_FILE_FINDER,
+        get_timezone_finder('mmap').timezone_at(lat=35.68, lng=139.69)
+    ))
+
+
+_PARENT_FILE_FINDER = None
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork-based worker processes")
+def test_forked_workers_share_parent_finder():
+    global _PARENT_FILE_FINDER
+    parent_mmap = get_timezone_finder('mmap')
+    _PARENT_FILE_FINDER = get_timezone_finder('file')
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    process = context.Process(target=_child, args=(results,))
+    process.start()
+    mmap_id, reopened_file, answer = results.get(timeout=60)
+    process.join(timeout=60)
+
+    # mmap data is inherited; file handles are reopened so offsets aren't shared
+    assert mmap_id == id(parent_mmap)
+    assert reopened_file
+    assert answer == 'Asia/Tokyo'
+
+
+def test_converter_lookups_are_thread_safe(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from cache_manager import CacheManager
+    from timezone_converter import TimezoneConverter
+
+    # No grid in a fresh cache dir, so every lookup reaches the shared file-mode finder
+    converter = TimezoneConverter(CacheManager(cache_dir=str(tmp_path)), timezone_finder_mode='file')
+    generator = random.Random(5)
+    points = [(generator.uniform(-60, 70), generator.uniform(-180, 180)) for _ in range(20000)]
+    reference = create_timezone_finder('file')
+    expected = [reference.timezone_at(lat=lat, lng=lng) for lat, lng in points]
+
+    def lookup(point):
+        try:
+            return converter.timezone_at(*point)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(4) as pool:
+        assert list(pool.map(lookup, points, chunksize=64)) == expected
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Timezone grid test: grid answers must match TimezoneFinder wherever the grid answers
+"""
+
+import os
+
+from cache_manager import CacheManager
+from timezone_converter import TimezoneConverter
+from timezone_grid import GRID_FILENAME, build_grid_file
+
+COORDINATES = [
+    (60.0, 100.0), (48.8566, 2.3522), (40.7128, -74.0060), (35.6762, 139.6503),
+    (-33.8688, 151.2093), (0.0, -140.0), (-20.0, 80.0), (34.5023, -97.9578)
+]
+
+
+def test_grid_agrees_with_timezonefinder(tmp_path):
+    converter = TimezoneConverter(CacheManager(cache_dir=str(tmp_path)))
+    assert converter.timezone_grid is None
+    expected = [converter.get_timezone_for_coordinates(lat, lng) for lat, lng in COORDINATES]
+
+    path = os.path.join(str(tmp_path), GRID_FILENAME)
+    grid, checked, mismatches = build_grid_file(path, resolution=1.0, verify_samples=5000, tf=converter.tf)
+    assert checked > 0
+    assert mismatches == []
+
+    converter = TimezoneConverter(CacheManager(cache_dir=str(tmp_path)))
+    assert converter.timezone_grid is not None
+    actual = [converter.get_timezone_for_coordinates(lat, lng) for lat, lng in COORDINATES]
+    assert actual == expected
+    # Open ocean and central Siberia are far from any border
+    assert converter.timezone_grid.hits >= 2
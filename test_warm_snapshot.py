@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Round-trip test for the warm-start snapshot
+"""
+
+from datetime import datetime
+
+import timezone_converter
+import warm_snapshot
+import zone_backends
+from cache_manager import CacheManager
+from timezone_converter import TimezoneConverter
+
+
+def test_snapshot_round_trip(tmp_path, monkeypatch):
+    cache_manager = CacheManager(cache_dir=str(tmp_path))
+    cache_manager.cache_location("Duncan, Oklahoma", {
+        'address': 'Duncan, Stephens County, Oklahoma, United States',
+        'latitude': 34.5023, 'longitude': -97.9578
+    })
+    converter = TimezoneConverter(cache_manager, zone_backend='precomputed')
+    expected = converter.convert_to_timezones('Asia/Kolkata', datetime(2025, 3, 9, 12))
+    assert warm_snapshot.save_snapshot(converter)
+
+    # Start "cold": no interned tables and a fresh cache manager
+    monkeypatch.setattr(zone_backends, '_ZONE_TABLES', {})
+    tables_before_finder = []
+    original_get_finder = timezone_converter.get_timezone_finder
+    monkeypatch.setattr(timezone_converter, 'get_timezone_finder', lambda mode: (
+        tables_before_finder.append('US/Eastern' in zone_backends._ZONE_TABLES) or original_get_finder(mode)
+    ))
+    warm_cache = CacheManager(cache_dir=str(tmp_path))
+    warm_converter = TimezoneConverter(
+        warm_cache, zone_backend='precomputed',
+        snapshot_path=warm_snapshot.default_snapshot_path(warm_cache)
+    )
+    assert warm_converter.snapshot_loaded
+    # Loaded while the converter is built, before its finder
+    assert tables_before_finder == [True]
+
+    times, _ = zone_backends._ZONE_TABLES['US/Eastern']
+    assert isinstance(times, memoryview)
+    # The mapped location index is parsed on the first lookup, not at startup
+    assert warm_cache._location_index is None and warm_cache._location_index_loader is not None
+    monkeypatch.setattr(warm_cache, '_read_json', lambda path: {})
+    assert warm_cache.get_cached_location("duncan, oklahoma")['latitude'] == 34.5023
+
+    actual = warm_converter.convert_to_timezones('Asia/Kolkata', datetime(2025, 3, 9, 12))
+    assert {tz: info['time'] for tz, info in actual.items()} == \
+        {tz: info['time'] for tz, info in expected.items()}
+
+
+def test_snapshot_invalidated_by_version_change(tmp_path, monkeypatch):
+    converter = TimezoneConverter(CacheManager(cache_dir=str(tmp_path)))
+    assert warm_snapshot.save_snapshot(converter)
+
+    monkeypatch.setattr(warm_snapshot.pytz, '__version__', '1999.1')
+    assert not warm_snapshot.load_snapshot(warm_snapshot.default_snapshot_path(converter.cache_manager))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Alias index tests: abbreviations, IANA and city names resolve without geocoding
+"""
+
+from datetime import datetime
+
+from cache_manager import CacheManager
+from timezone_converter import TimezoneConverter
+from zone_aliases import resolve_alias
+
+
+def test_abbreviations_cities_and_names_resolve():
+    assert resolve_alias('PDT') == ('America/Los_Angeles', [])
+    assert resolve_alias('cest') == ('Europe/Paris', [])
+    assert resolve_alias('america/new_york') == ('America/New_York', [])
+    assert resolve_alias('Sao Paulo') == ('America/Sao_Paulo', [])
+    assert resolve_alias('New_York') == ('America/New_York', [])
+    assert resolve_alias('Duncan, Oklahoma') == (None, [])
+
+    # Ambiguous abbreviations pick one zone and report the others
+    zone_name, alternatives = resolve_alias('IST')
+    assert zone_name == 'Asia/Kolkata'
+    assert 'Europe/Dublin' in alternatives
+
+
+def test_place_names_shared_with_other_places_are_not_guessed():
+    # Link, Antarctic and sub-region zone names go to the geocoder instead
+    for name in ['Samoa', 'San Juan', 'Davis', 'Greenwich', 'Knox']:
+        assert resolve_alias(name) == (None, []), name
+    assert resolve_alias('Pacific/Samoa') == ('Pacific/Samoa', [])
+    assert resolve_alias('Apia') == ('Pacific/Apia', [])
+
+    # Well-known zone cities keep their zone but report the other place
+    assert resolve_alias('Perth') == ('Australia/Perth', ['Europe/London'])
+    assert resolve_alias('Halifax') == ('America/Halifax', ['Europe/London'])
+
+
+def test_converter_uses_aliases_before_geocoding(tmp_path):
+    converter = TimezoneConverter(CacheManager(cache_dir=str(tmp_path)))
+
+    class NoGeocoder:
+        def geocode(self, query):
+            raise AssertionError(f"geocoded {query}")
+    converter.geolocator = NoGeocoder()
+
+    assert converter.cache_manager.update_user_config('timezone_aliases', {'hq': 'Europe/Berlin'})
+    resolved = converter.resolve_location_timezones(['hq', 'PST', 'CST', 'Kolkata', 'nyc'])
+    assert [item['timezone'] for item in resolved] == [
+        'Europe/Berlin', 'US/Pacific', 'US/Central', 'Asia/Kolkata', 'US/Eastern'
+    ]
+    assert converter.convert_specific_time('14:30', 'CEST')[0] is not None
+
+
+def test_abbreviations_keep_their_offset_in_summer(tmp_path):
+    # IANA names come before the abbreviation table
+    assert resolve_alias('EST') == ('EST', [])
+    assert resolve_alias('CET') == ('CET', [])
+    summer = datetime(2025, 7, 4, 14, 30)
+    assert resolve_alias('CET', at=summer)[0] == 'Africa/Algiers'
+    assert resolve_alias('PDT', at=datetime(2025, 1, 4, 14, 30))[0] == 'Etc/GMT+7'
+
+    converter = TimezoneConverter(CacheManager(cache_dir=str(tmp_path)))
+    for zone_name, offset in [('EST', '-0500'), ('MST', '-0700'), ('CET', '+0100'), ('PST', '-0800')]:
+        conversions, error = converter.convert_specific_time('14:30', zone_name, '2025-07-04')
+        assert error is None
+        source = next(details for details in conversions.values() if details['is_source'])
+        assert source['time'].startswith("2025-07-04 14:30:00")
+        assert source['utc_offset'] == offset, zone_name
+    # Zone names and shortcuts still follow daylight saving time
+    conversions, _ = converter.convert_specific_time('14:30', 'nyc', '2025-07-04')
+    assert conversions['US/Eastern']['utc_offset'] == '-0400'
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Conformance test: every zone backend must agree with pytz across DST edges
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from zone_backends import available_backends, get_zone_backend
+
+ZONES = [
+    'US/Eastern', 'US/Central', 'US/Mountain', 'US/Pacific', 'America/Sao_Paulo',
+    'Europe/London', 'Europe/Paris', 'Asia/Tokyo', 'Asia/Shanghai', 'Asia/Kolkata',
+    'Australia/Sydney', 'Australia/Lord_Howe', 'Pacific/Chatham', 'Pacific/Apia',
+    'America/St_Johns', 'Africa/Casablanca', 'UTC', 'Etc/GMT+5'
+]
+WINDOW_START = datetime(2024, 1, 1)
+WINDOW_END = datetime(2027, 1, 1)
+EDGE_OFFSETS = [timedelta(minutes=m) for m in (-90, -60, -30, -1, 0, 1, 30, 60, 90)]
+
+
+def _transitions(zone_name):
+    """UTC transition instants of a zone inside the test window"""
+    reference = get_zone_backend('pytz').get_zone(zone_name)
+    times = getattr(reference, '_utc_transition_times', [])
+    return [t for t in times if WINDOW_START <= t < WINDOW_END]
+
+
+def _describe(dt):
+    return (dt.replace(tzinfo=None), dt.utcoffset(), dt.tzname())
+
+
+@pytest.mark.parametrize('backend_name', [b for b in available_backends() if b != 'pytz'])
+@pytest.mark.parametrize('zone_name', ZONES)
+def test_backends_agree_across_dst_edges(backend_name, zone_name):
+    reference = get_zone_backend('pytz')
+    backend = get_zone_backend(backend_name)
+
+    instants = [WINDOW_START, datetime(2025, 6, 21, 12), WINDOW_END]
+    for transition in _transitions(zone_name):
+        instants.extend(transition + delta for delta in EDGE_OFFSETS)
+
+    for instant in instants:
+        # UTC -> local must give identical wall time, offset and abbreviation
+        expected = reference.from_utc(instant, zone_name)
+        assert _describe(backend.from_utc(instant, zone_name)) == _describe(expected), instant
+
+        # Local -> UTC must resolve gaps and repeated hours the same way
+        for delta in EDGE_OFFSETS:
+            wall_time = expected.replace(tzinfo=None) + delta
+            expected_local = reference.localize(wall_time, zone_name)
+            actual_local = backend.localize(wall_time, zone_name)
+            assert _describe(actual_local) == _describe(expected_local), (zone_name, wall_time)
+
+
+@pytest.mark.parametrize('backend_name', available_backends())
+def test_unknown_zone_raises(backend_name):
+    with pytest.raises(KeyError):
+        get_zone_backend(backend_name).localize(datetime(2025, 1, 1), 'Mars/Olympus_Mons')
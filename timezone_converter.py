@@ -5,41 +5,140 @@ A simple application to find timezone information for any location
 and convert it to other major timezones around the world.
 """
 
+import logging
+import os
 import pytz
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
 from geopy.geocoders import Nominatim
-from timezonefinder import TimezoneFinder
 import requests
+from zone_aliases import resolve_alias
+from zone_backends import get_zone_backend, get_zone_offset_matrix, zone_transitions
+from timezone_finders import get_timezone_finder, timezone_finder_lock
+from timezone_grid import GRID_FILENAME, TimezoneGrid, timezonefinder_version
+from warm_snapshot import load_snapshot
+
+# Library code logs here instead of printing and never configures the logger;
+# the REPL applies the log_level setting to it
+logger = logging.getLogger("pytz_buddy")
+
+
+class TimezoneBuddyError(Exception):
+    """Base class for errors raised by the quiet core API"""
+
+
+class LocationNotFoundError(TimezoneBuddyError, LookupError):
+    """The geocoder found no match for a location name"""
+
+    def __init__(self, location_name):
+        super().__init__(f"No location found for '{location_name}'")
+        self.location_name = location_name
+
+
+class GeocodingError(TimezoneBuddyError):
+    """The geocoder could not be queried (network, HTTP or rate limit error)"""
+
+    def __init__(self, location_name, reason):
+        super().__init__(f"Geocoding '{location_name}' failed: {reason}")
+        self.location_name = location_name
+
+
+class TimezoneNotFoundError(TimezoneBuddyError, LookupError):
+    """No timezone is known for a point (e.g. open sea) or the lookup failed"""
+
+    def __init__(self, lat, lng, reason=None):
+        message = f"No timezone found at {lat}, {lng}"
+        super().__init__(f"{message}: {reason}" if reason else message)
+        self.lat = lat
+        self.lng = lng
+
+
+class ConversionError(TimezoneBuddyError):
+    """A time could not be converted (unknown zone or out-of-range datetime)"""
+
+    def __init__(self, zone_name, reason):
+        super().__init__(f"Cannot convert from '{zone_name}': {reason}")
+        self.zone_name = zone_name
+
+def build_geolocator(endpoint=None):
+    """Create the Nominatim geocoder, optionally for a custom endpoint URL
+    
+    endpoint is a base URL such as "http://127.0.0.1:8088"; geopy appends
+    /search. An empty endpoint means the public OpenStreetMap service.
+    """
+    if not endpoint:
+        return Nominatim(user_agent="pytz_buddy")
+    url = urlparse(endpoint if "://" in endpoint else f"https://{endpoint}")
+    return Nominatim(
+        user_agent="pytz_buddy",
+        domain=url.netloc + url.path.rstrip('/'),
+        scheme=url.scheme
+    )
+
+
+def _popcount(value):
+    """Number of set bits in a non-negative int"""
+    return value.bit_count() if hasattr(value, 'bit_count') else bin(value).count('1')
+
 
 class TimezoneConverter:
-    def __init__(self, cache_manager=None):
-            self.geolocator = Nominatim(user_agent="pytz_buddy")
-            self.tf = TimezoneFinder()
+    def __init__(self, cache_manager=None, zone_backend=None, cache_backend=None,
+                 geocoder_endpoint=None, timezone_finder_mode=None, snapshot_path=None):
             
             # Import and initialize cache manager
             if cache_manager is None:
                 from cache_manager import CacheManager
-                self.cache_manager = CacheManager()
+                self.cache_manager = CacheManager(location_backend=cache_backend)
             else:
                 self.cache_manager = cache_manager
+                if cache_backend is not None:
+                    from cache_backends import get_cache_backend
+                    if isinstance(cache_backend, str):
+                        cache_backend = get_cache_backend(cache_backend, cache_manager)
+                    self.cache_manager.location_backend = cache_backend
             
-            # Load user configuration and use preferred timezones
+            # Load user configuration and use preferred timezones; the listener
+            # applies later edits to user_config.json without re-reading it here
             user_config = self.cache_manager.get_user_config()
-            self.major_timezones = user_config.get('preferred_timezones', [
-                'US/Eastern',
-                'US/Central', 
-                'US/Mountain',
-                'US/Pacific',
-                'Europe/London',
-                'Europe/Paris',
-                'Asia/Tokyo',
-                'Asia/Shanghai',
-                'Australia/Sydney',
-                'UTC'
-            ])
-            
-            # Store user config for use in other methods
-            self.user_config = user_config
+            self.major_timezones = list(user_config['preferred_timezones'])
+            self.cache_manager.add_config_listener(self._apply_user_config)
+            
+            # Zone provider used for all conversions (pytz, zoneinfo or precomputed)
+            self._zone_backend_override = zone_backend
+            self.zone_backend = get_zone_backend(zone_backend or user_config.get('zone_backend'))
+            
+            # Warm-start snapshot (warm_snapshot.py): zone tables and location index
+            # are mapped in before the finder, grid and caches below are built
+            self.snapshot_loaded = bool(snapshot_path) and load_snapshot(
+                snapshot_path, self.cache_manager, self.zone_backend
+            )
+            
+            # Polygon data shared per process (and with forked workers): file, mmap or memory
+            # Lookups hold the mode's finder lock: prefetch and refresh threads share the finder
+            self._timezone_finder_mode_override = timezone_finder_mode
+            self.timezone_finder_mode = timezone_finder_mode or user_config['timezone_finder_mode']
+            self.tf = get_timezone_finder(self.timezone_finder_mode)
+            
+            # Public Nominatim unless an endpoint (e.g. nominatim_stub.py) is configured
+            self._geocoder_endpoint_override = geocoder_endpoint
+            self.geolocator = build_geolocator(geocoder_endpoint or user_config['geocoder_endpoint'])
+            
+            # Precomputed raster answering most coordinates without TimezoneFinder
+            # (built offline with 'python timezone_grid.py build')
+            self.timezonefinder_version = timezonefinder_version()
+            self.timezone_grid = TimezoneGrid.open(
+                os.path.join(self.cache_manager.cache_dir, GRID_FILENAME)
+            )
+            
+            # Bounded LRU memo of convert_to_timezones results, keyed on
+            # (backend, source zone, instant to the second) for the current targets
+            self.conversion_memo_size = 256
+            self._conversion_memo = OrderedDict()
+            self._conversion_memo_targets = tuple(self.major_timezones)
+            
+            # Optional background refresh-ahead for the location cache
+            self.refresher = None
             
             # Popular timezone shortcuts for quick access
             self.timezone_shortcuts = {
@@ -67,15 +166,49 @@ class TimezoneConverter:
             }
 
     
-    def resolve_timezone_shortcut(self, input_tz):
-        """Resolve timezone shortcuts to full timezone names"""
-        if input_tz.lower() in self.timezone_shortcuts:
-            return self.timezone_shortcuts[input_tz.lower()]
-        return input_tz
+    def resolve_alias(self, name, at=None):
+        """Resolve a name to (zone, alternatives) without geocoding, or (None, [])
+        
+        Quiet form of lookup_timezone_alias: an ambiguous name is logged,
+        and the other candidates are returned instead of printed. Given at
+        (naive local time), abbreviations keep their fixed offset then.
+        """
+        zone_name, alternatives = resolve_alias(
+            name,
+            user_aliases=self.user_config.get('timezone_aliases'),
+            shortcuts=self.timezone_shortcuts,
+            preferred_zones=set(self.timezone_shortcuts.values()).union(self.major_timezones),
+            at=at
+        )
+        if zone_name and alternatives:
+            logger.info("'%s' is ambiguous; using %s (also: %s)", name, zone_name, ", ".join(alternatives))
+        return zone_name, alternatives
+    
+    def lookup_timezone_alias(self, name, report_ambiguity=True, at=None):
+        """Resolve a shortcut, alias, IANA name, zone city or abbreviation to a zone
+        
+        Checks user aliases (config timezone_aliases), then the shortcuts,
+        then the static alias index. Returns None for anything that needs
+        geocoding. Ambiguous abbreviations resolve to the best candidate,
+        and the alternatives are printed.
+        """
+        zone_name, alternatives = self.resolve_alias(name, at)
+        if zone_name and alternatives and report_ambiguity:
+            print(f"⚠️ '{name}' is ambiguous; using {zone_name} "
+                  f"(also: {', '.join(alternatives[:4])}{'...' if len(alternatives) > 4 else ''})")
+        return zone_name
+    
+    def resolve_timezone_shortcut(self, input_tz, at=None):
+        """Resolve timezone shortcuts and aliases to full timezone names (at: see resolve_alias)"""
+        return self.lookup_timezone_alias(input_tz, at=at) or input_tz
     
     def calculate_time_difference(self, source_dt, target_dt):
         """Calculate relative time difference between two timezone-aware datetimes"""
         diff_seconds = (target_dt.utcoffset() - source_dt.utcoffset()).total_seconds()
+        return self._format_offset_difference(diff_seconds)
+    
+    def _format_offset_difference(self, diff_seconds):
+        """Describe an offset difference in seconds as N hours ahead or behind"""
         diff_hours = int(diff_seconds / 3600)
         
         if diff_hours == 0:
@@ -85,36 +218,31 @@ class TimezoneConverter:
         else:
             return f"{abs(diff_hours)} hour{'s' if abs(diff_hours) != 1 else ''} behind"
     
-    def find_meeting_times(self, locations, start_hour=None, end_hour=None, duration_hours=1):
-        """Find optimal meeting times across multiple locations during business hours"""
-        # Use user configuration for business hours if not specified
-        if start_hour is None or end_hour is None:
-            business_hours = self.user_config.get('business_hours', {'start': 8, 'end': 18})
-            start_hour = business_hours.get('start', 8)
-            end_hour = business_hours.get('end', 18)
-            
-        if len(locations) < 2:
-            return None
-            
-        # Process all locations to get timezone info
+    def resolve_location_timezones(self, locations):
+        """Resolve location names or shortcuts to {'input', 'address', 'timezone'} dicts
+        
+        Locations that can't be geocoded or placed in a timezone are skipped
+        and logged; nothing is printed.
+        """
         location_timezones = []
+        aliases = {}
         for location in locations:
-            if location.lower() in self.timezone_shortcuts:
-                tz_str = self.timezone_shortcuts[location.lower()]
+            # Repeated names are resolved (and logged if ambiguous) once
+            if location.lower() not in aliases:
+                aliases[location.lower()] = self.resolve_alias(location)[0]
+            tz_str = aliases[location.lower()]
+            if tz_str:
                 location_data = {
                     'input': location,
                     'address': f"Timezone: {tz_str}",
                     'timezone': tz_str
                 }
             else:
-                location_info = self.get_location_info(location)
-                if not location_info:
-                    continue
-                timezone_str = self.get_timezone_for_coordinates(
-                    location_info['latitude'], 
-                    location_info['longitude']
-                )
-                if not timezone_str:
+                try:
+                    location_info = self.locate(location)[0]
+                    timezone_str = self.resolve_timezone(location, location_info)
+                except TimezoneBuddyError as e:
+                    logger.warning("Skipping %s: %s", location, e)
                     continue
                 location_data = {
                     'input': location,
@@ -122,6 +250,57 @@ class TimezoneConverter:
                     'timezone': timezone_str
                 }
             location_timezones.append(location_data)
+        return location_timezones
+    
+    def zone_equivalence_classes(self, location_timezones, window_start, window_end, start_hour, end_hour):
+        """Group locations whose zones behave identically over a UTC window
+        
+        Locations fall in one class when their zones have the same offsets and
+        abbreviations at the same instants in [window_start, window_end) and
+        share business hours, so evaluating any one member answers for all.
+        Returns (representative zone per class, class index per location).
+        """
+        class_keys = {}
+        zone_keys = {}
+        representatives = []
+        class_index = []
+        for location_data in location_timezones:
+            zone_name = location_data['timezone']
+            zone_key = zone_keys.get(zone_name)
+            if zone_key is None:
+                try:
+                    zone_key = tuple(zone_transitions(zone_name, window_start, window_end))
+                except Exception:
+                    # Unknown to the tables; keep the zone in a class of its own
+                    zone_key = (zone_name,)
+                zone_keys[zone_name] = zone_key
+            key = (zone_key, start_hour, end_hour)
+            if key not in class_keys:
+                class_keys[key] = len(representatives)
+                representatives.append(zone_name)
+            class_index.append(class_keys[key])
+        return representatives, class_index
+    
+    def find_meeting_times(self, locations, start_hour=None, end_hour=None, duration_hours=1,
+                           location_timezones=None, use_cache=True):
+        """Find optimal meeting times across multiple locations during business hours
+        
+        location_timezones, as returned by resolve_location_timezones, skips
+        resolving the locations again (batch workers get them pre-resolved);
+        use_cache=False bypasses the on-disk schedule result cache.
+        """
+        # Use user configuration for business hours if not specified
+        if start_hour is None or end_hour is None:
+            business_hours = self.user_config.get('business_hours', {'start': 8, 'end': 18})
+            start_hour = business_hours.get('start', 8)
+            end_hour = business_hours.get('end', 18)
+            
+        if len(locations) < 2:
+            return None
+            
+        # Process all locations to get timezone info
+        if location_timezones is None:
+            location_timezones = self.resolve_location_timezones(locations)
         
         if len(location_timezones) < 2:
             return None
@@ -132,6 +311,24 @@ class TimezoneConverter:
         # Check next 7 days for meeting opportunities
         from datetime import datetime, timedelta
         today = datetime.now().date()
+        window_start = datetime.combine(today, datetime.min.time())
+        
+        # The same team asked again today costs one cache lookup
+        cache_key = self.cache_manager.schedule_cache_key(
+            'meeting', [location_data['timezone'] for location_data in location_timezones],
+            start_hour, end_hour, duration_hours, today, 7, self.zone_backend.name
+        )
+        cached_times = self.cache_manager.get_schedule_result(cache_key) if use_cache else None
+        if cached_times is not None:
+            return self._meeting_suggestions_at(
+                location_timezones, [datetime.fromisoformat(utc_time) for utc_time in cached_times]
+            )
+        
+        # Each class of equivalent zones is evaluated once per hour and the
+        # result fanned out to its members
+        class_zones, class_index = self.zone_equivalence_classes(
+            location_timezones, window_start, window_start + timedelta(days=7), start_hour, end_hour
+        )
         
         for day_offset in range(7):
             check_date = today + timedelta(days=day_offset)
@@ -141,37 +338,63 @@ class TimezoneConverter:
                 meeting_time = datetime.combine(check_date, datetime.min.time().replace(hour=hour))
                 
                 valid_for_all = True
-                time_details = []
+                class_times = []
                 
-                for location_data in location_timezones:
+                for zone_name in class_zones:
                     try:
-                        tz = pytz.timezone(location_data['timezone'])
-                        # Convert meeting time to this timezone
-                        utc_time = pytz.utc.localize(meeting_time)
-                        local_time = utc_time.astimezone(tz)
-                        
-                        # Check if it's within business hours
-                        if not (start_hour <= local_time.hour < end_hour):
-                            valid_for_all = False
-                            break
-                            
-                        time_details.append({
-                            'location': location_data['input'],
-                            'address': location_data['address'],
-                            'local_time': local_time,
-                            'timezone': location_data['timezone']
-                        })
+                        # Convert meeting time (UTC) to this timezone
+                        local_time = self.zone_backend.from_utc(meeting_time, zone_name)
                     except Exception:
                         valid_for_all = False
                         break
+                    
+                    # Check if it's within business hours
+                    if not (start_hour <= local_time.hour < end_hour):
+                        valid_for_all = False
+                        break
+                    class_times.append(local_time)
                 
-                if valid_for_all and len(time_details) == len(location_timezones):
+                if valid_for_all:
+                    time_details = [{
+                        'location': location_data['input'],
+                        'address': location_data['address'],
+                        'local_time': class_times[class_index[i]],
+                        'timezone': location_data['timezone']
+                    } for i, location_data in enumerate(location_timezones)]
                     meeting_suggestions.append({
                         'utc_time': meeting_time,
                         'locations': time_details
                     })
+                    if len(meeting_suggestions) == 10:
+                        break
+            if len(meeting_suggestions) == 10:
+                break
         
+        if use_cache:
+            self.cache_manager.cache_schedule_result(
+                cache_key, [suggestion['utc_time'].isoformat() for suggestion in meeting_suggestions],
+                today + timedelta(days=6)
+            )
         return meeting_suggestions[:10]  # Return top 10 suggestions
+    
+    def _meeting_suggestions_at(self, location_timezones, utc_times):
+        """Rebuild meeting suggestions for known UTC times (a cached result)"""
+        suggestions = []
+        for utc_time in utc_times:
+            local_times = {}
+            time_details = []
+            for location_data in location_timezones:
+                zone_name = location_data['timezone']
+                if zone_name not in local_times:
+                    local_times[zone_name] = self.zone_backend.from_utc(utc_time, zone_name)
+                time_details.append({
+                    'location': location_data['input'],
+                    'address': location_data['address'],
+                    'local_time': local_times[zone_name],
+                    'timezone': zone_name
+                })
+            suggestions.append({'utc_time': utc_time, 'locations': time_details})
+        return suggestions
   # Return top 10 suggestions
         
     def display_meeting_suggestions(self, suggestions, locations):
@@ -209,15 +432,18 @@ class TimezoneConverter:
             print("💡 Tip: These times work within standard business hours for all locations!")
             print("="*70)
         
-    def process_timezone_shortcut(self, shortcut):
-        """Process a timezone shortcut directly without location lookup"""
-        print(f"Using timezone shortcut: {shortcut} → {self.timezone_shortcuts[shortcut.lower()]}")
-        
-        timezone_str = self.timezone_shortcuts[shortcut.lower()]
+    def process_timezone_shortcut(self, shortcut, timezone_str=None):
+        """Process a timezone shortcut or alias directly without location lookup"""
+        timezone_str = timezone_str or self.lookup_timezone_alias(shortcut)
+        print(f"Using timezone shortcut: {shortcut} → {timezone_str}")
         
         # Get current time conversions
         conversions = self.convert_to_timezones(timezone_str)
         
+        return self._zone_result(timezone_str, conversions)
+    
+    def _zone_result(self, timezone_str, conversions):
+        """Result dict for a name that resolved straight to a zone"""
         return {
             'location_info': {
                 'address': f"Timezone: {timezone_str}",
@@ -226,55 +452,199 @@ class TimezoneConverter:
             },
             'timezone': timezone_str,
             'conversions': conversions
-        }    
-    def get_location_info(self, location_name):
-        """Get coordinates and address for a location with caching"""
-        # Try to get from cache first
-        cached_result = self.cache_manager.get_cached_location(location_name)
+        }
+    
+    def locate(self, location_name):
+        """Get (location data, source) for a location; source is 'cache' or 'geocoder'
+        
+        Quiet core of get_location_info. Raises LocationNotFoundError when the
+        geocoder has no match and GeocodingError when it cannot be queried.
+        """
+        # Try to get from cache first; with a refresher running, stale entries
+        # are served while they are re-geocoded in the background
+        cached_result, freshness = self.cache_manager.lookup_location(
+            location_name, allow_stale=self.refresher is not None
+        )
         if cached_result:
-            print(f"📋 Found in cache: {cached_result['address']}")
-            return cached_result
+            if self.refresher is not None:
+                self.refresher.record_hit(location_name, freshness)
+            logger.debug("Cache hit for %s (%s): %s", location_name, freshness, cached_result['address'])
+            return cached_result, 'cache'
         
         # Not in cache, perform geocoding
         try:
             location = self.geolocator.geocode(location_name)
-            if location:
-                location_data = {
-                    'address': location.address,
-                    'latitude': location.latitude,
-                    'longitude': location.longitude
-                }
-                # Cache the result for future use
-                self.cache_manager.cache_location(location_name, location_data)
-                return location_data
-            else:
-                return None
         except Exception as e:
-            print(f"Error geocoding location: {e}")
+            raise GeocodingError(location_name, e) from e
+        if not location:
+            raise LocationNotFoundError(location_name)
+        location_data = self.build_location_data(location)
+        # Cache the result for future use
+        self.cache_manager.cache_location(location_name, location_data)
+        logger.debug("Geocoded %s: %s", location_name, location_data['address'])
+        return location_data, 'geocoder'
+    
+    def get_location_info(self, location_name):
+        """Get coordinates and address for a location with caching"""
+        try:
+            location_data, source = self.locate(location_name)
+        except LocationNotFoundError:
+            return None
+        except GeocodingError as e:
+            print(f"Error geocoding location: {e.__cause__}")
             return None
+        if source == 'cache':
+            print(f"📋 Found in cache: {location_data['address']}")
+        return location_data
 
+    def build_location_data(self, location):
+        """Build a cache entry for a geocoded location, including its timezone"""
+        location_data = {
+            'address': location.address,
+            'latitude': location.latitude,
+            'longitude': location.longitude
+        }
+        try:
+            location_data['timezone'] = self.timezone_at(location.latitude, location.longitude)
+            location_data['timezonefinder_version'] = self.timezonefinder_version
+        except TimezoneNotFoundError as e:
+            # Cached without one; the timezone is looked up again on use
+            logger.debug("%s", e)
+        return location_data
+    
+    def resolve_timezone(self, location_name, location_info):
+        """Get the timezone for a location, reusing the one stored in its cache entry
+        
+        Entries cached before timezones were stored, or resolved with different
+        timezonefinder data, are looked up again and the cache entry updated.
+        Raises TimezoneNotFoundError.
+        """
+        if (location_info.get('timezone')
+                and location_info.get('timezonefinder_version') == self.timezonefinder_version):
+            return location_info['timezone']
+        
+        timezone_str = self.timezone_at(location_info['latitude'], location_info['longitude'])
+        self.cache_manager.annotate_location(location_name, {
+            'timezone': timezone_str,
+            'timezonefinder_version': self.timezonefinder_version
+        })
+        return timezone_str
+    
+    def get_location_timezone(self, location_name, location_info):
+        """Get the timezone for a location, or None (see resolve_timezone)"""
+        try:
+            return self.resolve_timezone(location_name, location_info)
+        except TimezoneNotFoundError as e:
+            if e.__cause__ is not None:
+                print(f"Error finding timezone: {e.__cause__}")
+            return None
+    
+    def timezone_at(self, lat, lng):
+        """Get the timezone at given coordinates; raises TimezoneNotFoundError"""
+        try:
+            # Cells far from any zone border are answered by the grid alone
+            if self.timezone_grid is not None:
+                timezone_str = self.timezone_grid.lookup(lat, lng)
+                if timezone_str:
+                    return timezone_str
+            
+            with timezone_finder_lock(self.timezone_finder_mode):
+                timezone_str = self.tf.timezone_at(lat=lat, lng=lng)
+        except Exception as e:
+            raise TimezoneNotFoundError(lat, lng, e) from e
+        if not timezone_str:
+            raise TimezoneNotFoundError(lat, lng)
+        return timezone_str
+    
+    def warm_timezone_finder(self):
+        """Page in the finder's polygon data with one lookup that skips the grid"""
+        with timezone_finder_lock(self.timezone_finder_mode):
+            return self.tf.timezone_at(lat=48.8566, lng=2.3522)
     
     def get_timezone_for_coordinates(self, lat, lng):
         """Get timezone for given coordinates"""
         try:
-            timezone_str = self.tf.timezone_at(lat=lat, lng=lng)
-            return timezone_str
-        except Exception as e:
-            print(f"Error finding timezone: {e}")
+            return self.timezone_at(lat, lng)
+        except TimezoneNotFoundError as e:
+            if e.__cause__ is not None:
+                print(f"Error finding timezone: {e.__cause__}")
+            return None
+    
+    @property
+    def user_config(self):
+        """Current user config snapshot (re-read only when the file changes)"""
+        return self.cache_manager.get_user_config()
+    
+    def _apply_user_config(self, config, previous):
+        """Config listener: pick up changed settings
+        
+        Applies preferred timezones, plus the geocoder endpoint, zone backend
+        and finder mode unless set by constructor arguments. cache_backend
+        takes effect on restart or through 'config cache_backend'; log_level
+        is applied by the application (main.py), not by the library.
+        """
+        if config['preferred_timezones'] != previous.get('preferred_timezones'):
+            self.major_timezones = list(config['preferred_timezones'])
+            self.clear_conversion_memo()
+        if (config['geocoder_endpoint'] != previous.get('geocoder_endpoint')
+                and not self._geocoder_endpoint_override):
+            self.geolocator = build_geolocator(config['geocoder_endpoint'])
+        if (config['zone_backend'] != previous.get('zone_backend')
+                and not self._zone_backend_override):
+            self.zone_backend = get_zone_backend(config['zone_backend'])
+        if (config['timezone_finder_mode'] != previous.get('timezone_finder_mode')
+                and not self._timezone_finder_mode_override):
+            self.timezone_finder_mode = config['timezone_finder_mode']
+            self.tf = get_timezone_finder(self.timezone_finder_mode)
+    
+    def clear_conversion_memo(self):
+        """Drop memoized conversions (e.g. after preferred_timezones changes)"""
+        self._conversion_memo.clear()
+        self._conversion_memo_targets = tuple(self.major_timezones)
+    
+    def convert_to_timezones(self, source_timezone_str, dt=None, all_zones=False):
+        """Convert current time to multiple timezones with relative differences
+        
+        With all_zones, converts to every pytz zone instead; see convert_to_all_timezones.
+        """
+        if all_zones:
+            return self.convert_to_all_timezones(source_timezone_str, dt)
+        try:
+            # Resolve any shortcuts (reporting ambiguous ones)
+            return self.conversions(
+                self.resolve_timezone_shortcut(source_timezone_str, at=dt or datetime.now()), dt
+            )
+        except ConversionError as e:
+            print(f"Error converting timezones: {e.__cause__}")
             return None
     
-    def convert_to_timezones(self, source_timezone_str, dt=None):
-        """Convert current time to multiple timezones with relative differences"""
+    def conversions(self, source_timezone_str, dt=None):
+        """Convert an instant (default now) to the preferred timezones
+        
+        Quiet core of convert_to_timezones: returns {zone: details} with the
+        source zone first, or raises ConversionError.
+        """
         if dt is None:
             dt = datetime.now()
+        # Output shows whole seconds, so instants within one second share a result
+        dt = dt.replace(microsecond=0)
             
         try:
-            # Resolve any shortcuts
-            source_timezone_str = self.resolve_timezone_shortcut(source_timezone_str)
+            source_timezone_str = self.resolve_alias(source_timezone_str, dt)[0] or source_timezone_str
+            
+            # Polls the config stamp; a changed file updates major_timezones
+            self.cache_manager.get_user_config()
+            if tuple(self.major_timezones) != self._conversion_memo_targets:
+                self.clear_conversion_memo()
+            memo_key = (self.zone_backend.name, source_timezone_str, dt)
+            cached = self._conversion_memo.get(memo_key)
+            if cached is not None:
+                self._conversion_memo.move_to_end(memo_key)
+                # Callers may edit the per-zone dicts; never hand out the memo's own
+                return {zone: dict(info) for zone, info in cached.items()}
             
-            source_tz = pytz.timezone(source_timezone_str)
             # Localize the datetime to source timezone
-            localized_dt = source_tz.localize(dt)
+            localized_dt = self.zone_backend.localize(dt, source_timezone_str)
             
             conversions = {}
             conversions[source_timezone_str] = {
@@ -287,8 +657,7 @@ class TimezoneConverter:
             
             for tz_name in self.major_timezones:
                 if tz_name != source_timezone_str:
-                    target_tz = pytz.timezone(tz_name)
-                    converted_time = localized_dt.astimezone(target_tz)
+                    converted_time = self.zone_backend.from_utc(localized_dt, tz_name)
                     relative_diff = self.calculate_time_difference(localized_dt, converted_time)
                     
                     conversions[tz_name] = {
@@ -299,18 +668,111 @@ class TimezoneConverter:
                         'datetime_obj': converted_time
                     }
             
-            return conversions
+            self._conversion_memo[memo_key] = conversions
+            if len(self._conversion_memo) > self.conversion_memo_size:
+                self._conversion_memo.popitem(last=False)
+            return {zone: dict(info) for zone, info in conversions.items()}
+        except Exception as e:
+            raise ConversionError(source_timezone_str, e) from e
+
+    def convert_to_all_timezones(self, source_timezone_str, dt=None):
+        """Convert one instant into every pytz zone, grouped by identical UTC offset
+        
+        Offsets for all zones come from one vectorized table lookup, and each
+        group's local time is formatted once. Returns {'source': ..., 'groups':
+        [{'utc_offset', 'offset_seconds', 'time', 'relative_diff', 'zones'}]}
+        sorted from the westernmost offset, or None on error.
+        """
+        if dt is None:
+            dt = datetime.now()
+        dt = dt.replace(microsecond=0)
+        
+        try:
+            source_timezone_str = self.resolve_timezone_shortcut(source_timezone_str, at=dt)
+            localized_dt = self.zone_backend.localize(dt, source_timezone_str)
+            utc_dt = localized_dt.astimezone(pytz.utc).replace(tzinfo=None)
+            source_offset = localized_dt.utcoffset().total_seconds()
+            
+            matrix = get_zone_offset_matrix()
+            offsets, abbreviations = matrix.lookup(utc_dt)
+            
+            zones_by_offset = {}
+            for zone_name, offset_seconds, abbreviation in zip(matrix.zone_names, offsets.tolist(), abbreviations):
+                zones_by_offset.setdefault(offset_seconds, []).append({
+                    'zone': zone_name,
+                    'abbreviation': abbreviation
+                })
+            
+            groups = []
+            for offset_seconds in sorted(zones_by_offset):
+                local_dt = utc_dt + timedelta(seconds=offset_seconds)
+                sign = '+' if offset_seconds >= 0 else '-'
+                hours, minutes = divmod(abs(offset_seconds) // 60, 60)
+                groups.append({
+                    'utc_offset': f"{sign}{hours:02d}{minutes:02d}",
+                    'offset_seconds': offset_seconds,
+                    'time': local_dt.strftime('%Y-%m-%d %H:%M:%S'),
+                    'relative_diff': self._format_offset_difference(offset_seconds - source_offset),
+                    'zones': zones_by_offset[offset_seconds]
+                })
+            
+            return {
+                'source': {
+                    'zone': source_timezone_str,
+                    'time': localized_dt.strftime('%Y-%m-%d %H:%M:%S %Z'),
+                    'utc_offset': localized_dt.strftime('%z')
+                },
+                'groups': groups
+            }
         except Exception as e:
             print(f"Error converting timezones: {e}")
             return None
-
+    
+    def display_all_zones_results(self, world_clock):
+        """Display an all-zones conversion as one line per UTC offset group"""
+        source = world_clock['source']
+        print(f"\n🌐 WORLD CLOCK: {source['time']} in {source['zone']} ({source['utc_offset']})")
+        print("="*70)
+        for group in world_clock['groups']:
+            abbreviations = sorted({zone['abbreviation'] for zone in group['zones']})
+            print(f"  UTC{group['utc_offset']} | {group['time']} | {', '.join(abbreviations[:6])}"
+                  f"{'...' if len(abbreviations) > 6 else ''} ({group['relative_diff']})")
+            zone_names = [zone['zone'] for zone in group['zones']]
+            print(f"  {'':8} | {len(zone_names)} zones: {', '.join(zone_names[:4])}{'...' if len(zone_names) > 4 else ''}")
+        print("="*70)
+        print(f"{sum(len(group['zones']) for group in world_clock['groups'])} zones in {len(world_clock['groups'])} offset groups")
+    
+    def lookup(self, location_name, dt=None):
+        """Resolve a location or zone name and convert an instant (default now)
+        
+        Quiet core of process_location, for library and batch use. Returns
+        {'query', 'source', 'location_info', 'timezone', 'conversions',
+        'alternatives'} where source is 'alias', 'cache' or 'geocoder' and
+        alternatives lists other zones an ambiguous name could mean. Raises
+        LocationNotFoundError, GeocodingError, TimezoneNotFoundError or
+        ConversionError.
+        """
+        timezone_str, alternatives = self.resolve_alias(location_name)
+        if timezone_str:
+            result = self._zone_result(timezone_str, self.conversions(timezone_str, dt))
+            source = 'alias'
+        else:
+            location_info, source = self.locate(location_name)
+            timezone_str = self.resolve_timezone(location_name, location_info)
+            result = {
+                'location_info': location_info,
+                'timezone': timezone_str,
+                'conversions': self.conversions(timezone_str, dt)
+            }
+        return dict(result, query=location_name, source=source, alternatives=alternatives)
     
     def process_location(self, location_name):
         """Main method to process a location and return timezone info"""
         
-        # Check if it's a timezone shortcut first
-        if location_name.lower() in self.timezone_shortcuts:
-            return self.process_timezone_shortcut(location_name)
+        # Check if it's a timezone shortcut or alias first
+        timezone_str = self.lookup_timezone_alias(location_name)
+        if timezone_str:
+            return self.process_timezone_shortcut(location_name, timezone_str)
         
         print(f"Looking up location: {location_name}")
         
@@ -321,11 +783,8 @@ class TimezoneConverter:
             
         print(f"Found: {location_info['address']}")
         
-        # Get timezone for coordinates
-        timezone_str = self.get_timezone_for_coordinates(
-            location_info['latitude'], 
-            location_info['longitude']
-        )
+        # Get timezone for coordinates (stored with the cache entry when known)
+        timezone_str = self.get_location_timezone(location_name, location_info)
         
         if not timezone_str:
             return None
@@ -380,27 +839,31 @@ class TimezoneConverter:
         print("💡 Tip: You can use shortcuts like 'nyc', 'london', 'tokyo' for quick timezone lookups!")
         print("="*70)
     
-    def convert_specific_time(self, time_str, source_timezone_str, date_str=None):
-            """Convert a specific time from source timezone to all major timezones"""
+    def parse_time_string(self, time_str):
+            """Parse a time of day like "14:30", "2:30 PM" or "14:30:00"; None if invalid"""
+            time_formats = [
+                '%H:%M',
+                '%H:%M:%S', 
+                '%I:%M %p',
+                '%I:%M:%S %p'
+            ]
+            
+            for fmt in time_formats:
+                try:
+                    return datetime.strptime(time_str, fmt).time()
+                except ValueError:
+                    continue
+            return None
+        
+    def convert_specific_time(self, time_str, source_timezone_str, date_str=None, all_zones=False):
+            """Convert a specific time from source timezone to all major timezones
+            
+            With all_zones, returns the grouped all-zones world clock instead.
+            """
             try:
                 from datetime import datetime
                 
-                # Parse time string (supports formats like "14:30", "2:30 PM", "14:30:00")
-                time_formats = [
-                    '%H:%M',
-                    '%H:%M:%S', 
-                    '%I:%M %p',
-                    '%I:%M:%S %p'
-                ]
-                
-                parsed_time = None
-                for fmt in time_formats:
-                    try:
-                        parsed_time = datetime.strptime(time_str, fmt).time()
-                        break
-                    except ValueError:
-                        continue
-                
+                parsed_time = self.parse_time_string(time_str)
                 if not parsed_time:
                     return None, "Invalid time format. Use formats like '14:30', '2:30 PM', or '14:30:00'"
                 
@@ -423,7 +886,7 @@ class TimezoneConverter:
                 dt = datetime.combine(parsed_date, parsed_time)
                 
                 # Convert using existing method
-                conversions = self.convert_to_timezones(source_timezone_str, dt)
+                conversions = self.convert_to_timezones(source_timezone_str, dt, all_zones=all_zones)
                 
                 return conversions, None
                 
@@ -459,8 +922,12 @@ class TimezoneConverter:
             
             print("="*70)
         
-    def calculate_business_hours_overlap(self, locations, start_hour=None, end_hour=None):
-        """Calculate overlapping business hours between multiple locations"""
+    def calculate_business_hours_overlap(self, locations, start_hour=None, end_hour=None,
+                                         location_timezones=None, use_cache=True):
+        """Calculate overlapping business hours between multiple locations
+        
+        location_timezones and use_cache work as in find_meeting_times.
+        """
         # Use user configuration for business hours if not specified
         if start_hour is None or end_hour is None:
             business_hours = self.user_config.get('business_hours', {'start': 9, 'end': 17})
@@ -471,31 +938,8 @@ class TimezoneConverter:
             return None
             
         # Get timezone info for all locations
-        location_timezones = []
-        for location in locations:
-            if location.lower() in self.timezone_shortcuts:
-                tz_str = self.timezone_shortcuts[location.lower()]
-                location_data = {
-                    'input': location,
-                    'address': f"Timezone: {tz_str}",
-                    'timezone': tz_str
-                }
-            else:
-                location_info = self.get_location_info(location)
-                if not location_info:
-                    continue
-                timezone_str = self.get_timezone_for_coordinates(
-                    location_info['latitude'], 
-                    location_info['longitude']
-                )
-                if not timezone_str:
-                    continue
-                location_data = {
-                    'input': location,
-                    'address': location_info['address'],
-                    'timezone': timezone_str
-                }
-            location_timezones.append(location_data)
+        if location_timezones is None:
+            location_timezones = self.resolve_location_timezones(locations)
         
         if len(location_timezones) < 2:
             return None
@@ -503,52 +947,84 @@ class TimezoneConverter:
         # Calculate overlap for each hour of the day
         overlap_hours = []
         
-        from datetime import datetime, time
+        from datetime import datetime, time, timedelta
         now = datetime.now()
+        window_start = datetime.combine(now.date(), time())
+        
+        # Cached per distinct zone and hour, so any order of the same team hits
+        cache_key = self.cache_manager.schedule_cache_key(
+            'overlap', [location_data['timezone'] for location_data in location_timezones],
+            start_hour, end_hour, None, now.date(), 1, self.zone_backend.name
+        )
+        cached = self.cache_manager.get_schedule_result(cache_key) if use_cache else None
+        if cached is not None:
+            return self._overlap_result(location_timezones, cached, start_hour, end_hour)
+        
+        class_zones, class_index = self.zone_equivalence_classes(
+            location_timezones, window_start, window_start + timedelta(days=1), start_hour, end_hour
+        )
+        zone_class = {}
+        for i, location_data in enumerate(location_timezones):
+            zone_class.setdefault(location_data['timezone'], class_index[i])
         
+        result = {'hours': [], 'zone_classes': len(class_zones)}
         for hour in range(24):
-            all_in_business_hours = True
-            hour_details = []
+            # Create a datetime for this hour in UTC
+            utc_dt = datetime.combine(now.date(), time(hour=hour))
             
-            for location_data in location_timezones:
+            class_details = []
+            for zone_name in class_zones:
                 try:
-                    # Create a datetime for this hour in UTC
-                    utc_dt = datetime.combine(now.date(), time(hour=hour))
-                    utc_dt = pytz.utc.localize(utc_dt)
-                    
                     # Convert to local timezone
-                    local_tz = pytz.timezone(location_data['timezone'])
-                    local_dt = utc_dt.astimezone(local_tz)
-                    
-                    # Check if within business hours
-                    is_business_hour = start_hour <= local_dt.hour < end_hour
-                    
-                    hour_details.append({
-                        'location': location_data['input'],
-                        'timezone': location_data['timezone'],
-                        'local_hour': local_dt.hour,
-                        'is_business': is_business_hour,
-                        'local_time': local_dt.strftime('%H:%M %Z')
-                    })
-                    
-                    if not is_business_hour:
-                        all_in_business_hours = False
-                        
+                    local_dt = self.zone_backend.from_utc(utc_dt, zone_name)
                 except Exception:
-                    all_in_business_hours = False
+                    class_details = None
                     break
+                
+                class_details.append({
+                    'local_hour': local_dt.hour,
+                    # Check if within business hours
+                    'is_business': start_hour <= local_dt.hour < end_hour,
+                    'local_time': local_dt.strftime('%H:%M %Z')
+                })
             
-            if all_in_business_hours and len(hour_details) == len(location_timezones):
-                overlap_hours.append({
+            if class_details and all(detail['is_business'] for detail in class_details):
+                result['hours'].append({
                     'utc_hour': hour,
-                    'locations': hour_details
+                    'zones': {
+                        zone_name: class_details[index] for zone_name, index in zone_class.items()
+                    }
                 })
         
+        if use_cache:
+            self.cache_manager.cache_schedule_result(cache_key, result, now.date())
+        return self._overlap_result(location_timezones, result, start_hour, end_hour)
+    
+    def _overlap_result(self, location_timezones, result, start_hour, end_hour):
+        """Expand per-zone overlap hours into the per-location overlap report"""
+        overlap_hours = []
+        for hour in result['hours']:
+            hour_details = []
+            for location_data in location_timezones:
+                detail = hour['zones'][location_data['timezone']]
+                hour_details.append({
+                    'location': location_data['input'],
+                    'timezone': location_data['timezone'],
+                    'local_hour': detail['local_hour'],
+                    'is_business': detail['is_business'],
+                    'local_time': detail['local_time']
+                })
+            overlap_hours.append({
+                'utc_hour': hour['utc_hour'],
+                'locations': hour_details
+            })
+        
         return {
             'overlap_hours': overlap_hours,
             'total_overlap': len(overlap_hours),
             'business_hours': f"{start_hour}:00-{end_hour}:00",
-            'locations': location_timezones
+            'locations': location_timezones,
+            'zone_classes': result['zone_classes']
         }
     
     def display_business_hours_overlap(self, overlap_data, locations):
@@ -595,6 +1071,468 @@ class TimezoneConverter:
                 print(f"💡 Recommendation: {recommendation}")
                 print("="*70)
             
+    def weekly_business_mask(self, zone_name, week_start, start_hour, end_hour):
+        """Encode a zone's business minutes in one UTC week as a 10,080-bit int
+        
+        Bit m is set when minute m after week_start (naive UTC) falls inside
+        start_hour-end_hour local time on a local Monday to Friday. Built from
+        the zone's offset segments, so DST changes inside the week are exact.
+        """
+        week_end = week_start + timedelta(days=7)
+        week_minutes = 7 * 24 * 60
+        transitions = zone_transitions(zone_name, week_start, week_end)
+        mask = 0
+        for i, (segment_start, offset_seconds, _abbr) in enumerate(transitions):
+            segment_end = transitions[i + 1][0] if i + 1 < len(transitions) else week_end
+            seg_from = int((segment_start - week_start).total_seconds() // 60)
+            seg_to = int((segment_end - week_start).total_seconds() // 60)
+            offset_minutes = offset_seconds // 60
+            
+            # Local days this segment can touch, each with its business interval
+            first_day = (week_start + timedelta(minutes=seg_from + offset_minutes)).date()
+            last_day = (week_start + timedelta(minutes=seg_to + offset_minutes)).date()
+            day = first_day
+            while day <= last_day:
+                if day.weekday() < 5:
+                    local_open = datetime.combine(day, datetime.min.time()) + timedelta(hours=start_hour)
+                    open_minute = int((local_open - week_start).total_seconds() // 60) - offset_minutes
+                    lo = max(open_minute, seg_from, 0)
+                    hi = min(open_minute + (end_hour - start_hour) * 60, seg_to, week_minutes)
+                    if hi > lo:
+                        mask |= ((1 << (hi - lo)) - 1) << lo
+                day += timedelta(days=1)
+        return mask
+    
+    def calculate_overlap_matrix(self, locations, start_hour=None, end_hour=None, week_start=None):
+        """Shared business minutes per week for every pair of locations
+        
+        Each location's week is encoded once as a minute bitmask, and each
+        pair is one AND plus a popcount. week_start is a date (default: this
+        week's Monday); the week is taken in UTC. Returns None if fewer than
+        two locations resolve.
+        """
+        if start_hour is None or end_hour is None:
+            business_hours = self.user_config.get('business_hours', {'start': 9, 'end': 17})
+            start_hour = business_hours.get('start', 9)
+            end_hour = business_hours.get('end', 17)
+        
+        location_timezones = self.resolve_location_timezones(locations)
+        if len(location_timezones) < 2:
+            return None
+        
+        if week_start is None:
+            today = datetime.now().date()
+            week_start = today - timedelta(days=today.weekday())
+        week_start_dt = datetime.combine(week_start, datetime.min.time())
+        
+        # Equivalent zones share one mask
+        class_zones, class_index = self.zone_equivalence_classes(
+            location_timezones, week_start_dt, week_start_dt + timedelta(days=7), start_hour, end_hour
+        )
+        masks = [
+            self.weekly_business_mask(zone_name, week_start_dt, start_hour, end_hour)
+            for zone_name in class_zones
+        ]
+        class_matrix = [[_popcount(a & b) for b in masks] for a in masks]
+        matrix = [
+            [class_matrix[class_index[i]][class_index[j]] for j in range(len(location_timezones))]
+            for i in range(len(location_timezones))
+        ]
+        
+        return {
+            'locations': location_timezones,
+            'matrix': matrix,
+            'week_start': week_start.isoformat(),
+            'business_hours': f"{start_hour}:00-{end_hour}:00",
+            'zone_classes': len(class_zones)
+        }
+    
+    def display_overlap_matrix(self, matrix_data):
+        """Display shared business hours per week as an N x N table"""
+        if not matrix_data:
+            print("❌ Could not resolve enough locations for an overlap matrix")
+            return
+        
+        labels = [location['input'][:10] for location in matrix_data['locations']]
+        print(f"\n🧮 WEEKLY BUSINESS HOURS OVERLAP (hours, week of {matrix_data['week_start']} UTC)")
+        print("="*70)
+        print(f"⏰ Business Hours: {matrix_data['business_hours']} local time, Monday-Friday")
+        print()
+        print(" " * 11 + "".join(f"{label:>11}" for label in labels))
+        for label, row in zip(labels, matrix_data['matrix']):
+            print(f"{label:>10} " + "".join(f"{minutes / 60:>11.1f}" for minutes in row))
+        print("="*70)
+        
+        pairs = [
+            (matrix_data['matrix'][i][j], labels[i], labels[j])
+            for i in range(len(labels)) for j in range(i + 1, len(labels))
+        ]
+        if pairs:
+            minutes, first, second = min(pairs)
+            print(f"⚠️ Least overlap: {first} & {second} ({minutes / 60:.1f} hours/week)")
+    
+    def team_coverage_intervals(self, zone_name, range_start, range_end, start_hour, end_hour, days=None):
+        """UTC intervals a team covers in [range_start, range_end), both naive UTC
+        
+        The shift runs start_hour-end_hour local time on the given local
+        weekdays (0 = Monday; default every day); end_hour <= start_hour is an
+        overnight shift. Built from the zone's offset segments like
+        weekly_business_mask, so shifts move exactly at DST changes.
+        Returns sorted, merged (start, end) pairs.
+        """
+        days = set(range(7) if days is None else days)
+        shift = timedelta(hours=(end_hour - start_hour) % 24 or 24)
+        transitions = zone_transitions(zone_name, range_start, range_end)
+        intervals = []
+        for i, (segment_start, offset_seconds, _abbr) in enumerate(transitions):
+            segment_end = transitions[i + 1][0] if i + 1 < len(transitions) else range_end
+            offset = timedelta(seconds=offset_seconds)
+            
+            # Local days whose shift can touch this segment, including one that
+            # started the evening before
+            day = (segment_start + offset).date() - timedelta(days=1)
+            last_day = (segment_end + offset).date()
+            while day <= last_day:
+                if day.weekday() in days:
+                    shift_start = datetime.combine(day, datetime.min.time()) + timedelta(hours=start_hour) - offset
+                    lo = max(shift_start, segment_start)
+                    hi = min(shift_start + shift, segment_end)
+                    if hi > lo:
+                        intervals.append((lo, hi))
+                day += timedelta(days=1)
+        
+        intervals.sort()
+        merged = []
+        for lo, hi in intervals:
+            if merged and lo <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+            else:
+                merged.append((lo, hi))
+        return merged
+    
+    def plan_follow_the_sun(self, teams, start_date=None, end_date=None):
+        """Build a 24x7 on-call coverage schedule for teams over a date range
+        
+        teams is a list of {'name', 'location', 'start', 'end', 'days'} dicts
+        (hours default to the business_hours setting, days to every day).
+        The range is start_date to end_date inclusive, in UTC (default: the
+        next 91 days). Each team's shifts become UTC intervals and one sweep
+        over their start/end events yields the coverage segments, gaps and
+        double coverage, grouped into periods between DST changes. Returns
+        None if no team's location resolves.
+        """
+        business_hours = self.user_config.get('business_hours', {'start': 9, 'end': 17})
+        start_date = start_date or datetime.now().date()
+        end_date = end_date or start_date + timedelta(days=90)
+        range_start = datetime.combine(start_date, datetime.min.time())
+        range_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        
+        locations = list(dict.fromkeys(team['location'] for team in teams))
+        zones = {
+            location_data['input']: location_data['timezone']
+            for location_data in self.resolve_location_timezones(locations)
+        }
+        
+        planned_teams = []
+        unresolved = []
+        events = []
+        for team in teams:
+            zone_name = zones.get(team['location'])
+            if zone_name is None:
+                unresolved.append(team.get('name', team['location']))
+                continue
+            team_index = len(planned_teams)
+            planned_teams.append({
+                'name': team.get('name', team['location']),
+                'location': team['location'],
+                'timezone': zone_name,
+                'start': team.get('start', business_hours['start']),
+                'end': team.get('end', business_hours['end']),
+                'days': sorted(team.get('days', range(7)))
+            })
+            for lo, hi in self.team_coverage_intervals(
+                    zone_name, range_start, range_end, planned_teams[-1]['start'],
+                    planned_teams[-1]['end'], planned_teams[-1]['days']):
+                # Ends sort before starts, so an exact handoff is not double coverage
+                events.append((lo, 1, team_index))
+                events.append((hi, 0, team_index))
+        
+        if not planned_teams:
+            return None
+        
+        events.sort()
+        segments = []
+        on_call = set()
+        previous = range_start
+        for at, is_start, team_index in events + [(range_end, 0, None)]:
+            if at > previous:
+                names = tuple(planned_teams[i]['name'] for i in sorted(on_call))
+                if segments and segments[-1]['teams'] == names:
+                    segments[-1]['end'] = at
+                else:
+                    segments.append({'start': previous, 'end': at, 'teams': names})
+                previous = at
+            if team_index is not None:
+                (on_call.add if is_start else on_call.discard)(team_index)
+        
+        # Offset changes of the teams' zones split the range into periods
+        dst_changes = []
+        for zone_name in dict.fromkeys(team['timezone'] for team in planned_teams):
+            pieces = zone_transitions(zone_name, range_start, range_end)
+            for (_, before, _), (at, after, _) in zip(pieces, pieces[1:]):
+                if before != after:
+                    dst_changes.append({
+                        'at': at,
+                        'zone': zone_name,
+                        'teams': [team['name'] for team in planned_teams if team['timezone'] == zone_name],
+                        'offset_before': before,
+                        'offset_after': after
+                    })
+        dst_changes.sort(key=lambda change: change['at'])
+        boundaries = [range_start] + sorted({change['at'] for change in dst_changes}) + [range_end]
+        periods = [
+            {'start': lo, 'end': hi, 'gaps': [], 'double_coverage': []}
+            for lo, hi in zip(boundaries, boundaries[1:])
+        ]
+        
+        gaps = []
+        double_coverage = []
+        period_index = 0
+        for segment in segments:
+            while segment['start'] >= periods[period_index]['end']:
+                period_index += 1
+            if not segment['teams']:
+                gaps.append(segment)
+                periods[period_index]['gaps'].append(segment)
+            elif len(segment['teams']) > 1:
+                double_coverage.append(segment)
+                periods[period_index]['double_coverage'].append(segment)
+        
+        total_seconds = (range_end - range_start).total_seconds()
+        gap_seconds = sum((gap['end'] - gap['start']).total_seconds() for gap in gaps)
+        return {
+            'teams': planned_teams,
+            'unresolved': unresolved,
+            'start': range_start,
+            'end': range_end,
+            'segments': segments,
+            'gaps': gaps,
+            'double_coverage': double_coverage,
+            'coverage_pct': round(100 * (1 - gap_seconds / total_seconds), 2),
+            'dst_changes': dst_changes,
+            'periods': periods
+        }
+    
+    def display_follow_the_sun(self, plan):
+        """Display coverage, then recurring gaps and double coverage per DST period"""
+        if not plan:
+            print("❌ Could not resolve any on-call team locations")
+            return
+        
+        last_day = (plan['end'] - timedelta(days=1)).date()
+        print(f"\n🌞 FOLLOW-THE-SUN ON-CALL PLAN ({plan['start'].date()} to {last_day}, UTC)")
+        print("="*70)
+        for team in plan['teams']:
+            days = "every day" if len(team['days']) == 7 else ", ".join(
+                ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'][day] for day in team['days'])
+            print(f"  👥 {team['name'][:18]:18} | {team['timezone']:22} | "
+                  f"{team['start']:02d}:00-{team['end']:02d}:00 {days}")
+        if plan['unresolved']:
+            print(f"  ⚠️ Skipped (location not found): {', '.join(plan['unresolved'])}")
+        print()
+        print(f"📊 Coverage: {plan['coverage_pct']}% of the range | "
+              f"{len(plan['gaps'])} gaps | {len(plan['double_coverage'])} double-covered spans")
+        
+        def patterns(issues):
+            """Collapse daily repeats into (UTC time span, teams) -> day count"""
+            counts = OrderedDict()
+            for issue in issues:
+                key = (issue['start'].strftime('%H:%M'), issue['end'].strftime('%H:%M'), issue['teams'])
+                counts[key] = counts.get(key, 0) + 1
+            return counts
+        
+        for period in plan['periods']:
+            changes = [change for change in plan['dst_changes'] if change['at'] == period['start']]
+            if changes:
+                print()
+                for change in changes:
+                    shift = (change['offset_after'] - change['offset_before']) / 3600
+                    print(f"🔄 {change['at']:%Y-%m-%d %H:%M} UTC: {change['zone']} shifts {shift:+g}h "
+                          f"({', '.join(change['teams'])})")
+            if not period['gaps'] and not period['double_coverage']:
+                continue
+            print(f"\n📆 {period['start']:%Y-%m-%d %H:%M} → {period['end']:%Y-%m-%d %H:%M} UTC")
+            for (start, end, _teams), count in list(patterns(period['gaps']).items())[:8]:
+                print(f"  🕳️ Gap {start}-{end} UTC on {count} day{'s' if count != 1 else ''}")
+            for (start, end, teams), count in list(patterns(period['double_coverage']).items())[:8]:
+                print(f"  👯 Double {start}-{end} UTC on {count} day{'s' if count != 1 else ''}: {' + '.join(teams)}")
+        print("="*70)
+    
+    def analyze_recurring_meeting(self, time_str, organizer_location, locations, weekday=None,
+                                  start_date=None, weeks=52, duration_minutes=60,
+                                  start_hour=None, end_hour=None):
+        """Analyze how a weekly meeting drifts across participants' zones over DST changes
+        
+        The meeting is held every week at time_str in the organizer's zone. The
+        window is split at every zone transition of the organizer and each
+        participant; inside a piece all offsets are constant, so each piece is
+        evaluated once and its occurrences are counted arithmetically.
+        
+        Returns (analysis, error) like convert_specific_time.
+        """
+        from datetime import timedelta
+        
+        if start_hour is None or end_hour is None:
+            business_hours = self.user_config.get('business_hours', {'start': 9, 'end': 17})
+            start_hour = business_hours.get('start', 9)
+            end_hour = business_hours.get('end', 17)
+        
+        parsed_time = self.parse_time_string(time_str)
+        if not parsed_time:
+            return None, "Invalid time format. Use formats like '14:30', '2:30 PM', or '14:30:00'"
+        
+        organizer = self.resolve_location_timezones([organizer_location])
+        if not organizer:
+            return None, f"Could not find timezone information for '{organizer_location}'"
+        organizer = organizer[0]
+        participants = self.resolve_location_timezones(locations)
+        
+        # First occurrence: the next matching weekday on or after start_date
+        if start_date is None:
+            start_date = datetime.now().date()
+        if weekday is None:
+            weekday = start_date.weekday()
+        first_date = start_date + timedelta(days=(weekday - start_date.weekday()) % 7)
+        base_local = datetime.combine(first_date, parsed_time)
+        week_seconds = 7 * 86400
+        
+        window_start = base_local - timedelta(days=2)
+        window_end = base_local + timedelta(weeks=weeks, days=2)
+        far_future = window_end + timedelta(days=365)
+        
+        def ceil_weeks(delta):
+            # Smallest k with base + k weeks >= base + delta
+            return -(-int(delta.total_seconds()) // week_seconds)
+        
+        # Organizer offsets apply on its local timeline: a transition at UTC t
+        # to offset b takes effect from local time t + b, matching localize()
+        organizer_pieces = zone_transitions(organizer['timezone'], window_start, window_end)
+        organizer_local_starts = [window_start - timedelta(days=1)] + [
+            utc_start + timedelta(seconds=offset) for utc_start, offset, _ in organizer_pieces[1:]
+        ]
+        organizer_local_ends = organizer_local_starts[1:] + [far_future]
+        
+        participant_pieces = [
+            zone_transitions(p['timezone'], window_start, window_end) for p in participants
+        ]
+        ranges = [[] for _ in participants]
+        
+        for (_, organizer_offset, _), local_start, local_end in zip(
+                organizer_pieces, organizer_local_starts, organizer_local_ends):
+            first_k = max(0, ceil_weeks(local_start - base_local))
+            end_k = min(weeks, ceil_weeks(local_end - base_local))
+            if first_k >= end_k:
+                continue
+            # Occurrence k starts at utc_base + k weeks in UTC
+            utc_base = base_local - timedelta(seconds=organizer_offset)
+            
+            for index, pieces in enumerate(participant_pieces):
+                piece_ends = [p[0] for p in pieces[1:]] + [far_future]
+                for (piece_start, offset, abbreviation), piece_end in zip(pieces, piece_ends):
+                    piece_first = max(first_k, ceil_weeks(piece_start - utc_base))
+                    piece_stop = min(end_k, ceil_weeks(piece_end - utc_base))
+                    if piece_first < piece_stop:
+                        ranges[index].append((piece_first, piece_stop, offset - organizer_offset, offset, abbreviation))
+        
+        meeting_minutes = parsed_time.hour * 60 + parsed_time.minute
+        results = []
+        for participant, participant_ranges in zip(participants, ranges):
+            segments = []
+            for first_k, stop_k, shift_seconds, offset, abbreviation in sorted(participant_ranges):
+                local_minutes = meeting_minutes + shift_seconds // 60
+                day_shift, minute_of_day = divmod(local_minutes, 24 * 60)
+                within = (start_hour * 60 <= minute_of_day
+                          and minute_of_day + duration_minutes <= end_hour * 60)
+                local_time = f"{minute_of_day // 60:02d}:{minute_of_day % 60:02d}"
+                
+                previous = segments[-1] if segments else None
+                if (previous and previous['local_time'] == local_time
+                        and previous['day_shift'] == day_shift and previous['_stop_k'] == first_k):
+                    previous['_stop_k'] = stop_k
+                    if abbreviation not in previous['abbreviation'].split('/'):
+                        previous['abbreviation'] += f"/{abbreviation}"
+                    previous['end_date'] = (base_local + timedelta(weeks=stop_k - 1)).date()
+                    previous['occurrences'] += stop_k - first_k
+                    continue
+                
+                segments.append({
+                    'start_date': (base_local + timedelta(weeks=first_k)).date(),
+                    'end_date': (base_local + timedelta(weeks=stop_k - 1)).date(),
+                    'occurrences': stop_k - first_k,
+                    'local_time': local_time,
+                    'day_shift': day_shift,
+                    'abbreviation': abbreviation,
+                    'utc_offset': offset,
+                    'in_business_hours': within,
+                    '_stop_k': stop_k
+                })
+            
+            for segment in segments:
+                del segment['_stop_k']
+            results.append({
+                'input': participant['input'],
+                'address': participant['address'],
+                'timezone': participant['timezone'],
+                'segments': segments,
+                'outside_business_hours': [s for s in segments if not s['in_business_hours']]
+            })
+        
+        return {
+            'organizer': organizer,
+            'meeting_time': parsed_time.strftime('%H:%M'),
+            'weekday': first_date.strftime('%A'),
+            'first_date': first_date,
+            'last_date': (base_local + timedelta(weeks=weeks - 1)).date(),
+            'weeks': weeks,
+            'duration_minutes': duration_minutes,
+            'business_hours': f"{start_hour}:00-{end_hour}:00",
+            'participants': results
+        }, None
+    
+    def display_recurring_meeting_drift(self, analysis):
+        """Display recurring meeting DST drift analysis"""
+        if not analysis:
+            return
+        
+        organizer = analysis['organizer']
+        print(f"\n🔁 RECURRING MEETING DST DRIFT")
+        print("="*70)
+        print(f"📅 Weekly on {analysis['weekday']} at {analysis['meeting_time']} {organizer['timezone']}")
+        print(f"🗓️ {analysis['first_date']} → {analysis['last_date']} ({analysis['weeks']} meetings, {analysis['duration_minutes']} min)")
+        print(f"⏰ Business Hours: {analysis['business_hours']} (local time)")
+        print()
+        
+        for participant in analysis['participants']:
+            print(f"📍 {participant['input']} ({participant['timezone']})")
+            for segment in participant['segments']:
+                indicator = "✅" if segment['in_business_hours'] else "❌"
+                day_note = ""
+                if segment['day_shift']:
+                    day_note = f" ({'+' if segment['day_shift'] > 0 else ''}{segment['day_shift']} day)"
+                print(f"   {segment['start_date']} → {segment['end_date']} | "
+                      f"{segment['local_time']} {segment['abbreviation']}{day_note} "
+                      f"x{segment['occurrences']} {indicator}")
+            if not participant['outside_business_hours']:
+                print("   ✅ Always within business hours")
+            print()
+        
+        outside = [p['input'] for p in analysis['participants'] if p['outside_business_hours']]
+        if outside:
+            print(f"⚠️ Outside business hours at some point for: {', '.join(outside)}")
+        else:
+            print("💡 This meeting stays within business hours for everyone all year!")
+        print("="*70)
+    
     def export_results(self, results, export_format=None, filename=None):
         """Export timezone conversion results to file"""
         if not results:
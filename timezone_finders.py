@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+TimezoneFinder Modes for PyTZ Buddy
+How the timezonefinder polygon data is held in memory, and sharing of one
+loaded finder between a parent process and its forked workers.
+
+Modes:
+    file    read the data files with seek/read per lookup (lowest footprint,
+            slowest; the timezonefinder default)
+    mmap    memory-map the data files read-only; pages live in the OS page
+            cache and are shared by every process on the host
+    memory  copy the data files into each process (fastest lookups, largest
+            footprint unless the copy is made before forking)
+
+Usage:
+    python timezone_finders.py report --workers 4 --lookups 2000
+"""
+
+import argparse
+import mmap
+import multiprocessing
+import os
+import random
+import threading
+import time
+
+from timezonefinder import TimezoneFinder, utils
+
+TIMEZONE_FINDER_MODES = ('file', 'mmap', 'memory')
+DEFAULT_TIMEZONE_FINDER_MODE = 'file'
+
+# mode -> (pid that created it, finder); forked workers inherit the parent's entry
+_SHARED_FINDERS = {}
+
+# mode -> (pid that created it, lock serializing lookups on that mode's finder)
+_FINDER_LOCKS = {}
+_FINDER_LOCKS_GUARD = threading.Lock()
+
+
+class _MappedFile:
+    """Read-only mmap of a data file with the file API timezonefinder uses"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self._mmap.seek(offset, whence)
+
+    def tell(self):
+        return self._mmap.tell()
+
+    def read(self, size=-1):
+        return self._mmap.read(size)
+
+    def getbuffer(self):
+        return self._view
+
+    def close(self):
+        # Arrays returned by lookups may still reference the mapping;
+        # it is released when the last of them goes away
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            pass
+
+
+def create_timezone_finder(mode=None):
+    """Create a TimezoneFinder holding its data as the given mode describes"""
+    mode = mode or DEFAULT_TIMEZONE_FINDER_MODE
+    if mode not in TIMEZONE_FINDER_MODES:
+        raise ValueError(
+            f"Unknown TimezoneFinder mode '{mode}'. Choose from: {', '.join(TIMEZONE_FINDER_MODES)}"
+        )
+    if mode == 'memory':
+        return TimezoneFinder(in_memory=True)
+
+    tf = TimezoneFinder()
+    if mode == 'mmap':
+        for attribute_name in tf.binary_data_attributes:
+            file_handle = getattr(tf, attribute_name)
+            setattr(tf, attribute_name, _MappedFile(file_handle.name))
+            file_handle.close()
+        # Lookups slice the mapping directly instead of reading into new buffers
+        tf._fromfile = utils.fromfile_memory
+    return tf
+
+
+def get_timezone_finder(mode=None):
+    """Get this process's shared TimezoneFinder for a mode
+
+    A finder created before fork is reused by the children, so mmap and
+    memory data is loaded once and its pages shared. File mode is the
+    exception: its open file offsets would be shared across processes,
+    so each child opens its own handles.
+    """
+    mode = mode or DEFAULT_TIMEZONE_FINDER_MODE
+    entry = _SHARED_FINDERS.get(mode)
+    if entry is None or (mode == 'file' and entry[0] != os.getpid()):
+        entry = (os.getpid(), create_timezone_finder(mode))
+        _SHARED_FINDERS[mode] = entry
+    return entry[1]
+
+
+def timezone_finder_lock(mode=None):
+    """Get the lock threads must hold to use this process's shared finder for a mode
+
+    Every mode reads its data through one shared file position (seek, then
+    read), so concurrent lookups on one finder can read each other's data.
+    A forked child gets a fresh lock, since the parent's may have been held.
+    """
+    mode = mode or DEFAULT_TIMEZONE_FINDER_MODE
+    entry = _FINDER_LOCKS.get(mode)
+    if entry is None or entry[0] != os.getpid():
+        with _FINDER_LOCKS_GUARD:
+            entry = _FINDER_LOCKS.get(mode)
+            if entry is None or entry[0] != os.getpid():
+                entry = _FINDER_LOCKS[mode] = (os.getpid(), threading.Lock())
+    return entry[1]
+
+
+def preload_timezone_finder(mode=None):
+    """Load (and touch) the shared finder in a parent before forking workers"""
+    tf = get_timezone_finder(mode)
+    tf.timezone_at(lat=48.8566, lng=2.3522)
+    return tf
+
+
+def memory_usage():
+    """Get {'rss_mb', 'private_mb', 'pss_mb'} for this process (Linux /proc; else RSS peak)"""
+    usage = {'rss_mb': None, 'private_mb': None, 'pss_mb': None}
+    try:
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+        usage['rss_mb'] = round(fields.get('Rss', 0) / 1024, 1)
+        usage['pss_mb'] = round(fields.get('Pss', 0) / 1024, 1)
+        private_kb = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+        usage['private_mb'] = round(private_kb / 1024, 1)
+    except OSError:
+        import resource
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        usage['rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return usage
+
+
+def _random_points(count, seed):
+    generator = random.Random(seed)
+    return [(generator.uniform(-60, 75), generator.uniform(-180, 180)) for _ in range(count)]
+
+
+def _footprint_worker(mode, lookups, seed, results):
+    tf = get_timezone_finder(mode)
+    start = time.perf_counter()
+    for lat, lng in _random_points(lookups, seed):
+        tf.timezone_at(lat=lat, lng=lng)
+    elapsed = time.perf_counter() - start
+    results.put(dict(memory_usage(), lookup_us=round(elapsed / max(lookups, 1) * 1e6, 1)))
+
+
+def footprint_report(modes=TIMEZONE_FINDER_MODES, workers=4, lookups=2000):
+    """Measure load time and per-worker memory for each mode with forked workers
+
+    Each mode runs in a fresh process that preloads the finder and forks
+    the workers, as a service would. Returns one dict per mode.
+    """
+    context = multiprocessing.get_context('fork')
+    report = []
+    for mode in modes:
+        results = context.Queue()
+        runner = context.Process(target=_footprint_mode, args=(mode, workers, lookups, results))
+        runner.start()
+        row = results.get(timeout=600)
+        runner.join()
+        report.append(row)
+    return report
+
+
+def _footprint_mode(mode, workers, lookups, report_queue):
+    baseline = memory_usage()
+    start = time.perf_counter()
+    preload_timezone_finder(mode)
+    load_seconds = time.perf_counter() - start
+    parent = memory_usage()
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [
+        context.Process(target=_footprint_worker, args=(mode, lookups, seed, results))
+        for seed in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    samples = [results.get(timeout=600) for _ in processes]
+    for process in processes:
+        process.join()
+
+    def average(key):
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        return round(sum(values) / len(values), 1) if values else None
+
+    report_queue.put({
+        'mode': mode,
+        'load_seconds': round(load_seconds, 3),
+        'parent_load_mb': (round(parent['rss_mb'] - baseline['rss_mb'], 1)
+                           if parent['rss_mb'] is not None else None),
+        'worker_rss_mb': average('rss_mb'),
+        'worker_pss_mb': average('pss_mb'),
+        'worker_private_mb': average('private_mb'),
+        'lookup_us': average('lookup_us'),
+        'workers': workers
+    })
+
+
+def display_footprint_report(report):
+    """Print the footprint report as a table"""
+    def show(value):
+        return "n/a" if value is None else value
+
+    print("\n🧠 TIMEZONEFINDER FOOTPRINT PER WORKER")
+    print("="*78)
+    print(f"{'mode':8} {'load s':>8} {'parent +MB':>11} {'RSS MB':>8} {'PSS MB':>8} {'private MB':>11} {'lookup µs':>10}")
+    for row in report:
+        print(f"{row['mode']:8} {row['load_seconds']:>8} {show(row['parent_load_mb']):>11} "
+              f"{show(row['worker_rss_mb']):>8} {show(row['worker_pss_mb']):>8} "
+              f"{show(row['worker_private_mb']):>11} {row['lookup_us']:>10}")
+    print("="*78)
+    print("RSS counts shared pages in every worker; PSS splits them between sharers,")
+    print("and private MB is what each extra worker really costs.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TimezoneFinder memory modes for PyTZ Buddy")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    report_parser = subparsers.add_parser('report', help="Measure RSS per forked worker for each mode")
+    report_parser.add_argument('--workers', type=int, default=4)
+    report_parser.add_argument('--lookups', type=int, default=2000)
+    report_parser.add_argument('--modes', nargs='+', choices=TIMEZONE_FINDER_MODES, default=list(TIMEZONE_FINDER_MODES))
+    args = parser.parse_args()
+
+    if args.command == 'report':
+        display_footprint_report(footprint_report(args.modes, args.workers, args.lookups))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Timezone Grid for PyTZ Buddy
+A precomputed global raster that maps each cell to a timezone, or to a
+BOUNDARY marker when more than one zone may occur inside the cell. The
+grid is a memory-mapped binary file, so a lookup far from any border is
+a single array index instead of a TimezoneFinder point-in-polygon test.
+
+Build it offline from the installed timezonefinder data:
+    python timezone_grid.py build --resolution 0.25
+
+File layout:
+    8 bytes   magic b'PTZGRID1'
+    4 bytes   header length (little-endian uint32)
+    header    UTF-8 JSON: resolution, rows, cols, zone names, versions
+    padding   to an 8-byte boundary
+    cells     rows * cols native uint16, row 0 at latitude +90, column 0 at
+              longitude -180; 0 = BOUNDARY, n = zone_names[n - 1]
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+
+GRID_MAGIC = b'PTZGRID1'
+GRID_FORMAT = 1
+GRID_FILENAME = "timezone_grid.bin"
+BOUNDARY = 0
+DEFAULT_RESOLUTION = 0.25  # degrees per cell
+# timezonefinder's answers near the poles don't follow its polygon bounds,
+# so polar caps are always left to the exact lookup
+POLAR_LIMIT = 85.0
+
+
+def timezonefinder_version():
+    """Get the installed timezonefinder version"""
+    try:
+        from importlib.metadata import version
+        return version('timezonefinder')
+    except Exception:
+        import timezonefinder
+        return getattr(timezonefinder, '__version__', 'unknown')
+
+
+class TimezoneGrid:
+    def __init__(self, header, cells, mapped=None):
+        """Wrap grid metadata and a uint16 cell sequence (usually a memoryview)"""
+        self.resolution = header['resolution']
+        self.rows = header['rows']
+        self.cols = header['cols']
+        self.zone_names = header['zone_names']
+        self.header = header
+        self.cells = cells
+        self._mapped = mapped
+        self.hits = 0
+        self.boundary_hits = 0
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a grid file; returns None if missing, corrupt or outdated"""
+        try:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        prefix = len(GRID_MAGIC) + 4
+        try:
+            if mapped[:len(GRID_MAGIC)] != GRID_MAGIC:
+                raise ValueError("not a timezone grid file")
+            header_length = struct.unpack('<I', mapped[len(GRID_MAGIC):prefix])[0]
+            header = json.loads(mapped[prefix:prefix + header_length].decode('utf-8'))
+            # Grids are only valid for the timezonefinder data they were built from
+            if (header.get('format') != GRID_FORMAT
+                    or header.get('byteorder') != sys.byteorder
+                    or header.get('timezonefinder') != timezonefinder_version()):
+                raise ValueError("timezone grid is outdated")
+            data_start = prefix + header_length
+            data_start += -data_start % 8
+            cells = memoryview(mapped)[data_start:data_start + header['rows'] * header['cols'] * 2]
+            cells = cells.cast('H')
+        except (ValueError, KeyError, struct.error, UnicodeDecodeError):
+            mapped.close()
+            return None
+
+        return cls(header, cells, mapped)
+
+    def cell_index(self, lat, lng):
+        """Get the flat cell index for a coordinate"""
+        row = min(self.rows - 1, max(0, int((90.0 - lat) / self.resolution)))
+        col = min(self.cols - 1, max(0, int((lng + 180.0) / self.resolution)))
+        return row * self.cols + col
+
+    def lookup(self, lat, lng):
+        """Get the zone name for a coordinate, or None near a zone boundary"""
+        value = self.cells[self.cell_index(lat, lng)]
+        if value == BOUNDARY:
+            self.boundary_hits += 1
+            return None
+        self.hits += 1
+        return self.zone_names[value - 1]
+
+    def coverage(self):
+        """Fraction of cells answered without TimezoneFinder"""
+        total = len(self.cells)
+        boundary = sum(1 for value in self.cells if value == BOUNDARY)
+        return (total - boundary) / total if total else 0.0
+
+
+def _mark_polygon_edges(boundary, coords, resolution):
+    """Mark every cell that a polygon's outline passes through
+
+    Edges are sampled at half-cell steps, so consecutive samples fall in the
+    same or adjacent cells; the caller dilates the mask by one cell to cover
+    corners clipped between two samples.
+    """
+    import numpy as np
+
+    rows, cols = boundary.shape
+    x = coords[0] / 1e7
+    y = coords[1] / 1e7
+    x = np.append(x, x[0])
+    y = np.append(y, y[0])
+    dx = np.diff(x)
+    dy = np.diff(y)
+    steps = np.maximum(1, np.ceil(np.maximum(np.abs(dx), np.abs(dy)) / (resolution / 2)).astype(np.int64))
+
+    segment = np.repeat(np.arange(len(dx)), steps)
+    offset = np.arange(int(steps.sum())) - np.repeat(np.cumsum(steps) - steps, steps)
+    t = offset / steps[segment]
+    px = x[segment] + dx[segment] * t
+    py = y[segment] + dy[segment] * t
+
+    point_rows = np.clip(((90.0 - py) / resolution).astype(np.int64), 0, rows - 1)
+    point_cols = np.clip(((px + 180.0) / resolution).astype(np.int64), 0, cols - 1)
+    boundary[point_rows, point_cols] = True
+
+
+def build_cells(tf, resolution=DEFAULT_RESOLUTION):
+    """Compute the cell array from a TimezoneFinder's polygon data
+
+    A cell is a BOUNDARY cell if any polygon outline passes through it (or
+    through a neighbouring cell). Every other cell lies wholly inside one
+    zone: if only one zone's polygons have bounding boxes touching the cell
+    that zone is taken directly, otherwise it is looked up.
+    """
+    import numpy as np
+
+    rows = int(round(180.0 / resolution))
+    cols = int(round(360.0 / resolution))
+    first_zone = np.full((rows, cols), -1, dtype=np.int32)
+    multiple_zones = np.zeros((rows, cols), dtype=bool)
+    boundary = np.zeros((rows, cols), dtype=bool)
+
+    for poly_id in range(tf.nr_of_polygons):
+        xmax, xmin, ymax, ymin = (int(v) / 1e7 for v in tf.get_polygon_boundaries(poly_id))
+        zone_id = int(tf.zone_id_of(poly_id))
+
+        # Inclusive ranges: a bounding box on a cell edge touches both cells
+        row_start = min(rows - 1, max(0, int(math.floor((90.0 - ymax) / resolution))))
+        row_end = min(rows - 1, max(0, int(math.floor((90.0 - ymin) / resolution))))
+        col_start = min(cols - 1, max(0, int(math.floor((xmin + 180.0) / resolution))))
+        col_end = min(cols - 1, max(0, int(math.floor((xmax + 180.0) / resolution))))
+
+        zones = first_zone[row_start:row_end + 1, col_start:col_end + 1]
+        conflicts = multiple_zones[row_start:row_end + 1, col_start:col_end + 1]
+        conflicts |= (zones != -1) & (zones != zone_id)
+        zones[zones == -1] = zone_id
+
+        _mark_polygon_edges(boundary, tf.coords_of(poly_id), resolution)
+
+    # Dilate by one cell; columns wrap around the antimeridian, rows don't
+    dilated = boundary.copy()
+    for row_shift in (-1, 0, 1):
+        shifted = np.zeros_like(boundary)
+        if row_shift < 0:
+            shifted[:row_shift, :] = boundary[-row_shift:, :]
+        elif row_shift > 0:
+            shifted[row_shift:, :] = boundary[:-row_shift, :]
+        else:
+            shifted = boundary
+        for col_shift in (-1, 0, 1):
+            dilated |= np.roll(shifted, col_shift, axis=1)
+    boundary = dilated
+
+    # Rows reaching beyond the polar limit are never answered from the grid
+    polar_rows = int(math.ceil((90.0 - POLAR_LIMIT) / resolution))
+    boundary[:polar_rows, :] = True
+    boundary[rows - polar_rows:, :] = True
+    boundary |= first_zone == -1
+
+    cells = np.where(boundary, BOUNDARY, first_zone + 1).astype(np.uint16)
+
+    # Interior cells touched by several zones' bounding boxes are looked up at
+    # the centre and near each corner. timezone_at answers from its own
+    # shortcut table, which is occasionally coarser than the polygons (e.g.
+    # in Antarctica), so a cell where those answers differ stays BOUNDARY.
+    zone_numbers = {name: number for number, name in enumerate(tf.timezone_names, 1)}
+    probes = [(0.5, 0.5), (0.01, 0.01), (0.01, 0.99), (0.99, 0.01), (0.99, 0.99)]
+    for row, col in zip(*np.nonzero(~boundary & multiple_zones)):
+        answers = {
+            tf.timezone_at(
+                lat=90.0 - (row + row_fraction) * resolution,
+                lng=-180.0 + (col + col_fraction) * resolution
+            )
+            for row_fraction, col_fraction in probes
+        }
+        zone = answers.pop() if len(answers) == 1 else None
+        cells[row, col] = zone_numbers.get(zone, BOUNDARY)
+
+    return rows, cols, cells
+
+
+def verify_grid(grid, tf, samples=20000, seed=0):
+    """Compare grid answers against TimezoneFinder at random points
+
+    Returns (checked, mismatches) where checked counts only the points the
+    grid answered itself; mismatches lists (lat, lng, grid_zone, exact_zone).
+    """
+    rng = random.Random(seed)
+    checked = 0
+    mismatches = []
+    for _ in range(samples):
+        lat = rng.uniform(-90.0, 90.0)
+        lng = rng.uniform(-180.0, 180.0)
+        zone = grid.lookup(lat, lng)
+        if zone is None:
+            continue
+        checked += 1
+        exact = tf.timezone_at(lat=lat, lng=lng)
+        if zone != exact:
+            mismatches.append((lat, lng, zone, exact))
+    return checked, mismatches
+
+
+def build_grid_file(path, resolution=DEFAULT_RESOLUTION, verify_samples=20000, tf=None):
+    """Build, write and verify a grid file; returns (grid, checked, mismatches)"""
+    if tf is None:
+        from timezonefinder import TimezoneFinder
+        tf = TimezoneFinder()
+
+    rows, cols, cells = build_cells(tf, resolution)
+    header = {
+        'format': GRID_FORMAT,
+        'byteorder': sys.byteorder,
+        'timezonefinder': timezonefinder_version(),
+        'resolution': resolution,
+        'rows': rows,
+        'cols': cols,
+        'zone_names': list(tf.timezone_names)
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    padding = -(len(GRID_MAGIC) + 4 + len(header_bytes)) % 8
+
+    temp_path = f"{path}.tmp.{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(GRID_MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * padding)
+        f.write(cells.tobytes())
+
+    # Verify the file as it will be read, before it replaces any existing grid
+    grid = TimezoneGrid.open(temp_path)
+    checked, mismatches = verify_grid(grid, tf, verify_samples)
+    if mismatches:
+        os.remove(temp_path)
+        return grid, checked, mismatches
+
+    os.replace(temp_path, path)
+    return grid, checked, mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the PyTZ Buddy timezone grid")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Build and verify a grid file")
+    build_parser.add_argument('--resolution', type=float, default=DEFAULT_RESOLUTION,
+                              help="Cell size in degrees (default: %(default)s)")
+    build_parser.add_argument('--output', default=os.path.join(".pytz_cache", GRID_FILENAME),
+                              help="Grid file to write (default: %(default)s)")
+    build_parser.add_argument('--verify-samples', type=int, default=20000,
+                              help="Random points checked against TimezoneFinder")
+
+    verify_parser = subparsers.add_parser('verify', help="Verify an existing grid file")
+    verify_parser.add_argument('path', nargs='?', default=os.path.join(".pytz_cache", GRID_FILENAME))
+    verify_parser.add_argument('--samples', type=int, default=20000)
+
+    args = parser.parse_args(argv)
+    from timezonefinder import TimezoneFinder
+    tf = TimezoneFinder()
+
+    if args.command == 'build':
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        grid, checked, mismatches = build_grid_file(
+            args.output, args.resolution, args.verify_samples, tf
+        )
+    else:
+        grid = TimezoneGrid.open(args.path)
+        if grid is None:
+            print(f"❌ No valid grid at {args.path} (missing or built for other timezonefinder data)")
+            return 1
+        checked, mismatches = verify_grid(grid, tf, args.samples)
+
+    print(f"🗺️ Grid {grid.rows}x{grid.cols} at {grid.resolution}°: "
+          f"{grid.coverage():.1%} of cells answer without TimezoneFinder")
+    print(f"🔍 Verified {checked} grid answers against TimezoneFinder: {len(mismatches)} mismatches")
+    for lat, lng, zone, exact in mismatches[:10]:
+        print(f"   ({lat:.4f}, {lng:.4f}) grid={zone} timezonefinder={exact}")
+    if mismatches:
+        print("❌ Verification failed; grid file not written" if args.command == 'build'
+              else "❌ Verification failed")
+        return 1
+    print("✅ Grid verified")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
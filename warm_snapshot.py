@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Warm-start Snapshot for PyTZ Buddy
+Saves the warmed state of a TimezoneConverter (zone offset tables and the
+location cache index) to one file that is memory-mapped on the next start,
+before the converter builds anything else, instead of being rebuilt lazily
+under load. Pass it as TimezoneConverter(snapshot_path=...).
+
+File layout:
+    8 bytes   magic b'PTZSNAP1'
+    4 bytes   header length (little-endian uint32)
+    header    UTF-8 JSON: versions, zone index, location index position
+    padding   to an 8-byte boundary
+    data      native float64 arrays of UTC transition times, one per zone,
+              then the location index as UTF-8 JSON, parsed on first use
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime
+
+import pytz
+
+from timezone_grid import timezonefinder_version
+from zone_backends import (
+    UnknownZoneError, get_zone_table, install_zone_table, interned_zone_names
+)
+
+SNAPSHOT_MAGIC = b'PTZSNAP1'
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_FILENAME = "warm_snapshot.bin"
+
+# Mapped snapshots must outlive the memoryviews handed to zone tables
+_MAPPED_SNAPSHOTS = []
+
+
+def snapshot_versions():
+    """Data versions a snapshot depends on; any change invalidates it"""
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'byteorder': sys.byteorder,
+        'pytz': pytz.__version__,
+        'timezonefinder': timezonefinder_version()
+    }
+
+
+def default_snapshot_path(cache_manager):
+    """Snapshot location inside a cache manager's cache directory"""
+    return os.path.join(cache_manager.cache_dir, SNAPSHOT_FILENAME)
+
+
+def save_snapshot(converter, path=None):
+    """Serialize the converter's warmed state; returns True on success"""
+    cache_manager = converter.cache_manager
+    path = path or default_snapshot_path(cache_manager)
+
+    zone_names = set(interned_zone_names())
+    zone_names.update(converter.major_timezones)
+    zone_names.update(converter.timezone_shortcuts.values())
+
+    zones = {}
+    data = bytearray()
+    for zone_name in sorted(zone_names):
+        try:
+            times, infos = get_zone_table(zone_name)
+        except UnknownZoneError:
+            continue
+        zones[zone_name] = {
+            'times': [len(data), len(times)],
+            'offsets': [[info[0], info[1], info[2].tzname(None)] for info in infos]
+        }
+        data.extend(array('d', times).tobytes())
+
+    index_bytes = json.dumps(dict(cache_manager.location_backend.scan()), ensure_ascii=False).encode('utf-8')
+    header = {
+        'versions': snapshot_versions(),
+        'created_at': datetime.now().isoformat(),
+        'zones': zones,
+        'location_index': {
+            'stamp': cache_manager.location_cache_stamp(),
+            'data': [len(data), len(index_bytes)]
+        }
+    }
+    data.extend(index_bytes)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    padding = -(len(SNAPSHOT_MAGIC) + 4 + len(header_bytes)) % 8
+
+    temp_path = f"{path}.tmp.{os.getpid()}"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(struct.pack('<I', len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b'\0' * padding)
+            f.write(data)
+        os.replace(temp_path, path)
+        return True
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+
+
+def _map_snapshot(path):
+    """Memory-map a snapshot and return (header, data memoryview) or None"""
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    prefix = len(SNAPSHOT_MAGIC) + 4
+    if len(mapped) < prefix or mapped[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        mapped.close()
+        return None
+
+    header_length = struct.unpack('<I', mapped[len(SNAPSHOT_MAGIC):prefix])[0]
+    try:
+        header = json.loads(mapped[prefix:prefix + header_length].decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        mapped.close()
+        return None
+
+    if header.get('versions') != snapshot_versions():
+        mapped.close()
+        return None
+
+    data_start = prefix + header_length
+    data_start += -data_start % 8
+    _MAPPED_SNAPSHOTS.append(mapped)
+    return header, memoryview(mapped)[data_start:]
+
+
+def load_snapshot(path, cache_manager=None, zone_backend=None):
+    """Install a snapshot's zone tables; returns False if missing or stale
+
+    With a cache_manager whose location cache is the JSON file, the mapped
+    location index stands in for that file until it changes; it is parsed
+    on the first lookup, not here. A zone_backend other than precomputed
+    also resolves its zone objects for the snapshot's zones.
+    """
+    mapped = _map_snapshot(path)
+    if mapped is None:
+        return False
+    header, data = mapped
+
+    resolve_zones = zone_backend is not None and zone_backend.name != 'precomputed'
+    for zone_name, entry in header['zones'].items():
+        start, count = entry['times']
+        times = data[start:start + count * 8].cast('d')
+        install_zone_table(zone_name, times, entry['offsets'])
+        if resolve_zones:
+            try:
+                zone_backend.get_zone(zone_name)
+            except UnknownZoneError:
+                continue
+
+    # Only the JSON backend re-reads a file the index can stand in for
+    location_index = header.get('location_index') or {}
+    if cache_manager is not None and cache_manager.location_backend.name == 'json' and 'data' in location_index:
+        start, length = location_index['data']
+        index_view = data[start:start + length]
+        cache_manager.seed_location_index(
+            lambda: json.loads(bytes(index_view).decode('utf-8')), location_index.get('stamp')
+        )
+    return True
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Zone Aliases for PyTZ Buddy
+A case-insensitive index from names people type to IANA zones: zone names,
+city names taken from canonical zones, and the abbreviations the zones
+currently use. Names that mostly mean somewhere else are left to the geocoder.
+Built once from the zone transition tables; lookups are one dict access.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+from zone_backends import zone_transitions
+
+# Zones to favour when an abbreviation is shared by many zones, related or not
+PREFERRED_ABBREVIATION_ZONES = {
+    'edt': 'America/New_York',
+    'mdt': 'America/Denver',
+    'cst': 'US/Central',
+    'cdt': 'US/Central',
+    'ist': 'Asia/Kolkata',
+    'bst': 'Europe/London',
+    'ast': 'America/Halifax',
+    'adt': 'America/Halifax',
+    'msk': 'Europe/Moscow',
+    'cest': 'Europe/Paris',
+    'eest': 'Europe/Athens',
+    'aest': 'Australia/Sydney',
+    'aedt': 'Australia/Sydney',
+}
+
+# Zone cities that also name a well-known place in another zone; the zone's
+# own city stays the pick and these are reported as alternatives
+SHARED_CITY_NAMES = {
+    'perth': ('Europe/London',),  # Perth, Scotland
+    'halifax': ('Europe/London',),  # Halifax, England
+}
+
+# Link prefixes whose last component is a region or country, not a city
+LINK_PREFIXES = ('US/', 'Canada/', 'Etc/')
+
+_ALIAS_INDEX = None
+
+
+def _city_zone(zone_name):
+    """Whether zone_name's last component is a city people mean by that name
+
+    Only canonical zones count. Antarctic stations and sub-region zones
+    (America/Argentina/San_Juan, America/Indiana/Knox) are named after
+    places that share their name with bigger ones elsewhere, so those
+    names are left to the geocoder.
+    """
+    return (zone_name.count('/') == 1
+            and not zone_name.startswith(LINK_PREFIXES + ('Antarctica/',)))
+
+
+class ZoneAliasIndex:
+    """Static alias index: lowercase name -> classes of candidate zones
+
+    Each candidate class holds zones whose offsets and abbreviations agree
+    over the build window, so a name is only ambiguous when its classes
+    really disagree (CST: Chicago vs Shanghai), not when it names several
+    copies of the same rules (PST: Los_Angeles, Vancouver, US/Pacific).
+    """
+
+    def __init__(self, at=None, window_days=365):
+        at = at or datetime.now(timezone.utc).replace(tzinfo=None)
+        window_start = at - timedelta(days=window_days)
+        window_end = at + timedelta(days=window_days)
+        common = set(pytz.common_timezones)
+        city_zones = [zone_name for zone_name in pytz.common_timezones if _city_zone(zone_name)]
+
+        behaviours = {}
+        names = {}
+        abbreviations = {}
+        # abbreviation -> {zone: offset seconds the zone has while showing it}
+        self.abbreviation_offsets = {}
+        cities = {}
+        for zone_name in pytz.all_timezones:
+            transitions = zone_transitions(zone_name, window_start, window_end)
+            behaviours[zone_name] = tuple((start, offset) for start, offset, _abbr in transitions)
+            # Slashless legacy links ("Greenwich", "Egypt") read as place names; the
+            # upper-case ones (EST, MST, HST, CET, PRC) are zones as written
+            if '/' in zone_name or zone_name in common or zone_name.isupper():
+                names[zone_name.lower()] = zone_name
+            for _start, offset, abbreviation in transitions:
+                # Numeric "abbreviations" like +03 or -0930 are not names anyone types
+                if abbreviation and abbreviation[0] not in '+-' and abbreviation != 'LMT':
+                    abbreviations.setdefault(abbreviation.lower(), set()).add(zone_name)
+                    self.abbreviation_offsets.setdefault(abbreviation.lower(), {}).setdefault(zone_name, offset)
+        for zone_name in city_zones:
+            # "new_york" as written in the zone name, "new york" as typed
+            city = zone_name.rsplit('/', 1)[1].lower()
+            for key in {city, city.replace('_', ' ')}:
+                cities.setdefault(key, set()).add(zone_name)
+        for key, zones in SHARED_CITY_NAMES.items():
+            if key in cities:
+                cities[key].update(zones)
+
+        def classes_for(key, zones, preferred=None):
+            """Group zones by behaviour; preferred or most widely shared class first"""
+            grouped = {}
+            for zone_name in zones:
+                grouped.setdefault(behaviours[zone_name], []).append(zone_name)
+            preferred = preferred or PREFERRED_ABBREVIATION_ZONES.get(key)
+            classes = [
+                tuple(sorted(group, key=lambda z: (z != preferred, z not in common, z)))
+                for group in grouped.values()
+            ]
+            classes.sort(key=lambda group: (preferred not in group, -len(group), group[0]))
+            return tuple(classes)
+
+        # Later sources never override earlier ones: IANA names, then abbreviations, then cities
+        self.entries = {}
+        for key, zone_name in names.items():
+            self.entries[key] = ((zone_name,),)
+        for key, zones in abbreviations.items():
+            self.entries.setdefault(key, classes_for(key, zones))
+        for key, zones in cities.items():
+            own = sorted(zone_name for zone_name in zones if zone_name in city_zones)
+            self.entries.setdefault(key, classes_for(key, zones, own[0] if key in SHARED_CITY_NAMES else None))
+
+    def classes(self, name):
+        """Get the candidate zone classes for a name (empty tuple if unknown)"""
+        return self.entries.get(name.lower().strip(), ())
+
+    def zone_in_force(self, key, zone_name, at):
+        """Get a zone where abbreviation key means what it means in zone_name, at local time at
+
+        An abbreviation names one offset: "EST" is -05:00 even in July, when
+        America/New_York shows EDT. If zone_name is not showing the
+        abbreviation at that time, another zone that is (at the same offset)
+        is used, else a fixed-offset Etc zone. Keys that are not
+        abbreviations, or zones already showing it, return zone_name.
+        """
+        offsets = self.abbreviation_offsets.get(key)
+        if not offsets or zone_name not in offsets or _shows(zone_name, key, offsets[zone_name], at):
+            return zone_name
+        offset = offsets[zone_name]
+        common = set(pytz.common_timezones)
+        candidates = sorted(
+            (zone for zone, zone_offset in offsets.items() if zone_offset == offset and zone != zone_name),
+            key=lambda zone: (zone not in common, zone)
+        )
+        for candidate in candidates:
+            if _shows(candidate, key, offset, at):
+                return candidate
+        if offset % 3600 == 0:
+            # Etc signs are inverted: Etc/GMT+5 is five hours behind UTC
+            hours = -offset // 3600
+            return f"Etc/GMT{hours:+d}" if hours else 'Etc/GMT'
+        return zone_name
+
+
+def _shows(zone_name, key, offset, at):
+    """Whether zone_name shows abbreviation key at offset at local time at"""
+    local = pytz.timezone(zone_name).localize(at, is_dst=False)
+    return local.tzname().lower() == key and local.utcoffset().total_seconds() == offset
+
+
+def get_alias_index():
+    """Get the shared static alias index, building it on first use"""
+    global _ALIAS_INDEX
+    if _ALIAS_INDEX is None:
+        _ALIAS_INDEX = ZoneAliasIndex()
+    return _ALIAS_INDEX
+
+
+def resolve_alias(name, user_aliases=None, shortcuts=None, preferred_zones=(), at=None):
+    """Resolve a typed name to (zone, alternatives), or (None, []) if unknown
+
+    User aliases win over shortcuts, which win over the static index. For
+    a static entry, the first candidate class is used; within it a zone from
+    preferred_zones is picked if present. alternatives lists one zone from
+    every other class, so a non-empty list means the name was ambiguous.
+    Given at (a naive local time), an abbreviation resolves to a zone where
+    it is in force then, so "EST" in July still means -05:00.
+    """
+    key = name.lower().strip()
+    if user_aliases and key in user_aliases:
+        return user_aliases[key], []
+    if shortcuts and key in shortcuts:
+        return shortcuts[key], []
+
+    classes = get_alias_index().classes(key)
+    if not classes:
+        return None, []
+    picks = []
+    for zones in classes:
+        preferred = [zone for zone in zones if zone in preferred_zones]
+        picks.append(preferred[0] if preferred else zones[0])
+    if at is not None:
+        picks[0] = get_alias_index().zone_in_force(key, picks[0], at)
+    return picks[0], picks[1:]
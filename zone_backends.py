@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Zone Backends for PyTZ Buddy
+Interchangeable timezone providers used by the conversion code:
+pytz, the stdlib zoneinfo module and interned precomputed offset tables
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = KeyError
+
+EPOCH = datetime(1970, 1, 1)
+UTC = timezone.utc
+
+
+class UnknownZoneError(KeyError):
+    """Raised when a backend does not know the requested zone name"""
+
+
+def _to_utc_naive(dt):
+    """Return a naive UTC datetime for a naive-UTC or timezone-aware datetime"""
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(UTC).replace(tzinfo=None)
+
+
+class ZoneBackend:
+    """Base class for zone providers
+
+    All backends take zone names as IANA strings and naive datetimes are
+    interpreted as wall time (localize) or as UTC (from_utc). Ambiguous and
+    non-existent wall times resolve the way pytz does with is_dst=False.
+    """
+
+    name = None
+
+    def get_zone(self, zone_name):
+        """Return the backend's zone object, raising UnknownZoneError"""
+        raise NotImplementedError
+
+    def localize(self, naive_dt, zone_name):
+        """Attach a zone to a naive wall-clock datetime"""
+        raise NotImplementedError
+
+    def from_utc(self, dt, zone_name):
+        """Convert a naive UTC or aware datetime to local time in zone_name"""
+        raise NotImplementedError
+
+    def utc_offset_seconds(self, dt, zone_name):
+        """Get the UTC offset in seconds of zone_name at the given instant"""
+        return int(self.from_utc(dt, zone_name).utcoffset().total_seconds())
+
+
+class PytzBackend(ZoneBackend):
+    """Reference backend built on pytz.timezone plus localize"""
+
+    name = 'pytz'
+
+    def get_zone(self, zone_name):
+        try:
+            return pytz.timezone(zone_name)
+        except pytz.UnknownTimeZoneError:
+            raise UnknownZoneError(zone_name)
+
+    def localize(self, naive_dt, zone_name):
+        return self.get_zone(zone_name).localize(naive_dt)
+
+    def from_utc(self, dt, zone_name):
+        utc_dt = pytz.utc.localize(_to_utc_naive(dt))
+        return utc_dt.astimezone(self.get_zone(zone_name))
+
+
+class ZoneInfoBackend(ZoneBackend):
+    """Backend built on the stdlib zoneinfo module (tzdata on Windows)"""
+
+    name = 'zoneinfo'
+
+    def __init__(self):
+        if ZoneInfo is None:
+            raise RuntimeError("zoneinfo is not available on this Python version")
+
+    def get_zone(self, zone_name):
+        try:
+            return ZoneInfo(zone_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise UnknownZoneError(zone_name)
+
+    def localize(self, naive_dt, zone_name):
+        zone = self.get_zone(zone_name)
+        earlier = naive_dt.replace(tzinfo=zone, fold=0)
+        later = naive_dt.replace(tzinfo=zone, fold=1)
+        if earlier.utcoffset() == later.utcoffset():
+            return earlier
+
+        # Round-trip through UTC tells a skipped wall time from a repeated one
+        if earlier.astimezone(UTC).astimezone(zone).replace(tzinfo=None, fold=0) != naive_dt:
+            # Non-existent time: keep the offset in force before the gap
+            return earlier
+
+        # Ambiguous time: prefer the standard-time reading, else the later one
+        if earlier.dst() and not later.dst():
+            return later
+        if later.dst() and not earlier.dst():
+            return earlier
+        return later
+
+    def from_utc(self, dt, zone_name):
+        zone = self.get_zone(zone_name)
+        return _to_utc_naive(dt).replace(tzinfo=UTC).astimezone(zone)
+
+
+# Interned tables shared by every PrecomputedBackend instance:
+# zone name -> (transition epoch seconds, [(offset_seconds, dst_seconds, tzinfo)])
+_ZONE_TABLES = {}
+# (offset_seconds, abbreviation) -> datetime.timezone
+_TZINFO_POOL = {}
+
+
+def _interned_tzinfo(offset_seconds, abbreviation):
+    """Get the shared fixed-offset tzinfo for an (offset, abbreviation) pair"""
+    key = (offset_seconds, abbreviation)
+    tzinfo = _TZINFO_POOL.get(key)
+    if tzinfo is None:
+        tzinfo = timezone(timedelta(seconds=offset_seconds), abbreviation)
+        _TZINFO_POOL[key] = tzinfo
+    return tzinfo
+
+
+def build_zone_table(zone_name):
+    """Build the transition table for a zone from pytz's compiled data"""
+    try:
+        tz = pytz.timezone(zone_name)
+    except pytz.UnknownTimeZoneError:
+        raise UnknownZoneError(zone_name)
+
+    transition_times = getattr(tz, '_utc_transition_times', None)
+    if transition_times:
+        times = [(t - EPOCH).total_seconds() for t in transition_times]
+        infos = []
+        for utcoffset, dst, abbreviation in tz._transition_info:
+            offset_seconds = int(utcoffset.total_seconds())
+            infos.append((
+                offset_seconds,
+                int(dst.total_seconds()),
+                _interned_tzinfo(offset_seconds, abbreviation)
+            ))
+    else:
+        # Static zones (UTC, Etc/GMT+5, ...) have a single offset forever
+        utcoffset = tz.utcoffset(None) or timedelta(0)
+        offset_seconds = int(utcoffset.total_seconds())
+        times = [float('-inf')]
+        infos = [(offset_seconds, 0, _interned_tzinfo(offset_seconds, tz.tzname(None)))]
+
+    return times, infos
+
+
+def get_zone_table(zone_name):
+    """Get the interned transition table for a zone, building it on first use"""
+    table = _ZONE_TABLES.get(zone_name)
+    if table is None:
+        table = build_zone_table(zone_name)
+        _ZONE_TABLES[zone_name] = table
+    return table
+
+
+def zone_transitions(zone_name, start, end):
+    """List the offsets in force for a zone over [start, end), both naive UTC
+
+    Returns [(utc_start, offset_seconds, abbreviation), ...] where the first
+    entry begins at start and each later entry is a transition. Uses the
+    interned tables, so any backend's zone data can be scanned in one pass.
+    """
+    times, infos = get_zone_table(zone_name)
+    end_seconds = (end - EPOCH).total_seconds()
+    index = max(0, bisect_right(times, (start - EPOCH).total_seconds()) - 1)
+
+    info = infos[index]
+    result = [(start, info[0], info[2].tzname(None))]
+    for index in range(index + 1, len(times)):
+        if times[index] >= end_seconds:
+            break
+        info = infos[index]
+        result.append((EPOCH + timedelta(seconds=times[index]), info[0], info[2].tzname(None)))
+    return result
+
+
+def interned_zone_names():
+    """List the zones whose tables have been built or installed so far"""
+    return list(_ZONE_TABLES)
+
+
+def install_zone_table(zone_name, times, offsets):
+    """Install a prebuilt table; offsets are (offset_seconds, dst_seconds, abbreviation)
+
+    times may be any sorted sequence of epoch seconds, including a memoryview
+    over a memory-mapped file.
+    """
+    infos = [
+        (offset_seconds, dst_seconds, _interned_tzinfo(offset_seconds, abbreviation))
+        for offset_seconds, dst_seconds, abbreviation in offsets
+    ]
+    _ZONE_TABLES[zone_name] = (times, infos)
+
+
+# Flattened keys are zone_index * _ZONE_KEY_SPAN + epoch seconds; times are
+# clamped to +/- 2**36 s (about 2,000 years), so segments never overlap
+_ZONE_KEY_SPAN = 2.0 ** 38
+_ZONE_KEY_LIMIT = 2.0 ** 36
+
+
+class ZoneOffsetMatrix:
+    """Transition tables of many zones flattened into arrays for batch lookups
+
+    lookup() finds the offset of every zone at one instant with a single
+    numpy searchsorted, instead of one tzinfo conversion per zone.
+    """
+
+    def __init__(self, zone_names):
+        import numpy as np
+
+        self.zone_names = list(zone_names)
+        abbreviation_ids = {}
+        keys, offsets, abbreviations, starts = [], [], [], []
+        for zone_index, zone_name in enumerate(self.zone_names):
+            times, infos = get_zone_table(zone_name)
+            starts.append(len(keys))
+            base = zone_index * _ZONE_KEY_SPAN
+            for seconds, info in zip(times, infos):
+                keys.append(base + min(max(seconds, -_ZONE_KEY_LIMIT), _ZONE_KEY_LIMIT))
+                offsets.append(info[0])
+                abbreviation = info[2].tzname(None)
+                abbreviations.append(abbreviation_ids.setdefault(abbreviation, len(abbreviation_ids)))
+
+        self.keys = np.array(keys, dtype=np.float64)
+        self.offsets = np.array(offsets, dtype=np.int32)
+        self.abbreviation_ids = np.array(abbreviations, dtype=np.int32)
+        self.abbreviations = list(abbreviation_ids)
+        self.starts = np.array(starts, dtype=np.int64)
+        self.bases = np.arange(len(self.zone_names), dtype=np.float64) * _ZONE_KEY_SPAN
+
+    def lookup(self, utc_dt):
+        """Get (offset_seconds array, abbreviation list) for every zone at utc_dt"""
+        import numpy as np
+
+        seconds = (_to_utc_naive(utc_dt) - EPOCH).total_seconds()
+        seconds = min(max(seconds, -_ZONE_KEY_LIMIT), _ZONE_KEY_LIMIT)
+        index = np.searchsorted(self.keys, self.bases + seconds, side='right') - 1
+        index = np.maximum(index, self.starts)
+        abbreviations = [self.abbreviations[i] for i in self.abbreviation_ids[index].tolist()]
+        return self.offsets[index], abbreviations
+
+
+_OFFSET_MATRICES = {}
+
+
+def get_zone_offset_matrix(zone_names=None):
+    """Get the shared ZoneOffsetMatrix for zone_names (default: all pytz zones)"""
+    key = tuple(zone_names) if zone_names is not None else tuple(pytz.all_timezones)
+    matrix = _OFFSET_MATRICES.get(key)
+    if matrix is None:
+        matrix = ZoneOffsetMatrix(key)
+        _OFFSET_MATRICES[key] = matrix
+    return matrix
+
+
+class PrecomputedBackend(ZoneBackend):
+    """Backend answering from interned per-zone offset tables
+
+    Tables are derived once from pytz data; lookups are a bisect over the
+    transition list and return datetimes carrying shared fixed-offset tzinfos.
+    """
+
+    name = 'precomputed'
+
+    def get_zone(self, zone_name):
+        return get_zone_table(zone_name)
+
+    def _info_at(self, table, seconds):
+        times, infos = table
+        return infos[max(0, bisect_right(times, seconds) - 1)]
+
+    def _localize_seconds(self, table, local_seconds):
+        """Pick the (offset, dst, tzinfo) for a wall time given in epoch seconds"""
+        times, infos = table
+        first = max(0, bisect_right(times, local_seconds - 86400) - 1)
+        last = max(0, bisect_right(times, local_seconds + 86400) - 1)
+
+        candidates = []
+        for index in range(first, last + 1):
+            info = infos[index]
+            utc_seconds = local_seconds - info[0]
+            if max(0, bisect_right(times, utc_seconds) - 1) == index:
+                candidates.append((utc_seconds, info))
+
+        if not candidates:
+            # Non-existent time: wind back past the gap and keep that offset
+            return self._localize_seconds(table, local_seconds - 6 * 3600)
+        if len(candidates) == 1:
+            return candidates[0][1]
+
+        standard = [c for c in candidates if not c[1][1]]
+        if len(standard) == 1:
+            return standard[0][1]
+        return max(candidates if not standard else standard)[1]
+
+    def localize(self, naive_dt, zone_name):
+        table = self.get_zone(zone_name)
+        info = self._localize_seconds(table, (naive_dt - EPOCH).total_seconds())
+        return naive_dt.replace(tzinfo=info[2])
+
+    def from_utc(self, dt, zone_name):
+        table = self.get_zone(zone_name)
+        utc_naive = _to_utc_naive(dt)
+        info = self._info_at(table, (utc_naive - EPOCH).total_seconds())
+        return (utc_naive + timedelta(seconds=info[0])).replace(tzinfo=info[2])
+
+    def utc_offset_seconds(self, dt, zone_name):
+        table = self.get_zone(zone_name)
+        return self._info_at(table, (_to_utc_naive(dt) - EPOCH).total_seconds())[0]
+
+
+ZONE_BACKENDS = {
+    PytzBackend.name: PytzBackend,
+    ZoneInfoBackend.name: ZoneInfoBackend,
+    PrecomputedBackend.name: PrecomputedBackend,
+}
+
+DEFAULT_ZONE_BACKEND = PytzBackend.name
+
+
+def available_backends():
+    """List the backend names that can be constructed in this environment"""
+    names = [PytzBackend.name, PrecomputedBackend.name]
+    if ZoneInfo is not None:
+        names.insert(1, ZoneInfoBackend.name)
+    return names
+
+
+def get_zone_backend(name=None):
+    """Create a zone backend by name, defaulting to pytz"""
+    backend_class = ZONE_BACKENDS.get(name or DEFAULT_ZONE_BACKEND)
+    if backend_class is None:
+        raise ValueError(
+            f"Unknown zone backend '{name}'. Choose from: {', '.join(ZONE_BACKENDS)}"
+        )
+    return backend_class()